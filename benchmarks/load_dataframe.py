@@ -0,0 +1,36 @@
+"""Compare time and peak memory of the loading paths of PortallDataFrame against the simulator."""
+
+import sys
+import time
+import tracemalloc
+
+import geopandas as gpd
+from shapely.geometry import Point
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import PortallDataFrameHelper
+from pyportall.api.models.geopandas import PortallDataFrame
+from pyportall.simulator import PortallSimulator
+
+
+def measure(label, load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    load()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>10}: {elapsed:6.2f} s, peak {peak / 2 ** 20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+    gdf = gpd.GeoDataFrame({"value": range(rows), "geometry": [Point(-3.7 + i * 1e-5, 40.4).buffer(0.001, 4) for i in range(rows)]}, crs="EPSG:4326")
+    pdf = PortallDataFrame.from_gdf(gdf, client, name="benchmark")
+    pdf.save()
+
+    helper = PortallDataFrameHelper(client)
+    measure("strict", lambda: helper.get(pdf.id))
+    measure("direct", lambda: helper.get(pdf.id, columnar=True))
@@ -0,0 +1,37 @@
+"""Compare thread and process pools when resolving aggregated indicators in chunks against the simulator."""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import geopandas as gpd
+from shapely.geometry import Point
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import IndicatorHelper
+from pyportall.api.models.indicators import Indicator, Moment, Month
+from pyportall.simulator import PortallSimulator
+
+
+def measure(label, resolve):
+    start = time.perf_counter()
+    resolve()
+    print(f"{label:>12}: {time.perf_counter() - start:6.2f} s")
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    chunk_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    helper = IndicatorHelper(APIClient(api_key="dummy", transport=PortallSimulator().transport()))
+    gdf = gpd.GeoDataFrame({"geometry": [Point(-3.7 + i * 1e-5, 40.4).buffer(0.001, 8) for i in range(rows)]}, crs="EPSG:4326")
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+
+    print(f"{rows} rows, chunks of {chunk_size}, {os.cpu_count()} cores")
+    measure("sequential", lambda: helper.resolve_aggregated(gdf, indicator=indicator, moment=moment, chunk_size=chunk_size))
+    for workers in (1, 2, 4, 8):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            measure(f"{workers} threads", lambda: helper.resolve_aggregated(gdf, indicator=indicator, moment=moment, chunk_size=chunk_size, executor=executor))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            measure(f"{workers} processes", lambda: helper.resolve_aggregated(gdf, indicator=indicator, moment=moment, chunk_size=chunk_size, executor=executor))
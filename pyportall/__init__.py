@@ -0,0 +1,75 @@
+"""Portall Python SDK.
+
+The most common classes can be imported straight from the package, e.g. `from pyportall import APIClient, GeocodingHelper`. They are loaded on first use, so that only the dependencies actually needed are imported: metadata calls do not pull in GeoPandas, for instance.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from pyportall.api.engine.core import APIClient
+    from pyportall.api.engine.geopandas import GeocodingHelper, IndicatorHelper, IsolineHelper, IsovistHelper, PortallDataFrameHelper
+    from pyportall.api.engine.metadata import MetadataHelper
+    from pyportall.api.models.geopandas import PortallDataFrame
+    from pyportall.api.models.indicators import DayOfWeek, Indicator, Moment, Month, Normalization
+    from pyportall.api.models.lbs import GeocodingOptions, IsolineMode, IsolineOptions, IsovistOptions
+    from pyportall.simulator import PortallSimulator, SimulatorOptions
+
+
+_MODULES = {
+    "APIClient": "pyportall.api.engine.core",
+    "GeocodingHelper": "pyportall.api.engine.geopandas",
+    "IndicatorHelper": "pyportall.api.engine.geopandas",
+    "IsolineHelper": "pyportall.api.engine.geopandas",
+    "IsovistHelper": "pyportall.api.engine.geopandas",
+    "PortallDataFrameHelper": "pyportall.api.engine.geopandas",
+    "MetadataHelper": "pyportall.api.engine.metadata",
+    "PortallDataFrame": "pyportall.api.models.geopandas",
+    "DayOfWeek": "pyportall.api.models.indicators",
+    "Indicator": "pyportall.api.models.indicators",
+    "Moment": "pyportall.api.models.indicators",
+    "Month": "pyportall.api.models.indicators",
+    "Normalization": "pyportall.api.models.indicators",
+    "GeocodingOptions": "pyportall.api.models.lbs",
+    "IsolineMode": "pyportall.api.models.lbs",
+    "IsolineOptions": "pyportall.api.models.lbs",
+    "IsovistOptions": "pyportall.api.models.lbs",
+    "PortallSimulator": "pyportall.simulator",
+    "SimulatorOptions": "pyportall.simulator",
+}
+
+__all__ = [
+    "APIClient",
+    "GeocodingHelper",
+    "IndicatorHelper",
+    "IsolineHelper",
+    "IsovistHelper",
+    "PortallDataFrameHelper",
+    "MetadataHelper",
+    "PortallDataFrame",
+    "DayOfWeek",
+    "Indicator",
+    "Moment",
+    "Month",
+    "Normalization",
+    "GeocodingOptions",
+    "IsolineMode",
+    "IsolineOptions",
+    "IsovistOptions",
+    "PortallSimulator",
+    "SimulatorOptions",
+]
+
+
+def __getattr__(name: str) -> Any:
+    if name not in _MODULES:
+        raise AttributeError(f"module 'pyportall' has no attribute '{name}'")
+
+    value = getattr(importlib.import_module(_MODULES[name]), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
@@ -1,17 +1,34 @@
 """Module where core API-related classes live."""
 
 import os
+import hashlib
 import httpx
 import json
-from typing import Any, Dict, Optional
-from time import sleep
-
-from pyportall.exceptions import AuthError, BatchError, PreFlightException, PyPortallException, RateLimitError, TimeoutError, ValidationError
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from pyportall.exceptions import AuthError, BatchError, PreFlightException, PyPortallException, RateLimitError, TimeoutError, UnsupportedError, ValidationError
+from pyportall.api.models.hedging import HedgingOptions, HedgingStats
 from pyportall.api.models.preflight import Preflight
+from pyportall.api.models.scheduling import CreditBudgetOptions, CreditStats, Priority, PriorityLaneOptions, PriorityStats
 from pyportall.utils import jsonable_encoder
 
 
 BATCH_DELAY_S = 5
+MAX_WORKERS = 8
+MAX_HEDGING_ROUTES = 64
+
+SUCCESS_STATUS_CODES = {
+    "GET": (200, 202),
+    "POST": (200, 201, 202),
+    "PUT": (200, 201, 202),
+    "PATCH": (200, 201, 202),
+    "DELETE": (204,),
+}
 
 ENDPOINT_METADATA = os.getenv("PYPORTALL_ENDPOINT_METADATA", "https://api.portall.es/v1/metadata/indicators/")
 ENDPOINT_DATAFRAMES = os.getenv("PYPORTALL_ENDPOINT_DATAFRAMES", "https://api.portall.es/v1/data/dataframes/")
@@ -22,10 +39,405 @@ ENDPOINT_AGGREGATED_INDICATORS = os.getenv("PYPORTALL_ENDPOINT_AGGREGATED_INDICA
 ENDPOINT_DISAGGREGATED_INDICATORS = os.getenv("PYPORTALL_ENDPOINT_DISAGGREGATED_INDICATORS", "https://api.portall.es/v1/pyportall/indicator.geojson")
 
 
+def _encode_body(body: Union[str, Iterable[bytes]]) -> Union[bytes, Iterable[bytes]]:
+    """Prepare a request body for HTTPX.
+
+    Args:
+        body: JSON string, or an iterable of byte chunks that make up a JSON document.
+
+    Returns:
+        The UTF-8 encoded JSON string, or the iterable of byte chunks untouched, so that it is streamed.
+    """
+    return body.encode("utf8") if isinstance(body, str) else body
+
+
+def _fulfil(future: Future, function: Callable[..., Any], *args: Any) -> None:
+    """Run a function and settle a future with its result or exception, for functions run on a thread of their own."""
+    try:
+        future.set_result(function(*args))
+    except BaseException as exception:
+        future.set_exception(exception)
+
+
+class RateLimiter:
+    """Thread-safe token bucket, to keep requests under a given rate."""
+
+    def __init__(self, max_requests_per_s: float, burst: int = 1) -> None:
+        """Start with a full bucket.
+
+        Args:
+            max_requests_per_s: Sustained number of requests allowed per second.
+            burst: Number of requests that can be sent at once after a quiet period.
+        """
+        self.max_requests_per_s = max_requests_per_s
+        self.burst = burst
+
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Wait until a request can be sent without exceeding the rate."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.max_requests_per_s)
+            self._last = now
+            # Tokens can go negative, which reserves a future slot for this caller
+            self._tokens -= 1
+            wait = -self._tokens / self.max_requests_per_s if self._tokens < 0 else 0
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class Hedger:
+    """Thread-safe bookkeeping for hedged requests: recent latencies per endpoint, extra load and stats."""
+
+    def __init__(self, options: HedgingOptions) -> None:
+        """Start with no latencies learned.
+
+        Args:
+            options: When and how often to hedge.
+        """
+        self.options = options
+        self.endpoints = set(options.endpoints if options.endpoints is not None else [ENDPOINT_GEOCODING, ENDPOINT_RESOLVE_ISOVISTS])
+        self.stats = HedgingStats()
+
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def eligible(self, method: str, endpoint: str, body: Any, params: Dict) -> bool:
+        """Whether a request can be safely sent twice.
+
+        Args:
+            method: HTTP method.
+            endpoint: URL the request is sent to.
+            body: Request body, if any. Streamed bodies cannot be sent twice.
+            params: Query parameters. Batch requests create jobs, so they are not hedged.
+
+        Returns:
+            True if the request can be hedged.
+        """
+        return (method == "GET" or (method == "POST" and endpoint in self.endpoints)) and (body is None or isinstance(body, str)) and not params.get("batch")
+
+    @staticmethod
+    def route(endpoint: str) -> str:
+        """Group the URLs of the same resource type, e.g. those of every dataframe, so that they share their latencies.
+
+        Args:
+            endpoint: URL the request is sent to.
+
+        Returns:
+            The API endpoint the URL falls under, or the URL itself if it is not a known one.
+        """
+        for known_endpoint in (ENDPOINT_DATAFRAMES, ENDPOINT_METADATA):
+            if endpoint.startswith(known_endpoint):
+                return known_endpoint
+
+        return endpoint
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """Time to wait before sending a duplicate.
+
+        Args:
+            endpoint: URL the request is sent to.
+
+        Returns:
+            The configured percentile of the recent latencies of the route of the endpoint, or None if not enough of them are known yet.
+        """
+        with self._lock:
+            latencies = sorted(self._latencies.get(self.route(endpoint), ()))
+        if len(latencies) < self.options.min_samples:
+            return None
+
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.options.percentile / 100))]
+
+    def record(self, endpoint: str, latency: float) -> None:
+        route = self.route(endpoint)
+        with self._lock:
+            # Unknown URLs, such as those of batch jobs, are one-offs: only the routes used most recently are kept
+            latencies = self._latencies.pop(route, None) or deque(maxlen=self.options.window)
+            latencies.append(latency)
+            self._latencies[route] = latencies
+            if len(self._latencies) > MAX_HEDGING_ROUTES:
+                del self._latencies[next(iter(self._latencies))]
+
+    def count(self, **increments: int) -> None:
+        with self._lock:
+            for name, increment in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + increment)
+
+    def allow(self) -> bool:
+        """Book a duplicate if it keeps the extra load under the limit.
+
+        Returns:
+            True if a duplicate can be sent.
+        """
+        with self._lock:
+            if self.stats.hedged + 1 > self.options.max_extra_load * self.stats.requests:
+                self.stats.skipped += 1
+                return False
+            self.stats.hedged += 1
+            return True
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2 * MAX_WORKERS, thread_name_prefix="pyportall-hedging")
+            return self._executor
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        state["_executor"] = None
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+class SingleFlight:
+    """Thread-safe coalescing of identical calls: while a call is in flight, identical ones wait for it and share its result instead of being sent again."""
+
+    def __init__(self) -> None:
+        """Start with no calls in flight."""
+        self.coalesced = 0
+
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        """Run a call, unless an identical one is already in flight.
+
+        Args:
+            key: Fingerprint of the call.
+            call: Function that actually sends the request.
+
+        Returns:
+            The result of the call, shared by all the identical calls in flight. It must be treated as read-only.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = call()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"coalesced": self.coalesced}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__()
+        self.coalesced = state["coalesced"]
+
+
+DEFAULT_JOB = "default"
+
+
+class CreditScheduler:
+    """Thread-safe credit budget: requests wait until their cost fits in the budget of the current window, overall and for their job, instead of failing once credits run out."""
+
+    def __init__(self, options: CreditBudgetOptions) -> None:
+        """Start with nothing spent.
+
+        Args:
+            options: Credits that can be spent over time, overall and per job.
+        """
+        self.options = options
+        self.stats = CreditStats()
+
+        self._spent: Deque[Tuple[float, int, str]] = deque()
+        self._condition = threading.Condition()
+
+    def _quota(self, job: str) -> Optional[int]:
+        return self.options.job_quotas.get(job, self.options.default_job_quota)
+
+    def _fits(self, credits: int, job: str, now: float) -> bool:
+        while self._spent and self._spent[0][0] <= now - self.options.window_s:
+            self._spent.popleft()
+
+        spent = sum(spent_credits for _, spent_credits, _ in self._spent)
+        job_spent = sum(spent_credits for _, spent_credits, spent_job in self._spent if spent_job == job)
+        quota = self._quota(job)
+
+        # Requests larger than a whole budget are let through on their own, instead of waiting forever
+        fits_overall = spent + credits <= self.options.credits_per_window or spent == 0
+        fits_job = quota is None or job_spent + credits <= quota or job_spent == 0
+
+        return fits_overall and fits_job
+
+    def acquire(self, credits: int, job: str = DEFAULT_JOB) -> None:
+        """Wait until a request can be sent without exceeding the budget, and book its credits.
+
+        Args:
+            credits: Cost of the request.
+            job: Job the request belongs to.
+        """
+        start = time.monotonic()
+        with self._condition:
+            queued = False
+            while not self._fits(credits, job, time.monotonic()):
+                queued = True
+                # Wait until the oldest spending leaves the window, or until someone else books credits
+                self._condition.wait(max(0.001, self._spent[0][0] + self.options.window_s - time.monotonic()) if self._spent else None)
+
+            self._spent.append((time.monotonic(), credits, job))
+            self.stats.spent += credits
+            self.stats.spent_by_job[job] = self.stats.spent_by_job.get(job, 0) + credits
+            if queued:
+                self.stats.queued += 1
+                self.stats.waited_s += time.monotonic() - start
+            self._condition.notify_all()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_condition"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._condition = threading.Condition()
+
+
+class _Ticket:
+    """A request waiting for its turn."""
+
+    def __init__(self) -> None:
+        self.granted = False
+        self.skips = 0
+
+
+class PriorityScheduler:
+    """Thread-safe priority lanes: requests wait for a free slot in their lane and overall, higher-priority ones go first, and lower-priority ones passed over too many times are served anyway."""
+
+    ORDER: List[Priority] = [Priority.interactive, Priority.default, Priority.bulk]
+
+    def __init__(self, options: PriorityLaneOptions) -> None:
+        """Start with no requests in flight.
+
+        Args:
+            options: In-flight limits, overall and by priority class, and how many times a request can be passed over.
+        """
+        self.options = options
+        self.stats = PriorityStats()
+
+        self._waiting: Dict[Priority, Deque[_Ticket]] = {priority: deque() for priority in self.ORDER}
+        self._in_flight: Dict[Priority, int] = {priority: 0 for priority in self.ORDER}
+        self._condition = threading.Condition()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to waiting requests, in priority order unless some request has been passed over too many times."""
+        while sum(self._in_flight.values()) < self.options.max_in_flight:
+            ready = [priority for priority in self.ORDER if self._waiting[priority] and self._in_flight[priority] < self.options.lane_max_in_flight.get(priority, self.options.max_in_flight)]
+            if not ready:
+                return
+
+            starved = [priority for priority in ready if self._waiting[priority][0].skips >= self.options.max_skips]
+            chosen = starved[0] if starved else ready[0]
+            if chosen != ready[0]:
+                self.stats.promoted += 1
+
+            for priority in ready:
+                if self.ORDER.index(priority) > self.ORDER.index(chosen):
+                    self._waiting[priority][0].skips += 1
+
+            self._waiting[chosen].popleft().granted = True
+            self._in_flight[chosen] += 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.default) -> Iterator[None]:
+        """Wait for a request to be allowed to go out, and hold its slot while it is in flight.
+
+        Args:
+            priority: Priority class of the request.
+        """
+        start = time.monotonic()
+        ticket = _Ticket()
+        with self._condition:
+            self._waiting[priority].append(ticket)
+            self._dispatch()
+            while not ticket.granted:
+                self._condition.wait()
+            self.stats.served[priority] = self.stats.served.get(priority, 0) + 1
+            self.stats.waited_s[priority] = self.stats.waited_s.get(priority, 0) + time.monotonic() - start
+
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight[priority] -= 1
+                self._dispatch()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state["_condition"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._condition = threading.Condition()
+
+
+class APIResponse:
+    """Outcome of one request to Portall's API, so that status, headers and timing travel with the content instead of being kept in the client."""
+
+    def __init__(self, status_code: int, headers: httpx.Headers, elapsed_s: float, content: Any) -> None:
+        """Build a response.
+
+        Args:
+            status_code: HTTP status code.
+            headers: Response headers.
+            elapsed_s: Time from sending the request to receiving the whole response, in seconds.
+            content: Python object derived from the JSON received, or the actual bytes for raw requests.
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.elapsed_s = elapsed_s
+        self.content = content
+
+    def __repr__(self) -> str:
+        return f"APIResponse(status_code={self.status_code}, elapsed_s={self.elapsed_s:.3f})"
+
+
 class APIClient:
-    """This class holds the direct interface to Portall's API. Other classes may need to use one API client to actually send requests to the API."""
+    """This class holds the direct interface to Portall's API. Other classes may need to use one API client to actually send requests to the API.
 
-    def __init__(self, api_key: Optional[str] = None, batch: Optional[bool] = False, preflight: Optional[bool] = False) -> None:
+    Clients are thread-safe: one client, and its connection pool, can be shared by any number of threads.
+    """
+
+    def __init__(self, api_key: Optional[str] = None, batch: Optional[bool] = False, preflight: Optional[bool] = False, transport: Optional[httpx.BaseTransport] = None, max_requests_per_s: Optional[float] = None, hedging: Optional[HedgingOptions] = None, coalesce: bool = False, credit_scheduler: Optional[CreditScheduler] = None, job: str = DEFAULT_JOB, priority_lanes: Optional[PriorityLaneOptions] = None) -> None:
         """When instantiating an API client, you will provide an API key and optionally opt for batch or preflight modes.
 
         In preflight mode, requests to the API will not be executed. Instead, the API returns the estimated cost in credits for such request.
@@ -36,6 +448,13 @@ class APIClient:
             api_key: API key to use with Portall's API, in case no API key is available via the `PYPORTALL_API_KEY` environment variable. Please contact us if you need one.
             batch: Whether the client will work in batch mode or not.
             preflight: Whether the client will work in preflight mode or not.
+            transport: Custom HTTPX transport to send requests through, e.g. the one provided by [PortallSimulator][pyportall.simulator.PortallSimulator] to work against a local stand-in of Portall's API.
+            max_requests_per_s: Maximum number of requests per second to be sent by all the threads using this client, if any.
+            hedging: Whether and how to hedge requests: when an idempotent request takes longer than usual for its endpoint, a duplicate is sent and whichever answers first is taken. See `hedging_stats` for the outcome.
+            coalesce: Whether identical indicator calls (same endpoint, payload and mode) sent at the same time by several threads share one request, or batch job, and its result. `single_flight.coalesced` counts the calls saved.
+            credit_scheduler: Credit budget that indicator calls must fit in, possibly shared by the clients of several jobs. Calls wait for the budget rather than fail, and their cost is found out with a preflight request unless known. `credit_stats` reports spending.
+            job: Job the credits spent by this client are booked to, so that its quota in the credit budget applies.
+            priority_lanes: In-flight limits by priority class, so that e.g. interactive requests are not stuck behind bulk ones. Requests take the `priority` given to helper methods, and `priority_stats` reports how each class was served.
 
         Raises:
             PyPortallException: Raised if no API key is available either through the `api_key` parameter or the `PYPORTALL_API_KEY` environment variable.
@@ -46,53 +465,205 @@ class APIClient:
         self.batch = batch
         self.preflight = preflight
 
-        self.last_status_code = None
+        self.transport = transport
+        self.http = httpx.Client(transport=transport)
+        self.rate_limiter = RateLimiter(max_requests_per_s) if max_requests_per_s is not None else None
+        self.hedger = Hedger(hedging) if hedging is not None else None
+        self.single_flight = SingleFlight() if coalesce is True else None
+        self.credit_scheduler = credit_scheduler
+        self.job = job
+        self.priority_scheduler = PriorityScheduler(priority_lanes) if priority_lanes is not None else None
 
-    def get(self, endpoint: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Any:
-        """Send GET requests to Portall's API.
+        self._local = threading.local()
+
+    @property
+    def last_status_code(self) -> Optional[int]:
+        """Status code of the last response received by the current thread, if any. Prefer [request][pyportall.api.engine.core.APIClient.request], which returns it along with the response."""
+        return getattr(self._local, "status_code", None)
+
+    @property
+    def hedging_stats(self) -> Optional[HedgingStats]:
+        """What request hedging has done so far, if enabled."""
+        return self.hedger.stats.copy() if self.hedger is not None else None
+
+    @property
+    def credit_stats(self) -> Optional[CreditStats]:
+        """Credits spent so far and time waited for the budget, if a budget is set."""
+        return self.credit_scheduler.stats.copy(deep=True) if self.credit_scheduler is not None else None
+
+    @property
+    def priority_stats(self) -> Optional[PriorityStats]:
+        """Requests served and time waited by priority class, if priority lanes are set."""
+        if self.priority_scheduler is None:
+            return None
+
+        with self.priority_scheduler._condition:
+            return self.priority_scheduler.stats.copy(deep=True)
+
+    def estimate_credits(self, indicator_code: Optional[str], rows: int) -> Optional[int]:
+        """Estimate the cost of an aggregated indicator call from the known credits per geometry of the indicator.
+
+        Args:
+            indicator_code: Code of the indicator to be computed.
+            rows: Number of geometries to be sent.
+
+        Returns:
+            Cost in credits, or None if no budget is set or the indicator cost is unknown.
+        """
+        if self.credit_scheduler is None or indicator_code not in self.credit_scheduler.options.indicator_credits:
+            return None
+
+        return max(self.credit_scheduler.options.indicator_credits[indicator_code] * rows, 1)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Allow clients, and the helpers that hold them, to be sent to other processes, e.g. through a `ProcessPoolExecutor`.
+
+        Connection pools cannot be pickled, so a new one is created on the other end. Custom transports, if any, must be picklable.
+
+        Returns:
+            The state of the client, without the HTTPX client.
+        """
+        state = self.__dict__.copy()
+        del state["http"]
+        del state["_local"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore a client sent from another process, with its own connection pool.
+
+        Args:
+            state: State of the client, as returned by `__getstate__`.
+        """
+        self.__dict__.update(state)
+        self.http = httpx.Client(transport=self.transport)
+        self._local = threading.local()
+
+    def request(self, method: str, endpoint: str, body: Optional[Union[str, Iterable[bytes]]] = None, params: Optional[Dict] = None, headers: Optional[Dict] = None, raw: bool = False, priority: Priority = Priority.default) -> APIResponse:
+        """Send requests to Portall's API.
 
         Args:
+            method: HTTP method.
             endpoint: URL to send the request to.
+            body: JSON string, or an iterable of byte chunks that make up a JSON document, to be streamed, if any.
             params: Parameters to be sent as part of the final URL.
-            headers: Headers to be added to the request, if any.
+            headers: Headers to be added to the request, apart from content-type.
+            raw: Whether to keep the response body as is, instead of decoding it.
+            priority: Priority class of the request, when priority lanes are set.
 
         Returns:
-            The Python object derived from the JSON received by the API.
+            The response, with its status code, headers and timing.
 
         Raises:
             AuthError: Authentication has failed, probably because of a wrong API key.
             PyPortallException: Generic API exception.
             RateLimitError: The request cannot be fulfilled because either the company credit has run out or the maximum number of allowed requests per second has been exceeded.
             TimeoutError: Request has timed out.
+            UnsupportedError: The API cannot apply partial updates to this resource (PATCH only).
+            ValidationError: The format of the request is not valid.
         """
-        params = params or {}
+        params = dict(params or {})
         params["apikey"] = self.api_key
 
-        headers = headers or {}
+        headers = dict(headers or {})
+        if body is not None:
+            headers["content-type"] = "application/json"
+
+        with self.priority_scheduler.slot(priority) if self.priority_scheduler is not None else nullcontext():
+            start = time.perf_counter()
+            if self.hedger is not None and self.hedger.eligible(method, endpoint, body, params):
+                response = self._send_hedged(method, endpoint, body, params, headers)
+                self.hedger.record(endpoint, time.perf_counter() - start)
+            else:
+                response = self._send(method, endpoint, body, params, headers)
+            elapsed_s = time.perf_counter() - start
+
+        self._local.status_code = response.status_code
+        if response.status_code in SUCCESS_STATUS_CODES[method]:
+            content = None if response.status_code == 204 else response.content if raw is True else response.json()
+            return APIResponse(response.status_code, response.headers, elapsed_s, content)
+        elif response.status_code == 401:
+            raise AuthError("Wrong API key")
+        elif method == "PATCH" and response.status_code in (405, 501):
+            raise UnsupportedError(response.text)
+        elif response.status_code == 422 and method != "GET":
+            raise ValidationError(response.json()["detail"])
+        elif response.status_code == 429:
+            raise RateLimitError(response.json()["detail"])
+        else:
+            raise PyPortallException(response.json() if method == "GET" else response.text)
+
+    def _send(self, method: str, endpoint: str, body: Optional[Union[str, Iterable[bytes]]], params: Dict, headers: Dict) -> httpx.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
 
         try:
-            response = httpx.get(endpoint, params=params, headers=headers)
+            return self.http.request(method, endpoint, params=params, headers=headers, content=_encode_body(body) if body is not None else None)
         except httpx.ReadTimeout:
+            if method == "DELETE":
+                raise TimeoutError("API is timing out. This is not a common thing for delete operations, so there is probably something else going on.")
             raise TimeoutError("API is timing out. If this endpoint supports batch-enabled requests, you should probably try that.")
 
-        self.last_status_code = response.status_code
-        if self.last_status_code in (200, 202):
-            return response.json()
-        elif self.last_status_code == 401:
-            raise AuthError("Wrong API key")
-        elif self.last_status_code == 429:
-            raise RateLimitError(response.json()["detail"])
-        else:
-            raise PyPortallException(response.json())
+    def _send_hedged(self, method: str, endpoint: str, body: Optional[str], params: Dict, headers: Dict) -> httpx.Response:
+        """Send a request and, if it is slower than usual for its endpoint, a duplicate, returning whichever response arrives first.
+
+        The request gets a thread of its own, so that the hedging pool only bounds the number of duplicates in flight, not that of requests. Synchronous HTTPX requests cannot be interrupted, so the slower copy is left to finish in the background and its response is discarded.
+        """
+        self.hedger.count(requests=1)
+        delay = self.hedger.delay(endpoint)
+        if delay is None:
+            return self._send(method, endpoint, body, params, headers)
+
+        primary: Future = Future()
+        threading.Thread(target=_fulfil, args=(primary, self._send, method, endpoint, body, params, headers), name="pyportall-hedging-primary", daemon=True).start()
+        if wait([primary], timeout=delay).done or not self.hedger.allow():
+            return primary.result()
+
+        hedge = self.hedger.executor.submit(self._send, method, endpoint, body, params, headers)
+        done, _ = wait([primary, hedge], return_when=FIRST_COMPLETED)
+        winner, loser = (primary, hedge) if primary in done else (hedge, primary)
+
+        try:
+            response = winner.result()
+        except PyPortallException:
+            # The other copy may still make it in time
+            return loser.result()
+
+        if winner is hedge:
+            self.hedger.count(hedge_wins=1)
+
+        return response
+
+    def get(self, endpoint: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, raw: bool = False, priority: Priority = Priority.default) -> Any:
+        """Send GET requests to Portall's API.
+
+        Args:
+            endpoint: URL to send the request to.
+            params: Parameters to be sent as part of the final URL.
+            headers: Headers to be added to the request, if any.
+            raw: Whether to return the response body as is, instead of decoding it.
+            priority: Priority class of the request, when priority lanes are set.
 
-    def post(self, endpoint: str, body: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Any:
+        Returns:
+            The Python object derived from the JSON received by the API, or the actual bytes received if `raw` is set.
+
+        Raises:
+            AuthError: Authentication has failed, probably because of a wrong API key.
+            PyPortallException: Generic API exception.
+            RateLimitError: The request cannot be fulfilled because either the company credit has run out or the maximum number of allowed requests per second has been exceeded.
+            TimeoutError: Request has timed out.
+        """
+        return self.request("GET", endpoint, params=params, headers=headers, priority=priority, raw=raw).content
+
+    def post(self, endpoint: str, body: Union[str, Iterable[bytes]], params: Optional[Dict] = None, headers: Optional[Dict] = None, priority: Priority = Priority.default) -> Any:
         """Send POST requests to Portall's API.
 
         Args:
             endpoint: URL to send the request to.
-            body: JSON string.
+            body: JSON string, or an iterable of byte chunks that make up a JSON document, to be streamed.
             params: Parameters to be sent as part of the final URL.
             headers: Headers to be added to the request, apart from content-type.
+            priority: Priority class of the request, when priority lanes are set.
 
         Returns:
             The Python object derived from the JSON received by the API.
@@ -104,37 +675,17 @@ class APIClient:
             TimeoutError: Request has timed out.
             ValidationError: The format of the request is not valid.
         """
-        params = params or {}
-        params["apikey"] = self.api_key
-
-        headers = headers or {}
-        headers["content-type"] = "application/json"
-
-        try:
-            response = httpx.post(endpoint, params=params, headers=headers, content=body.encode("utf8"))
-        except httpx.ReadTimeout:
-            raise TimeoutError("API is timing out. If this endpoint supports batch-enabled requests, you should probably try that.")
+        return self.request("POST", endpoint, body=body, params=params, headers=headers, priority=priority).content
 
-        self.last_status_code = response.status_code
-        if self.last_status_code in (200, 201, 202):
-            return response.json()
-        elif self.last_status_code == 401:
-            raise AuthError("Wrong API key")
-        elif self.last_status_code == 422:
-            raise ValidationError(response.json()["detail"])
-        elif self.last_status_code == 429:
-            raise RateLimitError(response.json()["detail"])
-        else:
-            raise PyPortallException(response.text)
-
-    def put(self, endpoint: str, body: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> Any:
+    def put(self, endpoint: str, body: Union[str, Iterable[bytes]], params: Optional[Dict] = None, headers: Optional[Dict] = None, priority: Priority = Priority.default) -> Any:
         """Send PUT requests to Portall's API.
 
         Args:
             endpoint: URL to send the request to.
-            body: JSON string.
+            body: JSON string, or an iterable of byte chunks that make up a JSON document, to be streamed.
             params: Parameters to be sent as part of the final URL.
             headers: Headers to be added to the request, apart from content-type.
+            priority: Priority class of the request, when priority lanes are set.
 
         Returns:
             The Python object derived from the JSON received by the API.
@@ -146,36 +697,39 @@ class APIClient:
             TimeoutError: Request has timed out.
             ValidationError: The format of the request is not valid.
         """
-        params = params or {}
-        params["apikey"] = self.api_key
+        return self.request("PUT", endpoint, body=body, params=params, headers=headers, priority=priority).content
 
-        headers = headers or {}
-        headers["content-type"] = "application/json"
+    def patch(self, endpoint: str, body: Union[str, Iterable[bytes]], params: Optional[Dict] = None, headers: Optional[Dict] = None, priority: Priority = Priority.default) -> Any:
+        """Send PATCH requests to Portall's API.
 
-        try:
-            response = httpx.put(endpoint, params=params, headers=headers, content=body.encode("utf8"))
-        except httpx.ReadTimeout:
-            raise TimeoutError("API is timing out. If this endpoint supports batch-enabled requests, you should probably try that.")
+        Args:
+            endpoint: URL to send the request to.
+            body: JSON string, or an iterable of byte chunks that make up a JSON document, to be streamed.
+            params: Parameters to be sent as part of the final URL.
+            headers: Headers to be added to the request, apart from content-type.
+            priority: Priority class of the request, when priority lanes are set.
 
-        self.last_status_code = response.status_code
-        if self.last_status_code in (200, 201, 202):
-            return response.json()
-        elif self.last_status_code == 401:
-            raise AuthError("Wrong API key")
-        elif self.last_status_code == 422:
-            raise ValidationError(response.json()["detail"])
-        elif self.last_status_code == 429:
-            raise RateLimitError(response.json()["detail"])
-        else:
-            raise PyPortallException(response.text)
+        Returns:
+            The Python object derived from the JSON received by the API.
+
+        Raises:
+            AuthError: Authentication has failed, probably because of a wrong API key.
+            PyPortallException: Generic API exception.
+            RateLimitError: The request cannot be fulfilled because either the company credit has run out or the maximum number of allowed requests per second has been exceeded.
+            TimeoutError: Request has timed out.
+            UnsupportedError: The API cannot apply partial updates to this resource.
+            ValidationError: The format of the request is not valid.
+        """
+        return self.request("PATCH", endpoint, body=body, params=params, headers=headers, priority=priority).content
 
-    def delete(self, endpoint: str, params: Optional[Dict] = None, headers: Optional[Dict] = None) -> None:
+    def delete(self, endpoint: str, params: Optional[Dict] = None, headers: Optional[Dict] = None, priority: Priority = Priority.default) -> None:
         """Send DELETE requests to Portall's API.
 
         Args:
             endpoint: URL to send the request to.
             params: Parameters to be sent as part of the final URL.
             headers: Headers to be added to the request, if any.
+            priority: Priority class of the request, when priority lanes are set.
 
         Raises:
             AuthError: Authentication has failed, probably because of a wrong API key.
@@ -183,34 +737,18 @@ class APIClient:
             RateLimitError: The request cannot be fulfilled because either the company credit has run out or the maximum number of allowed requests per second has been exceeded.
             TimeoutError: Request has timed out.
         """
-        params = params or {}
-        params["apikey"] = self.api_key
+        self.request("DELETE", endpoint, params=params, headers=headers, priority=priority)
 
-        headers = headers or {}
-
-        try:
-            response = httpx.delete(endpoint, params=params, headers=headers)
-        except httpx.ReadTimeout:
-            raise TimeoutError("API is timing out. This is not a common thing for delete operations, so there is probably something else going on.")
-
-        self.last_status_code = response.status_code
-        if self.last_status_code == 204:
-            return
-        elif self.last_status_code == 401:
-            raise AuthError("Wrong API key")
-        elif self.last_status_code == 429:
-            raise RateLimitError(response.json()["detail"])
-        else:
-            raise PyPortallException(response.text)
-
-    def call_indicators(self, url: str, input: Any) -> Any:
+    def call_indicators(self, url: str, input: Any, credits: Optional[int] = None, priority: Priority = Priority.default) -> Any:
         """Send requests to Portall's indicator API.
 
         Takes an arbitrary object and, as long as it can be transformed into a JSON string, sends it to the indicator API. It deals with preflight and batch mode according to the settings defined upon creation of the client.
 
         Args:
             url: URL of the specific API endpoint in question.
-            input: Any python object that can be encoded to a JSON string.
+            input: Any python object that can be encoded to a JSON string, or an already encoded JSON string, to be sent as is.
+            credits: Cost of the call, if known, when a credit budget is set. A preflight request finds it out otherwise.
+            priority: Priority class of the call, when priority lanes are set.
 
         Returns:
             The Python object derived from the JSON received by the API.
@@ -231,30 +769,48 @@ class APIClient:
         if self.batch is True:
             query_params["batch"] = True
 
-        response_json = self.post(url, params=query_params, body=json.dumps(jsonable_encoder(input)))
+        body = input if isinstance(input, str) else json.dumps(jsonable_encoder(input))
+
+        if self.single_flight is not None:
+            key = hashlib.sha1(json.dumps([url, query_params]).encode("utf8") + body.encode("utf8")).hexdigest()
+            return self.single_flight.do(key, lambda: self._call_indicators(url, body, query_params, credits, priority))
+
+        return self._call_indicators(url, body, query_params, credits, priority)
+
+    def _call_indicators(self, url: str, body: str, query_params: Dict[str, Any], credits: Optional[int], priority: Priority) -> Any:
+        # Credits are booked here, so that calls merged into one in flight are only charged for the request actually sent
+        if self.credit_scheduler is not None and self.preflight is not True:
+            if credits is None:
+                credits = Preflight(**self.request("POST", url, body=body, params={"preflight": True}, priority=priority).content).detail
+            self.credit_scheduler.acquire(credits, self.job)
 
-        if self.last_status_code == 200:
+        response = self.request("POST", url, body=body, params=query_params, priority=priority)
+
+        if response.status_code == 200:
             if self.preflight:
-                raise PreFlightException(Preflight(**response_json).detail)
-            return response_json
-        elif self.last_status_code == 202:
-            job_url = response_json["detail"]
+                raise PreFlightException(Preflight(**response.content).detail)
+            return response.content
+        elif response.status_code == 202:
+            job_url = response.content["detail"]
 
             while True:
-                response_json = self.get(job_url)
+                response = self.request("GET", job_url, priority=priority)
 
-                if self.last_status_code == 200:
-                    return response_json
-                elif self.last_status_code == 202:
-                    sleep(BATCH_DELAY_S)
+                if response.status_code == 200:
+                    return response.content
+                elif response.status_code == 202:
+                    time.sleep(BATCH_DELAY_S)
                 else:
                     raise BatchError("Batch job is not available, probably because of an error or because the batch timeout has expired")
         else:
-            raise PyPortallException(self.last_status_code)
+            raise PyPortallException(response.status_code)
 
-    def call_metadata(self) -> Any:
+    def call_metadata(self, priority: Priority = Priority.default) -> Any:
         """Send requests to Portall's metadata API.
 
+        Args:
+            priority: Priority class of the request, when priority lanes are set.
+
         Returns:
             The Python object derived from the JSON received by the API.
 
@@ -262,7 +818,7 @@ class APIClient:
             PyPortallException: Generic API exception.
         """
 
-        return self.get(ENDPOINT_METADATA)
+        return self.get(ENDPOINT_METADATA, priority=priority)
 
 
 class APIHelper:
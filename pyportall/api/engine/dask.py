@@ -0,0 +1,171 @@
+"""Module where the Dask-GeoPandas helpers live.
+
+These helpers mirror the ones in [pyportall.api.engine.geopandas][pyportall.api.engine.geopandas], but take [dask-geopandas](https://dask-geopandas.readthedocs.io) GeoDataFrames and resolve them one partition at a time, on the Dask workers. They require the `dask-geopandas` package (`pip install pyportall[dask]`).
+"""
+
+import uuid
+import pandas as pd
+import geopandas as gpd
+from typing import Any, Dict, Optional
+
+try:
+    import dask_geopandas
+except ImportError:  # pragma: no cover
+    dask_geopandas = None
+
+from pyportall.api.engine import geopandas as helpers
+from pyportall.api.engine.core import APIClient, APIHelper, RateLimiter
+from pyportall.api.models.indicators import Indicator, Moment
+from pyportall.api.models.lbs import GeocodingOptions, IsolineOptions, IsovistOptions
+from pyportall.api.models.scheduling import Priority
+from pyportall.exceptions import PyPortallException
+
+
+# Clients and rate limiters are created once per worker process, and shared by the threads of each worker
+_clients: Dict[str, APIClient] = {}
+_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def _resolve_partition(partition: pd.DataFrame, token: str, client: APIClient, max_requests_per_s: Optional[float], helper_class: type, method: str, meta: pd.DataFrame, kwargs: Dict[str, Any]) -> gpd.GeoDataFrame:
+    """Resolve one partition with a regular helper, on a Dask worker.
+
+    Args:
+        partition: Partition to be resolved.
+        token: Id. of the Dask helper, so that workers reuse the same client and rate limiter for it.
+        client: API client, used the first time the worker sees `token`.
+        max_requests_per_s: Maximum number of requests per second for the worker, if any.
+        helper_class: Regular helper class to be used.
+        method: Name of the helper method to be called.
+        meta: Empty frame with the expected output columns and dtypes.
+        kwargs: Arguments to be passed to the helper method.
+
+    Returns:
+        The resolved partition, with the original index and the columns in `meta`.
+    """
+    if len(partition) == 0:
+        return meta
+
+    client = _clients.setdefault(token, client)
+    if max_requests_per_s is not None:
+        _rate_limiters.setdefault(token, RateLimiter(max_requests_per_s)).acquire()
+
+    resolved = getattr(helper_class(client), method)(partition, **kwargs)
+    resolved.index = partition.index
+    if isinstance(meta, gpd.GeoDataFrame) and resolved.geometry.name != meta.geometry.name:
+        resolved = resolved.rename_geometry(meta.geometry.name)
+
+    return resolved[list(meta.columns)].astype(meta.dtypes.to_dict())
+
+
+class DaskHelper(APIHelper):
+    """Ensure a common structure for helpers that work on Dask-GeoPandas GeoDataFrames."""
+
+    helper_class: type = APIHelper
+
+    def __init__(self, client: APIClient, max_requests_per_s: Optional[float] = None, workers: int = 1) -> None:
+        """Class constructor to attach the corresponding API client and rate limit.
+
+        Args:
+            client: API client object that the helper will use to actually send requests to the API. It is sent once to each worker, which keeps its own copy.
+            max_requests_per_s: Maximum number of requests per second for the whole cluster, if any.
+            workers: Number of worker processes the cluster has, so that each of them gets an even share of `max_requests_per_s`. Threads within a worker share the same limit.
+
+        Raises:
+            PyPortallException: Raised if dask-geopandas is not installed.
+        """
+        if dask_geopandas is None:
+            raise PyPortallException("dask-geopandas is required to use the Dask helpers")
+
+        super().__init__(client)
+
+        self.max_requests_per_s = max_requests_per_s / workers if max_requests_per_s is not None else None
+        self.token = str(uuid.uuid4())
+
+    def _map_partitions(self, ddf: Any, method: str, meta: Optional[pd.DataFrame], **kwargs: Any) -> Any:
+        if meta is None:
+            # One row is resolved right away to find out the output schema
+            meta = getattr(self.helper_class(self.client), method)(ddf.head(1), **kwargs).iloc[:0]
+
+        return ddf.map_partitions(_resolve_partition, self.token, self.client, self.max_requests_per_s, self.helper_class, method, meta, kwargs, meta=meta)
+
+
+class GeocodingHelper(DaskHelper):
+    """Help with street addresses, one partition at a time."""
+
+    helper_class = helpers.GeocodingHelper
+
+    def resolve(self, ddf: Any, options: Optional[GeocodingOptions] = None, meta: Optional[pd.DataFrame] = None, priority: Priority = Priority.default) -> Any:
+        """Find latitude and longitude for a number of street addresses.
+
+        Args:
+            ddf: Dask DataFrame with street addresses, as expected by [GeocodingHelper.resolve][pyportall.api.engine.geopandas.GeocodingHelper.resolve].
+            options: Default values for the columns of the DataFrame, when they are not present.
+            meta: Empty frame with the output columns and dtypes. If not given, the first row is resolved right away to find them out.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A lazy dask-geopandas GeoDataFrame, partitioned like the original one.
+        """
+        return self._map_partitions(ddf, "resolve", meta, options=options, priority=priority)
+
+
+class IsovistHelper(DaskHelper):
+    """Help with isovists, one partition at a time."""
+
+    helper_class = helpers.IsovistHelper
+
+    def resolve(self, ddf: Any, options: Optional[IsovistOptions] = None, meta: Optional[pd.DataFrame] = None, priority: Priority = Priority.default) -> Any:
+        """Find isovists (space visible from a given point in space).
+
+        Args:
+            ddf: dask-geopandas GeoDataFrame with points, as expected by [IsovistHelper.resolve][pyportall.api.engine.geopandas.IsovistHelper.resolve].
+            options: Default values for the columns of the GeoDataFrame, when they are not present.
+            meta: Empty frame with the output columns and dtypes. If not given, the first row is resolved right away to find them out.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A lazy dask-geopandas GeoDataFrame, partitioned like the original one.
+        """
+        return self._map_partitions(ddf, "resolve", meta, options=options, priority=priority)
+
+
+class IsolineHelper(DaskHelper):
+    """Help with isolines, one partition at a time."""
+
+    helper_class = helpers.IsolineHelper
+
+    def resolve(self, ddf: Any, options: Optional[IsolineOptions] = None, meta: Optional[pd.DataFrame] = None, priority: Priority = Priority.default) -> Any:
+        """Find isolines (space that can be reached in a certain amount of time from a given point in space).
+
+        Args:
+            ddf: dask-geopandas GeoDataFrame with points, as expected by [IsolineHelper.resolve][pyportall.api.engine.geopandas.IsolineHelper.resolve].
+            options: Default values for the columns of the GeoDataFrame, when they are not present.
+            meta: Empty frame with the output columns and dtypes. If not given, the first row is resolved right away to find them out.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A lazy dask-geopandas GeoDataFrame, partitioned like the original one.
+        """
+        return self._map_partitions(ddf, "resolve", meta, options=options, priority=priority)
+
+
+class IndicatorHelper(DaskHelper):
+    """Help with indicators, one partition at a time."""
+
+    helper_class = helpers.IndicatorHelper
+
+    def resolve_aggregated(self, ddf: Any, indicator: Optional[Indicator] = None, moment: Optional[Moment] = None, priority: Priority = Priority.default) -> Any:
+        """Find the value of an aggregated indicator for a number of target geometries in a particular moment in time.
+
+        Args:
+            ddf: dask-geopandas GeoDataFrame whose active geometry column stands for the geometries to be used on the calculations.
+            indicator: The indicator to be computed.
+            moment: The moment in time that will be used for the calculations.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A lazy dask-geopandas GeoDataFrame, partitioned like the original one, with its columns in the same order and a new column `value` with the computed values for each geometry, as [IndicatorHelper.resolve_aggregated][pyportall.api.engine.geopandas.IndicatorHelper.resolve_aggregated] returns them.
+        """
+        meta = ddf._meta.assign(value=pd.Series(dtype=float))
+
+        return self._map_partitions(ddf, "resolve_aggregated", meta, indicator=indicator, moment=moment, priority=priority)
@@ -1,24 +1,263 @@
 """Module where the (Geo)Pandas helpers live."""
 
 import json
-import httpx
+import threading
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from typing import List, Optional, Union
-from shapely.geometry import Polygon, mapping
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+from shapely.geometry import Polygon, box, mapping
+from shapely.geometry.base import BaseGeometry
+from shapely.ops import unary_union
+import pydantic
 from pydantic.types import UUID4
 
+from pyportall.exceptions import PyPortallException, ValidationError
 from pyportall.utils import jsonable_encoder
-from pyportall.api.engine.core import APIHelper, ENDPOINT_AGGREGATED_INDICATORS, ENDPOINT_DISAGGREGATED_INDICATORS, ENDPOINT_GEOCODING, ENDPOINT_RESOLVE_ISOLINES, ENDPOINT_RESOLVE_ISOVISTS, ENDPOINT_DATAFRAMES
-from pyportall.api.models.geopandas import PortallDataFrame, PortallDataFrameAPI
-from pyportall.api.models.lbs import GeocodingOptions, IsolineOptions, IsovistOptions
-from pyportall.api.models.indicators import Indicator, Moment
+from pyportall.api.engine.core import APIClient, APIHelper, ENDPOINT_AGGREGATED_INDICATORS, ENDPOINT_DISAGGREGATED_INDICATORS, ENDPOINT_GEOCODING, ENDPOINT_RESOLVE_ISOLINES, ENDPOINT_RESOLVE_ISOVISTS, ENDPOINT_DATAFRAMES, MAX_WORKERS
+from pyportall.api.models.geojson import Validation
+from pyportall.api.models.geopandas import PortallDataFrame, PortallDataFrameAPI, PortallDataFrameHandle
+from pyportall.api.models.lbs import GeocodingOptions, IsolineMode, IsolineOptions, IsovistOptions
+from pyportall.api.models.indicators import Indicator, Moment, Normalization
+from pyportall.api.models.scheduling import Priority
+
+
+MAX_TILE_DEPTH = 10
+CHUNK_ROWS = 1000
+
+# Rough server-side cost of isolines and isovists, relative to a reference one (a 10-minute car isoline, a 150 m, 360-ray isovist)
+ISOLINE_SPEEDS_M_S = {IsolineMode.car.value: 10.0, IsolineMode.truck.value: 7.0, IsolineMode.pedestrian.value: 1.4}
+ISOLINE_REFERENCE_M = 6000
+ISOVIST_REFERENCE_M = 150
+ISOVIST_REFERENCE_RAYS = 360
+
+# Columns each endpoint actually reads besides the active geometry, anything else stays on the client
+GEOCODING_COLUMNS = ["street"] + list(GeocodingOptions.__fields__)
+ISOVIST_COLUMNS = list(IsovistOptions.__fields__)
+ISOLINE_COLUMNS = list(IsolineOptions.__fields__)
+INDICATOR_COLUMNS: List[str] = []
+
+
+def _encode_columns(df: pd.DataFrame, columns: List[str]) -> Dict[str, list]:
+    """Encode the given columns of a DataFrame, when present, as one array per column, with missing values as nulls."""
+    projected = df[[column for column in columns if column in df.columns]]
+
+    return jsonable_encoder(projected.astype(object).where(projected.notna(), None).to_dict(orient="list"))
+
+
+def _encode_features(gdf: gpd.GeoDataFrame, columns: List[str]) -> str:
+    """Encode the active geometry and the given columns of a GeoDataFrame, when present, as a GeoJSON feature collection without feature ids."""
+    return gdf[[gdf.geometry.name] + [column for column in columns if column in gdf.columns and column != gdf.geometry.name]].to_json(drop_id=True)
+
+
+def _reattach(resolved: gpd.GeoDataFrame, df: pd.DataFrame, sent_columns: List[str]) -> gpd.GeoDataFrame:
+    """Add the columns of the original (Geo)DataFrame that were not sent to the API back to the resolved GeoDataFrame, by position.
+
+    The resolved geometry takes the name of the active geometry of the original frame, if any. Original columns keep their order, with the geometry first if the original frame had none, and columns that come from the API go last.
+    """
+    geometry_name = df.geometry.name if isinstance(df, gpd.GeoDataFrame) else resolved.geometry.name
+    if geometry_name != resolved.geometry.name:
+        resolved = resolved.rename_geometry(geometry_name)
+
+    untouched = [column for column in df.columns if column not in sent_columns and column not in resolved.columns]
+    if not untouched or len(resolved) != len(df):
+        return resolved
+
+    for column in untouched:
+        resolved[column] = df[column].set_axis(resolved.index)
+
+    columns = [column for column in df.columns if column in resolved.columns]
+    if geometry_name not in columns:
+        columns.insert(0, geometry_name)
+
+    return resolved[columns + [column for column in resolved.columns if column not in columns]]
+
+
+def _resolve_chunks(resolve: Callable[[pd.DataFrame], gpd.GeoDataFrame], df: pd.DataFrame, chunk_size: Optional[int] = None, executor: Optional[Executor] = None) -> gpd.GeoDataFrame:
+    """Resolve a (Geo)DataFrame in chunks of rows, possibly through an executor, and put the results back together in order.
+
+    Args:
+        resolve: Function that resolves one chunk. It must be picklable to be used with a `ProcessPoolExecutor`, as bound methods of helpers are.
+        df: (Geo)DataFrame to be resolved.
+        chunk_size: Number of rows per chunk, `CHUNK_ROWS` by default.
+        executor: Executor to resolve chunks with, if any. Encoding and decoding chunks is CPU-bound, so a `ProcessPoolExecutor` scales with cores where threads would not.
+
+    Returns:
+        The concatenation of the resolved chunks, in the original order.
+    """
+    chunk_size = chunk_size or CHUNK_ROWS
+    chunks = [df.iloc[start:start + chunk_size] for start in range(0, len(df), chunk_size)]
+    resolved_chunks = list(executor.map(resolve, chunks) if executor is not None else map(resolve, chunks))
+
+    return pd.concat(resolved_chunks, ignore_index=True) if resolved_chunks else resolve(df)
+
+
+def _iter_chunks(rows: Iterable[Union[Mapping[str, Any], pd.DataFrame]], chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Turn a stream of records or DataFrames into DataFrames of at most `chunk_size` rows.
+
+    Args:
+        rows: Records (e.g. dicts) or DataFrames (e.g. from `pd.read_csv(..., chunksize=...)`).
+        chunk_size: Maximum number of rows per chunk.
+
+    Yields:
+        Chunks, indexed like the DataFrames they come from, or by position in the stream for records.
+    """
+    records: List[Mapping[str, Any]] = []
+    keys: List[int] = []
+    position = 0
+
+    for row in rows:
+        if isinstance(row, pd.DataFrame):
+            if records:
+                yield pd.DataFrame.from_records(records, index=keys)
+                records, keys = [], []
+            for start in range(0, len(row), chunk_size):
+                yield row.iloc[start:start + chunk_size]
+            position += len(row)
+        else:
+            records.append(row)
+            keys.append(position)
+            position += 1
+            if len(records) == chunk_size:
+                yield pd.DataFrame.from_records(records, index=keys)
+                records, keys = [], []
+
+    if records:
+        yield pd.DataFrame.from_records(records, index=keys)
+
+
+def _feature_values(features: Dict[str, Any], rows: int) -> np.ndarray:
+    """Take the `value` property of every feature of an aggregated indicator response, without decoding geometries.
+
+    Raises:
+        PyPortallException: The response does not have one feature per row.
+    """
+    values = np.array([(feature.get("properties") or {}).get("value") for feature in features["features"]], dtype=float)
+    if len(values) != rows:
+        raise PyPortallException(f"Expected {rows} values, got {len(values)}")
+
+    return values
+
+
+def _plan_requests(gdf: gpd.GeoDataFrame, options: Union[IsolineOptions, IsovistOptions], cost: Callable[[Dict[str, Any]], float], chunk_size: int) -> List[np.ndarray]:
+    """Group rows by their effective options and split each group into requests of about the same cost.
+
+    Args:
+        gdf: GeoDataFrame with per-row option columns, if any.
+        options: Fallback options, for rows or columns without their own.
+        cost: Estimated cost of one row, relative to a reference one, given its effective options.
+        chunk_size: Number of reference rows per request.
+
+    Returns:
+        Row positions of each request, most expensive requests first, so that they do not end up last in the queue.
+
+    Raises:
+        ValidationError: The effective options of a row are not valid, as the API would complain about them.
+    """
+    fields = list(options.__fields__)
+    columns = [field for field in fields if field in gdf.columns]
+    fallback = jsonable_encoder(options)
+
+    groups: Dict[str, Tuple[Dict[str, Any], List[int]]] = {}
+    for position, row in enumerate(gdf[columns].astype(object).where(gdf[columns].notna(), None).to_dict(orient="records")):
+        effective = {field: row[field] if row.get(field) is not None else fallback[field] for field in fields}
+        key = json.dumps(jsonable_encoder(effective), sort_keys=True, default=str)
+        if key not in groups:
+            # Validate before anything is sent, rather than have costs estimated, or requests fail, halfway through
+            try:
+                type(options)(**effective)
+            except pydantic.ValidationError as e:
+                raise ValidationError([{**error, "loc": ["body", "gdf", "features", position, "properties", *error["loc"]]} for error in jsonable_encoder(e.errors())])
+        groups.setdefault(key, (effective, []))[1].append(position)
+
+    requests: List[Tuple[float, np.ndarray]] = []
+    for effective, positions in groups.values():
+        row_cost = max(cost(effective), 1e-9)
+        size = int(min(chunk_size, max(1, chunk_size // row_cost)))
+        for start in range(0, len(positions), size):
+            request = np.array(positions[start:start + size])
+            requests.append((row_cost * len(request), request))
+
+    return [request for _, request in sorted(requests, key=lambda request: -request[0])]
+
+
+def _resolve_planned(resolve: Callable[[gpd.GeoDataFrame], gpd.GeoDataFrame], gdf: gpd.GeoDataFrame, plan: List[np.ndarray], max_workers: int) -> gpd.GeoDataFrame:
+    """Resolve the requests of a plan at the same time, and put their rows back in input order.
+
+    Args:
+        resolve: Function that resolves the rows of one request.
+        gdf: GeoDataFrame to be resolved.
+        plan: Row positions of each request.
+        max_workers: Maximum number of requests to be sent at the same time.
+
+    Returns:
+        The resolved rows, in input order, with a fresh index, as `resolve` would return them for the whole GeoDataFrame.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        parts = list(executor.map(lambda positions: resolve(gdf.iloc[positions]), plan))
+
+    resolved = pd.concat(parts, ignore_index=True)
+
+    return resolved.iloc[np.argsort(np.concatenate(plan), kind="stable")].reset_index(drop=True)
+
+
+def _merge_cells(cell_frames: List[gpd.GeoDataFrame]) -> gpd.GeoDataFrame:
+    """Put together disaggregated cells from several requests, keeping each cell once.
+
+    Cells that come in several responses, e.g. those that straddle tile boundaries, get the sum of their shares of the weight, up to 1.
+
+    Args:
+        cell_frames: Cells returned by each request, possibly none.
+
+    Returns:
+        One row per cell, with the columns of `resolve_disaggregated`.
+    """
+    cell_frames = [cells for cells in cell_frames if len(cells) > 0]
+    if not cell_frames:
+        return gpd.GeoDataFrame({"geometry": gpd.GeoSeries(crs="EPSG:4326"), "id": pd.Series(dtype=np.int64), "value": pd.Series(dtype=float), "weight": pd.Series(dtype=float)}, crs="EPSG:4326")
+
+    cells = pd.concat(cell_frames, ignore_index=True)
+    weights = cells.groupby("id", sort=False)["weight"].sum().clip(upper=1)
+    cells = cells.drop_duplicates(subset="id", ignore_index=True)
+
+    return cells.assign(weight=weights.loc[cells["id"]].values)
+
+
+def _quadtree_tiles(polygon: BaseGeometry, max_area: Optional[float] = None, max_vertices: Optional[int] = None, depth: int = 0) -> List[Polygon]:
+    """Split a (multi)polygon into quadrants, recursively, until every piece is small and simple enough.
+
+    Args:
+        polygon: Geometry to be split.
+        max_area: Maximum area of each tile, if any.
+        max_vertices: Maximum number of vertices of each tile, if any.
+        depth: Current recursion depth, tiles are not split beyond `MAX_TILE_DEPTH`.
+
+    Returns:
+        Polygons that together cover the original geometry.
+    """
+    parts = [part for part in getattr(polygon, "geoms", [polygon]) if isinstance(part, Polygon) and not part.is_empty]
+    if len(parts) != 1:
+        return [tile for part in parts for tile in _quadtree_tiles(part, max_area, max_vertices, depth)]
+
+    polygon = parts[0]
+    vertices = len(polygon.exterior.coords) + sum(len(interior.coords) for interior in polygon.interiors)
+    if depth >= MAX_TILE_DEPTH or ((max_area is None or polygon.area <= max_area) and (max_vertices is None or vertices <= max_vertices)):
+        return [polygon]
+
+    min_x, min_y, max_x, max_y = polygon.bounds
+    mid_x, mid_y = (min_x + max_x) / 2, (min_y + max_y) / 2
+    quadrants = [box(min_x, min_y, mid_x, mid_y), box(mid_x, min_y, max_x, mid_y), box(min_x, mid_y, mid_x, max_y), box(mid_x, mid_y, max_x, max_y)]
+
+    return [tile for quadrant in quadrants for tile in _quadtree_tiles(polygon.intersection(quadrant), max_area, max_vertices, depth + 1)]
 
 
 class GeocodingHelper(APIHelper):
     """Help with street addresses."""
 
-    def resolve(self, df: pd.DataFrame, options: Optional[GeocodingOptions] = None) -> gpd.GeoDataFrame:
+    def resolve(self, df: pd.DataFrame, options: Optional[GeocodingOptions] = None, chunk_size: Optional[int] = None, executor: Optional[Executor] = None, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
         """Find latitude and longitude for a number of street addresses.
 
         Turn a DataFrame with street addresses into a GeoDataFrame where the geometry column derives from the corresponding latitude and longitude, once those addresses have been properly geocoded.
@@ -26,20 +265,72 @@ class GeocodingHelper(APIHelper):
         Args:
             df: DataFrame with at least one `street` column that includes full or partial addresses to be geocoded. Even though `street` is the only mandatory column and can contain arbitrary, partial or full addreses, geocoding typically works better if the full address is split into several fields. Therefore, other columns can help improve the accuracy of the geocoding process, namely `country`, `county`, `city`, `district` and `postal_code`.
             options: Default values for the `country`, `county`, `city`, `district` and `postal_code` columns of the DataFrame, when they are not present.
+            chunk_size: Number of rows to be sent per request, if the DataFrame is to be split into several requests.
+            executor: Executor to send chunked requests through, e.g. a `ProcessPoolExecutor` to spread encoding and decoding across cores. Chunks of `CHUNK_ROWS` rows are used if `chunk_size` is not set.
+            priority: Priority class of the requests, when the client has priority lanes.
 
         Returns:
             A GeoDataFrame with all the geocoding columns plus the geometry column with the actual points derived from the geocoding process.
         """
 
-        features = self.client.call_indicators(ENDPOINT_GEOCODING, {"df": df.to_dict(), "options": jsonable_encoder(options)})
+        if chunk_size is not None or executor is not None:
+            return _resolve_chunks(partial(self.resolve, options=options, priority=priority), df, chunk_size, executor)
 
-        return gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
+        features = self.client.call_indicators(ENDPOINT_GEOCODING, {"df": _encode_columns(df, GEOCODING_COLUMNS), "options": jsonable_encoder(options)}, priority=priority)
+
+        return _reattach(gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326"), df, GEOCODING_COLUMNS)
+
+    def resolve_iter(self, rows: Iterable[Union[Mapping[str, Any], pd.DataFrame]], options: Optional[GeocodingOptions] = None, chunk_size: Optional[int] = None, max_workers: int = MAX_WORKERS, ordered: bool = False, priority: Priority = Priority.default) -> Iterator[gpd.GeoDataFrame]:
+        """Find latitude and longitude for a stream of street addresses, one chunk at a time.
+
+        Rows are read lazily and at most `max_workers` chunks are in flight at any time, so memory use does not depend on the number of addresses and results can be written while further requests are being sent.
+
+        Args:
+            rows: Address records (e.g. dicts with a `street` key) or DataFrames (e.g. from `pd.read_csv(..., chunksize=...)`), with the columns described in `resolve`.
+            options: Default values for the `country`, `county`, `city`, `district` and `postal_code` columns, when they are not present.
+            chunk_size: Number of rows to be sent per request, `CHUNK_ROWS` by default.
+            max_workers: Maximum number of requests to be sent at the same time.
+            ordered: Whether to yield chunks in input order instead of as soon as they are resolved.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Yields:
+            GeoDataFrames like the ones returned by `resolve`, indexed like the DataFrames they come from, or by position in the stream for records.
+        """
+
+        def resolve(chunk: pd.DataFrame) -> gpd.GeoDataFrame:
+            resolved = self.resolve(chunk, options=options, priority=priority)
+            resolved.index = chunk.index
+
+            return resolved
+
+        pending: Deque[Future] = deque()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for chunk in _iter_chunks(rows, chunk_size or CHUNK_ROWS):
+                if len(pending) >= max_workers:
+                    yield self._next_done(pending, ordered)
+                pending.append(executor.submit(resolve, chunk))
+
+            while pending:
+                yield self._next_done(pending, ordered)
+
+    @staticmethod
+    def _next_done(pending: Deque[Future], ordered: bool) -> gpd.GeoDataFrame:
+        """Wait for the oldest future, or for whichever finishes first, and take it out of `pending`."""
+        if ordered is True:
+            return pending.popleft().result()
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        future = next(future for future in pending if future in done)
+        pending.remove(future)
+
+        return future.result()
 
 
 class IsovistHelper(APIHelper):
     """Help with isolines."""
 
-    def resolve(self, gdf: gpd.GeoDataFrame, options: Optional[IsovistOptions] = None) -> gpd.GeoDataFrame:
+    def resolve(self, gdf: gpd.GeoDataFrame, options: Optional[IsovistOptions] = None, chunk_size: Optional[int] = None, executor: Optional[Executor] = None, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
         """Find isovists (space visible from a given point in space).
 
         Turn a GeoDataFrame with points and other parameters the define isovists into another GeoDataFrame where the geometry column is formed by the polygons that translate to such isovist definitions.
@@ -47,20 +338,58 @@ class IsovistHelper(APIHelper):
         Args:
             gdf: GeoDataFrame with a `geometry` column with the target points and other columns to help define the isovists, Such columns are `radius_m`, `num_rays`, `heading_deg` and `fov_deg`.
             options: Default values for the `radius_m`, `num_rays`, `heading_deg` and `fov_deg` columns of the original GeoDataFrame, when they are not present.
+            chunk_size: Number of rows to be sent per request, if the GeoDataFrame is to be split into several requests.
+            executor: Executor to send chunked requests through, e.g. a `ProcessPoolExecutor` to spread encoding and decoding across cores. Chunks of `CHUNK_ROWS` rows are used if `chunk_size` is not set.
+            priority: Priority class of the requests, when the client has priority lanes.
 
         Returns:
             A GeoDataFrame with all the isovist definition columns plus a `destination` column with the original points. The geometry column now holds the actual polygons derived from computing the isovists.
         """
 
-        features = self.client.call_indicators(ENDPOINT_RESOLVE_ISOVISTS, {"gdf": json.loads(gdf.to_json()), "options": jsonable_encoder(options)})
+        if chunk_size is not None or executor is not None:
+            return _resolve_chunks(partial(self.resolve, options=options, priority=priority), gdf, chunk_size, executor)
 
-        return gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
+        body = f'{{"gdf": {_encode_features(gdf, ISOVIST_COLUMNS)}, "options": {json.dumps(jsonable_encoder(options))}}}'
+        features = self.client.call_indicators(ENDPOINT_RESOLVE_ISOVISTS, body, priority=priority)
+
+        return _reattach(gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326"), gdf, ISOVIST_COLUMNS)
+
+    def resolve_planned(self, gdf: gpd.GeoDataFrame, options: Optional[IsovistOptions] = None, chunk_size: Optional[int] = None, max_workers: int = MAX_WORKERS, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
+        """Find isovists for rows with heterogeneous options, sending similar rows together in requests sized by their cost.
+
+        Rows are grouped by their effective options (their own columns, or `options` for missing ones), and each group is split into requests of about the same estimated server time, e.g. fewer wide isovists with many rays per request than short, narrow ones. Requests from all groups are sent at the same time, most expensive first, and results are put back in input order.
+
+        Args:
+            gdf: GeoDataFrame as expected by `resolve`.
+            options: Default values for the `radius_m`, `num_rays`, `heading_deg` and `fov_deg` columns of the original GeoDataFrame, when they are not present.
+            chunk_size: Number of 150 m, 360-ray isovist rows per request, `CHUNK_ROWS` by default.
+            max_workers: Maximum number of requests to be sent at the same time.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A GeoDataFrame like the one returned by `resolve`, in the same order as the original one.
+        """
+        if len(gdf) == 0:
+            return self.resolve(gdf, options=options, priority=priority)
+
+        plan = _plan_requests(gdf, options or IsovistOptions(), self._row_cost, chunk_size or CHUNK_ROWS)
+
+        return _resolve_planned(partial(self.resolve, options=options, priority=priority), gdf, plan, max_workers)
+
+    @staticmethod
+    def _row_cost(options: Dict[str, Any]) -> float:
+        """Estimate the cost of an isovist from the number of rays cast and their length, relative to a 150 m, 360-ray isovist."""
+        fov_deg = options["fov_deg"] if options["fov_deg"] is not None else 360
+        num_rays = options["num_rays"] if options["num_rays"] is not None and options["num_rays"] > 0 else fov_deg
+        radius_m = options["radius_m"] if options["radius_m"] is not None else ISOVIST_REFERENCE_M
+
+        return (radius_m / ISOVIST_REFERENCE_M) * (num_rays / ISOVIST_REFERENCE_RAYS)
 
 
 class IsolineHelper(APIHelper):
     """Help with isovists."""
 
-    def resolve(self, gdf: gpd.GeoDataFrame, options: Optional[IsolineOptions] = None) -> gpd.GeoDataFrame:
+    def resolve(self, gdf: gpd.GeoDataFrame, options: Optional[IsolineOptions] = None, chunk_size: Optional[int] = None, executor: Optional[Executor] = None, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
         """Find isolines (space that can be reached in a certain amount of time from a given point in space).
 
         Turn a [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with points and other parameters the define isolines into another [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) where the geometry column is formed by the polygons that translate to such isoline definitions.
@@ -68,80 +397,452 @@ class IsolineHelper(APIHelper):
         Args:
             gdf: [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a `geometry` column with the target points and other columns to help define the isolines, Such columns are `mode`, `range`, and `moment`.
             options: Default values for the `mode`, `range`, and `moment` columns of the original [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe), when they are not present.
+            chunk_size: Number of rows to be sent per request, if the GeoDataFrame is to be split into several requests.
+            executor: Executor to send chunked requests through, e.g. a `ProcessPoolExecutor` to spread encoding and decoding across cores. Chunks of `CHUNK_ROWS` rows are used if `chunk_size` is not set.
+            priority: Priority class of the requests, when the client has priority lanes.
 
         Returns:
             A [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with all the isoline definition columns plus a `destination` column with the original points. The geometry column now holds the actual polygons derived from computing the isolines.
         """
 
-        features = self.client.call_indicators(ENDPOINT_RESOLVE_ISOLINES, {"gdf": json.loads(gdf.to_json()), "options": jsonable_encoder(options)})
+        if chunk_size is not None or executor is not None:
+            return _resolve_chunks(partial(self.resolve, options=options, priority=priority), gdf, chunk_size, executor)
 
-        return gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
+        body = f'{{"gdf": {_encode_features(gdf, ISOLINE_COLUMNS)}, "options": {json.dumps(jsonable_encoder(options))}}}'
+        features = self.client.call_indicators(ENDPOINT_RESOLVE_ISOLINES, body, priority=priority)
+
+        return _reattach(gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326"), gdf, ISOLINE_COLUMNS)
+
+    def resolve_planned(self, gdf: gpd.GeoDataFrame, options: Optional[IsolineOptions] = None, chunk_size: Optional[int] = None, max_workers: int = MAX_WORKERS, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
+        """Find isolines for rows with heterogeneous options, sending similar rows together in requests sized by their cost.
+
+        Rows are grouped by their effective options (their own columns, or `options` for missing ones), and each group is split into requests of about the same estimated server time, e.g. fewer long truck isolines per request than short pedestrian ones. Requests from all groups are sent at the same time, most expensive first, and results are put back in input order.
+
+        Args:
+            gdf: GeoDataFrame as expected by `resolve`.
+            options: Default values for the `mode`, `range_s` and `moment` columns of the original GeoDataFrame, when they are not present.
+            chunk_size: Number of 10-minute car isoline rows per request, `CHUNK_ROWS` by default.
+            max_workers: Maximum number of requests to be sent at the same time.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A GeoDataFrame like the one returned by `resolve`, in the same order as the original one.
+        """
+        if len(gdf) == 0:
+            return self.resolve(gdf, options=options, priority=priority)
+
+        plan = _plan_requests(gdf, options or IsolineOptions(), self._row_cost, chunk_size or CHUNK_ROWS)
+
+        return _resolve_planned(partial(self.resolve, options=options, priority=priority), gdf, plan, max_workers)
+
+    @staticmethod
+    def _row_cost(options: Dict[str, Any]) -> float:
+        """Estimate the cost of an isoline from the area it can cover, relative to a 10-minute car isoline."""
+        car_speed_m_s = ISOLINE_SPEEDS_M_S[IsolineMode.car.value]
+        speed_m_s = ISOLINE_SPEEDS_M_S.get(IsolineMode(options["mode"]).value if options["mode"] is not None else IsolineMode.car.value, car_speed_m_s)
+        range_m = (options["range_s"] or ISOLINE_REFERENCE_M / car_speed_m_s) * speed_m_s
+
+        return (range_m / ISOLINE_REFERENCE_M) ** 2
 
 
 class IndicatorHelper(APIHelper):
     """Help with indicators."""
 
-    def resolve_aggregated(self, gdf: gpd.GeoDataFrame, indicator: Optional[Indicator] = None, moment: Optional[Moment] = None) -> gpd.GeoDataFrame:
+    def resolve_aggregated(self, gdf: gpd.GeoDataFrame, indicator: Optional[Indicator] = None, moment: Optional[Moment] = None, chunk_size: Optional[int] = None, executor: Optional[Executor] = None, priority: Priority = Priority.default, values_only: bool = False, inplace: bool = False) -> gpd.GeoDataFrame:
         """Find the value of an aggregated indicator for a number of target geometries in a particular moment in time.
 
         Given a moment in time, a number of geometries and a target indicator, find the aggregated indicator value for each of the geometries in the specified moment.
 
+        With `values_only`, only the values are decoded from the response and they are added by position to a shallow copy of the original GeoDataFrame, or to the original GeoDataFrame itself with `inplace`, so that its index, dtypes and geometries are kept as they are.
+
         Args:
             gdf: [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a `geometry` column that stands for the geometries to be used on the calculations.
             indicator: The indicator to be computed.
             moment: The moment in time that will be used for the calculations.
+            chunk_size: Number of rows to be sent per request, if the GeoDataFrame is to be split into several requests.
+            executor: Executor to send chunked requests through, e.g. a `ProcessPoolExecutor` to spread encoding and decoding across cores. Chunks of `CHUNK_ROWS` rows are used if `chunk_size` is not set.
+            priority: Priority class of the requests, when the client has priority lanes.
+            values_only: Whether to decode only the values from the response and add them to the original GeoDataFrame (or a shallow copy of it) by position.
+            inplace: Whether to add the `value` column to the original GeoDataFrame itself, with `values_only`.
 
         Returns:
-            A copy of the original [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a new column `value` with the computed values for each geometry.
+            A copy of the original [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a new column `value` with the computed values for each geometry. With `values_only`, a shallow copy of the original GeoDataFrame, or the original GeoDataFrame itself with `inplace`, indexed as it was.
 
         """
-        features = self.client.call_indicators(ENDPOINT_AGGREGATED_INDICATORS, {"gdf": json.loads(gdf.to_json()), "indicator": jsonable_encoder(indicator), "moment": jsonable_encoder(moment)})
+        if values_only is True:
+            resolve_values = partial(self._resolve_values, indicator=indicator, moment=moment, priority=priority)
+            if chunk_size is not None or executor is not None:
+                chunk_size = chunk_size or CHUNK_ROWS
+                chunks = [gdf.iloc[start:start + chunk_size] for start in range(0, len(gdf), chunk_size)]
+                values = np.concatenate(list(executor.map(resolve_values, chunks) if executor is not None else map(resolve_values, chunks))) if chunks else np.array([], dtype=float)
+            else:
+                values = resolve_values(gdf)
 
-        return gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
+            target = gdf if inplace is True else gdf.copy(deep=False)
+            target["value"] = values
+
+            return target
+
+        if chunk_size is not None or executor is not None:
+            return _resolve_chunks(partial(self.resolve_aggregated, indicator=indicator, moment=moment, priority=priority), gdf, chunk_size, executor)
+
+        features = self.client.call_indicators(ENDPOINT_AGGREGATED_INDICATORS, self._body(_encode_features(gdf, INDICATOR_COLUMNS), indicator, moment), credits=self.client.estimate_credits(indicator.code if indicator is not None else None, len(gdf)), priority=priority)
+
+        return _reattach(gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326"), gdf, INDICATOR_COLUMNS)
+
+    @staticmethod
+    def _body(gdf_json: str, indicator: Optional[Indicator], moment: Optional[Moment]) -> str:
+        """Build the body of an aggregated indicator request around already encoded geometries."""
+        return f'{{"gdf": {gdf_json}, "indicator": {json.dumps(jsonable_encoder(indicator))}, "moment": {json.dumps(jsonable_encoder(moment))}}}'
+
+    def _resolve_values(self, gdf: gpd.GeoDataFrame, indicator: Optional[Indicator] = None, moment: Optional[Moment] = None, priority: Priority = Priority.default, gdf_json: Optional[str] = None) -> np.ndarray:
+        """Find the values of an aggregated indicator, one per row of `gdf`, in order, decoding nothing else from the response.
+
+        Args:
+            gdf: GeoDataFrame with the geometries to be used on the calculations.
+            indicator: The indicator to be computed.
+            moment: The moment in time that will be used for the calculations.
+            priority: Priority class of the request, when the client has priority lanes.
+            gdf_json: Geometries of `gdf`, already encoded, if available.
+
+        Returns:
+            One value per row.
+        """
+        body = self._body(gdf_json if gdf_json is not None else _encode_features(gdf, INDICATOR_COLUMNS), indicator, moment)
+        features = self.client.call_indicators(ENDPOINT_AGGREGATED_INDICATORS, body, credits=self.client.estimate_credits(indicator.code if indicator is not None else None, len(gdf)), priority=priority)
+
+        return _feature_values(features, len(gdf))
+
+    def resolve_timeseries(self, gdf: gpd.GeoDataFrame, indicator: Indicator, moments: Iterable[Moment], max_workers: int = MAX_WORKERS, wide: bool = False, priority: Priority = Priority.default) -> Union[gpd.GeoDataFrame, pd.DataFrame]:
+        """Find the value of an aggregated indicator for a number of target geometries over a series of moments in time.
 
-    def resolve_disaggregated(self, polygon: Polygon, indicator: Indicator, moment: Moment) -> gpd.GeoDataFrame:
+        Geometries are encoded only once, and one request per moment is sent to the API, several of them at the same time. [Moment.product][pyportall.api.models.indicators.Moment.product] helps build the moments, e.g. every hour of every day of the week.
+
+        Args:
+            gdf: [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a `geometry` column that stands for the geometries to be used on the calculations.
+            indicator: The indicator to be computed.
+            moments: The moments in time that will be used for the calculations.
+            max_workers: Maximum number of requests to be sent at the same time.
+            wide: Whether to return one column per moment instead of one row per geometry and moment.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            In long format, a [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) like the one returned by `resolve_aggregated` for each moment, indexed by original row and moment label. In wide format, a copy of the original GeoDataFrame with a new column per moment label with the computed values.
+        """
+        moments = list(moments)
+        labels = [moment.label for moment in moments]
+        if len(set(labels)) < len(labels):
+            raise ValueError("Moments must be unique")
+
+        if wide is True:
+            values = self._resolve_combination_values(gdf, [(indicator, moment) for moment in moments], max_workers, priority)
+            return gdf.assign(**dict(zip(labels, values)))
+
+        resolved_moments = self._resolve_combinations(gdf, [(indicator, moment) for moment in moments], max_workers, priority)
+
+        index_name = gdf.index.name or "row"
+        resolved = pd.concat(resolved_moments, keys=labels, names=["moment", index_name]).swaplevel()
+
+        # Rows come moment by moment, and go back to input order, moments within each row
+        return resolved.iloc[np.arange(len(resolved)).reshape(len(labels), len(gdf)).T.ravel()]
+
+    def resolve_indicators(self, gdf: gpd.GeoDataFrame, indicators: Iterable[Indicator], moment: Optional[Moment] = None, max_workers: int = MAX_WORKERS, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
+        """Find the values of several aggregated indicators for a number of target geometries in a particular moment in time.
+
+        Geometries are encoded only once, and one request per indicator is sent to the API, several of them at the same time.
+
+        Args:
+            gdf: [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a `geometry` column that stands for the geometries to be used on the calculations.
+            indicators: The indicators to be computed, possibly the same code with different normalizations or as a percentage.
+            moment: The moment in time that will be used for the calculations.
+            max_workers: Maximum number of requests to be sent at the same time.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A copy of the original [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a new column per indicator label (e.g. `pop_res` or `pop_res_density_percent`) with the computed values for each geometry.
+        """
+        indicators = list(indicators)
+        labels = [indicator.label for indicator in indicators]
+        if len(set(labels)) < len(labels):
+            raise ValueError("Indicators must be unique")
+
+        values = self._resolve_combination_values(gdf, [(indicator, moment) for indicator in indicators], max_workers, priority)
+
+        return gdf.assign(**dict(zip(labels, values)))
+
+    def _resolve_combinations(self, gdf: gpd.GeoDataFrame, combinations: List[Tuple[Indicator, Optional[Moment]]], max_workers: int, priority: Priority = Priority.default) -> List[gpd.GeoDataFrame]:
+        """Resolve aggregated indicators for several indicator and moment combinations, encoding the geometries only once.
+
+        Args:
+            gdf: GeoDataFrame with the geometries to be used on the calculations.
+            combinations: Indicator and moment pairs to be resolved, one request each.
+            max_workers: Maximum number of requests to be sent at the same time.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            One GeoDataFrame per combination, in the same order, indexed like `gdf`.
+        """
+        gdf_json = _encode_features(gdf, INDICATOR_COLUMNS)
+
+        def resolve(combination: Tuple[Indicator, Optional[Moment]]) -> gpd.GeoDataFrame:
+            indicator, moment = combination
+            features = self.client.call_indicators(ENDPOINT_AGGREGATED_INDICATORS, self._body(gdf_json, indicator, moment), credits=self.client.estimate_credits(indicator.code, len(gdf)), priority=priority)
+            resolved = gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
+            resolved.index = gdf.index
+
+            return _reattach(resolved, gdf, INDICATOR_COLUMNS)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(resolve, combinations))
+
+    def _resolve_combination_values(self, gdf: gpd.GeoDataFrame, combinations: List[Tuple[Indicator, Optional[Moment]]], max_workers: int, priority: Priority = Priority.default) -> List[np.ndarray]:
+        """Like `_resolve_combinations`, but decoding only the values of each combination.
+
+        Returns:
+            One array of values per combination, in the same order, with one value per row of `gdf`.
+        """
+        gdf_json = _encode_features(gdf, INDICATOR_COLUMNS)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda combination: self._resolve_values(gdf, combination[0], combination[1], priority, gdf_json), combinations))
+
+    def resolve_disaggregated(self, polygon: Polygon, indicator: Indicator, moment: Moment, max_tile_area: Optional[float] = None, max_tile_vertices: Optional[int] = None, max_workers: int = MAX_WORKERS, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
         """Find the disaggregated values for an indicator over a target geometry in a particular moment in time.
 
         Given a moment in time, one geometry and a target indicator, find the H3 cells underneath the given geometry and compute the indicator value for each of them.
 
+        Large geometries can be split into tiles, by recursively dividing them in quadrants until they are small and simple enough, so that each request stays well below the API timeout. Tiles are requested at the same time and cells that straddle tile boundaries are merged back.
+
         Args:
             polygon: Geometry to be used on the calculations.
             indicator: The indicator to be computed.
             moment: The moment in time that will be used for the calculations.
+            max_tile_area: Maximum area of each tile, in squared degrees, if the geometry is to be tiled.
+            max_tile_vertices: Maximum number of vertices of each tile, if the geometry is to be tiled.
+            max_workers: Maximum number of tiles to be requested at the same time.
+            priority: Priority class of the requests, when the client has priority lanes.
 
         Returns:
             A [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with one row per H3 cells and columns: `id` with the H3 cell id, `geometry` with the geometry of the H3 cells, `value` with the indicator value for the cell, and `weight`, which is useful if you want to aggregate the data from this disaggregated geodataframe yourself.
 
         """
-        features = self.client.call_indicators(ENDPOINT_DISAGGREGATED_INDICATORS, {"polygon": mapping(polygon), "indicator": jsonable_encoder(indicator), "moment": jsonable_encoder(moment)})
+        if max_tile_area is not None or max_tile_vertices is not None:
+            tiles = _quadtree_tiles(polygon, max_tile_area, max_tile_vertices)
+            if len(tiles) > 1:
+                with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                    tile_cells = list(executor.map(lambda tile: self.resolve_disaggregated(tile, indicator=indicator, moment=moment, priority=priority), tiles))
+
+                # Cells that straddle tile boundaries come once per tile, each with their share of the weight
+                return _merge_cells(tile_cells)
+
+        features = self.client.call_indicators(ENDPOINT_DISAGGREGATED_INDICATORS, {"polygon": mapping(polygon), "indicator": jsonable_encoder(indicator), "moment": jsonable_encoder(moment)}, priority=priority)
 
         return gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
 
+    def resolve_disaggregated_many(self, gdf: gpd.GeoDataFrame, indicator: Indicator, moment: Moment, aggregate: bool = False, max_workers: int = MAX_WORKERS, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
+        """Find the disaggregated values for an indicator over a number of possibly overlapping geometries in a particular moment in time.
+
+        Overlapping geometries are merged so that each H3 cell is requested only once: one request is sent per group of overlapping geometries, several of them at the same time, and cells are then assigned back to every geometry that contains their centroid.
+
+        Args:
+            gdf: [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a `geometry` column that stands for the (multi)polygons to be used on the calculations.
+            indicator: The indicator to be computed.
+            moment: The moment in time that will be used for the calculations.
+            aggregate: Whether to aggregate cell values for each geometry instead of returning the cells themselves.
+            max_workers: Maximum number of requests to be sent at the same time.
+            priority: Priority class of the requests, when the client has priority lanes.
+
+        Returns:
+            A [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) like the one returned by `resolve_disaggregated`, with one row per geometry and H3 cell, indexed like `gdf`. If `aggregate` is set, a copy of the original GeoDataFrame with a new column `value` instead, with the sum of the weighted cell values for `total` indicators and their weighted average for `density` or percent ones.
+        """
+        union = unary_union(gdf.geometry.values)
+        areas = list(getattr(union, "geoms", [union]))
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            area_cells = list(executor.map(lambda area: self.resolve_disaggregated(area, indicator=indicator, moment=moment, priority=priority), areas))
+
+        cells = _merge_cells(area_cells)
+        centroids = cells.geometry.set_crs(None, allow_override=True).centroid  # Planar centroids are fine for cells as small as H3 ones
+        rows, cell_positions = centroids.sindex.query(gdf.geometry.values, predicate="contains")
+
+        assigned_cells = cells.iloc[cell_positions].set_axis(gdf.index[rows]).astype({"value": float, "weight": float})
+
+        if aggregate is False:
+            return assigned_cells
+
+        weighted_values = (assigned_cells["value"] * assigned_cells["weight"]).groupby(level=0, sort=False).sum()
+        if indicator.normalization == Normalization.density or indicator.percent is True:
+            weighted_values /= assigned_cells["weight"].groupby(level=0, sort=False).sum()
+
+        return gdf.assign(value=weighted_values.reindex(gdf.index))
+
+
+class _MicroBatch:
+    """Small requests waiting to be sent together."""
+
+    def __init__(self) -> None:
+        self.requests: List[Tuple[gpd.GeoDataFrame, Future]] = []
+        self.rows = 0
+        self.full = threading.Event()
+
+
+class IndicatorBatcher(APIHelper):
+    """Help with many small, concurrent aggregated indicator requests, by sending them together.
+
+    Requests for the same indicator and moment that arrive within a short window, e.g. from the threads of a web server, are combined into a single API call, and each caller gets its own rows back.
+    """
+
+    def __init__(self, client: APIClient, max_delay_s: float = 0.01, max_rows: int = CHUNK_ROWS) -> None:
+        """Class constructor to attach the corresponding API client and batching window.
+
+        Args:
+            client: API client object that the helper will use to actually send requests to the API.
+            max_delay_s: Maximum time the first request of a batch waits for others to join.
+            max_rows: Number of rows that makes a batch be sent right away.
+        """
+        super().__init__(client)
+
+        self.max_delay_s = max_delay_s
+        self.max_rows = max_rows
+
+        self._batches: Dict[Tuple[str, str, Priority], _MicroBatch] = {}
+        self._lock = threading.Lock()
+
+    def resolve_aggregated(self, gdf: gpd.GeoDataFrame, indicator: Optional[Indicator] = None, moment: Optional[Moment] = None, priority: Priority = Priority.default) -> gpd.GeoDataFrame:
+        """Find the value of an aggregated indicator for a number of target geometries in a particular moment in time, along with other concurrent requests.
+
+        Blocks until the batch the request joins has been resolved, which takes `max_delay_s` longer at most.
+
+        Args:
+            gdf: [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a `geometry` column that stands for the geometries to be used on the calculations.
+            indicator: The indicator to be computed.
+            moment: The moment in time that will be used for the calculations.
+            priority: Priority class of the batch request, when the client has priority lanes. Requests with different priorities are batched separately.
+
+        Returns:
+            A copy of the original [GeoDataFrame](https://geopandas.org/data_structures.html#geodataframe) with a new column `value` with the computed values for each geometry.
+        """
+        key = (json.dumps(jsonable_encoder(indicator)), json.dumps(jsonable_encoder(moment)), priority)
+        future: Future = Future()
+
+        with self._lock:
+            batch = self._batches.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._batches[key] = _MicroBatch()
+            batch.requests.append((gdf, future))
+            batch.rows += len(gdf)
+            if batch.rows >= self.max_rows:
+                # Full batches stop taking requests, so that the next one starts a new batch
+                del self._batches[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.max_delay_s)
+            with self._lock:
+                if self._batches.get(key) is batch:
+                    del self._batches[key]
+            self._send(batch, indicator, moment, priority)
+
+        return future.result()
+
+    def _send(self, batch: _MicroBatch, indicator: Optional[Indicator], moment: Optional[Moment], priority: Priority) -> None:
+        try:
+            geometries = gpd.GeoDataFrame(geometry=pd.concat([gdf.geometry for gdf, _ in batch.requests], ignore_index=True), crs="EPSG:4326")
+            values = IndicatorHelper(self.client)._resolve_values(geometries, indicator=indicator, moment=moment, priority=priority)
+        except BaseException as e:
+            for _, future in batch.requests:
+                future.set_exception(e)
+            return
+
+        ends = np.cumsum([len(gdf) for gdf, _ in batch.requests])
+        for (gdf, future), end in zip(batch.requests, ends):
+            future.set_result(gdf.assign(value=values[end - len(gdf):end]))
+
 
 class PortallDataFrameHelper(APIHelper):
     """Help with Portall's GeoDataFrame wrappers."""
 
-    def all(self) -> List[PortallDataFrame]:
+    def iter(self, page_size: int = 100, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> Iterator[PortallDataFrameHandle]:
+        """Iterate over the dataframes available in Portall's database, one page at a time.
+
+        Only the id., name and description of each dataframe are requested; features are downloaded when the returned handles are first accessed.
+
+        Args:
+            page_size: Number of dataframes to be requested at once.
+            validation: How to validate the GeoJSON received from Portall when dataframes are downloaded.
+            columnar: Whether to decode the GeoJSON received from Portall through a columnar feature collection when dataframes are downloaded.
+            priority: Priority class of the requests, listing and downloads alike, when the client has priority lanes.
+
+        Yields:
+            Lightweight handles to the dataframes.
+        """
+
+        seen = set()
+        offset = 0
+
+        while True:
+            page = self.client.get(ENDPOINT_DATAFRAMES, params={"summary": True, "offset": offset, "limit": page_size}, priority=priority)
+            new = [pdf_api_json for pdf_api_json in page if pdf_api_json["id"] not in seen]
+
+            for pdf_api_json in new:
+                seen.add(pdf_api_json["id"])
+                yield PortallDataFrameHandle(self.client, id=pdf_api_json["id"], name=pdf_api_json["name"], description=pdf_api_json.get("description"), validation=validation, columnar=columnar, priority=priority)
+
+            # Stop on the last page, and also if the server does not support pagination and keeps sending the same dataframes
+            if len(page) < page_size or len(page) > page_size or not new:
+                return
+
+            offset += page_size
+
+    def all(self, page_size: int = 100, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> List[PortallDataFrameHandle]:
         """Get all the dataframes available in Portall's database.
 
+        Args:
+            page_size: Number of dataframes to be requested at once.
+            validation: How to validate the GeoJSON received from Portall when dataframes are downloaded.
+            columnar: Whether to decode the GeoJSON received from Portall through a columnar feature collection when dataframes are downloaded.
+            priority: Priority class of the requests, listing and downloads alike, when the client has priority lanes.
+
         Returns:
-            A list of GeoDataFrame-compatible dataframes.
+            A list of lightweight handles to the dataframes, which download the actual GeoDataFrame-compatible dataframes on first access.
         """
 
-        pdfs_api_json = self.client.get(ENDPOINT_DATAFRAMES)
+        return list(self.iter(page_size=page_size, validation=validation, columnar=columnar, priority=priority))
 
-        return [PortallDataFrame.from_api(PortallDataFrameAPI.parse_obj(pdf_api_json), self.client) for pdf_api_json in pdfs_api_json]
-
-    def get(self, id: UUID4) -> Union[PortallDataFrame, None]:
+    def get(self, id: UUID4, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> Union[PortallDataFrame, None]:
         """Get just one of the dataframes available in Portall's database.
 
         Args:
             id: Id. of the dataframe to be retrieved.
+            validation: How to validate the GeoJSON received from Portall: `trusted` skips validation for dataframes that come from trusted pipelines, and `deferred` replaces pydantic validation with a faster, vectorized check.
+            columnar: Whether to decode the response straight into the dataframe through a [ColumnarFeatureCollection][pyportall.api.models.columnar.ColumnarFeatureCollection], with vectorized geometry construction, instead of going through the GeoJSON models. GeoJSON is not validated in that case.
+            priority: Priority class of the request, when the client has priority lanes.
 
         Returns:
             GeoDataFrame-compatible dataframe.
         """
 
-        pdf_api_json = httpx.get(f"{ENDPOINT_DATAFRAMES}{id}/")
+        if columnar is True:
+            return PortallDataFrame.from_api_bytes(self.client.get(f"{ENDPOINT_DATAFRAMES}{id}/", raw=True, priority=priority), self.client)
+
+        pdf_api_json = self.client.get(f"{ENDPOINT_DATAFRAMES}{id}/", priority=priority)
+
+        return PortallDataFrame.from_api(PortallDataFrameAPI.from_obj(pdf_api_json, validation), self.client)
+
+    def get_many(self, ids: Iterable[UUID4], max_workers: int = MAX_WORKERS, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> List[PortallDataFrame]:
+        """Get a number of dataframes available in Portall's database, downloading and decoding them in parallel.
+
+        Args:
+            ids: Ids. of the dataframes to be retrieved.
+            max_workers: Maximum number of dataframes to be downloaded at the same time.
+            validation: How to validate the GeoJSON received from Portall.
+            columnar: Whether to decode the GeoJSON received from Portall through a columnar feature collection.
+            priority: Priority class of the requests, when the client has priority lanes, e.g. `bulk` to keep a large download from holding up interactive work.
+
+        Returns:
+            GeoDataFrame-compatible dataframes, in the same order as `ids`.
+        """
 
-        return PortallDataFrame.from_api(PortallDataFrameAPI.parse_obj(pdf_api_json), self.client)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda id: self.get(id, validation=validation, columnar=columnar, priority=priority), ids))
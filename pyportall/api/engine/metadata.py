@@ -6,6 +6,7 @@ from typing import Dict, List, Union
 
 from pyportall.api.engine.core import APIClient, APIHelper
 from pyportall.api.models.metadata import IndicatorMetadata
+from pyportall.api.models.scheduling import Priority
 
 
 logger = logging.getLogger("metadata")
@@ -14,15 +15,18 @@ logger = logging.getLogger("metadata")
 class MetadataHelper(APIHelper):
     """Help with indicator metadata."""
 
-    def __init__(self, client: APIClient) -> None:
+    def __init__(self, client: APIClient, priority: Priority = Priority.default) -> None:
         """Class constructor to attach the corresponding API client.
 
+        Metadata is downloaded here and on `refresh` only, so those are the only methods that take a priority: `all` and `get` read the local copy.
+
         Args:
             client: API client object that the helper will use to actually send requests to the metadata API when it has to.
+            priority: Priority class of the metadata request, when the client has priority lanes.
         """
         super().__init__(client)
 
-        self.metadata: Dict[str, IndicatorMetadata] = {indicator["code"]: IndicatorMetadata(**indicator) for indicator in self.client.call_metadata()}
+        self.metadata: Dict[str, IndicatorMetadata] = {indicator["code"]: IndicatorMetadata(**indicator) for indicator in self.client.call_metadata(priority=priority)}
 
     def all(self) -> List[IndicatorMetadata]:
         """Get all the indicators available in the metadata database.
@@ -45,7 +49,11 @@ class MetadataHelper(APIHelper):
 
         return self.metadata.get(indicator_code)
 
-    def refresh(self) -> None:
-        """Update the metadata with a fresh copy from the database."""
+    def refresh(self, priority: Priority = Priority.default) -> None:
+        """Update the metadata with a fresh copy from the database.
+
+        Args:
+            priority: Priority class of the metadata request, when the client has priority lanes.
+        """
 
-        self.metadata = {indicator["code"]: IndicatorMetadata(**indicator) for indicator in self.client.call_metadata()}
+        self.metadata = {indicator["code"]: IndicatorMetadata(**indicator) for indicator in self.client.call_metadata(priority=priority)}
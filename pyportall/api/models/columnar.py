@@ -0,0 +1,390 @@
+"""Array-backed, columnar representation of GeoJSON feature collections."""
+
+from __future__ import annotations
+
+import json
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pyportall.api.models.geojson import FeatureCollection, Validation, parse_feature_collection
+from pyportall.utils import json_default
+
+
+GEOMETRY_TYPES = ("Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon")
+NO_GEOMETRY = -1
+
+# Shapely's type ids, as returned by `shapely.get_type_id`, translated into positions in GEOMETRY_TYPES
+SHAPELY_TYPES = {0: 0, 4: 1, 1: 2, 2: 2, 5: 3, 3: 4, 6: 5}
+
+
+def _column(values: List[Any]) -> Any:
+    """Turn a list of property values into the most specific array that can hold them: a NumPy array, or a nullable integer one for integers with missing values."""
+    if values and all(type(value) is bool for value in values):
+        return np.asarray(values, dtype=bool)
+    if values and all(type(value) is int for value in values):
+        try:
+            return np.asarray(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    if values and all(type(value) is int or value is None for value in values) and any(value is not None for value in values):
+        try:
+            return pd.array(values, dtype="Int64")
+        except (OverflowError, TypeError):
+            pass
+    if values and all(type(value) in (int, float) or value is None for value in values) and any(value is not None for value in values):
+        return np.asarray([np.nan if value is None else value for value in values], dtype=np.float64)
+
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+
+    return column
+
+
+def _parts(geometry_type: str, coordinates: Any) -> List[List[List[Any]]]:
+    """Normalize GeoJSON coordinates into a list of parts, each of them a list of rings, each of them a list of positions. Empty geometries have no parts."""
+    if not coordinates:
+        return []
+    elif geometry_type == "Point":
+        return [[[coordinates]]]
+    elif geometry_type == "MultiPoint":
+        return [[[position]] for position in coordinates]
+    elif geometry_type == "LineString":
+        return [[coordinates]]
+    elif geometry_type == "MultiLineString":
+        return [[line] for line in coordinates]
+    elif geometry_type == "Polygon":
+        return [coordinates]
+
+    return coordinates
+
+
+def _offsets(counts: np.ndarray) -> np.ndarray:
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+
+    return offsets
+
+
+class ColumnarFeatureCollection:
+    """ GeoJSON feature collection stored as NumPy arrays.
+
+    Coordinates of all the features live in a single `(n, 2)` or `(n, 3)` array. Every geometry is made of parts (one for single geometries), every part of rings (polygon rings, one line for line strings, one position for points) and every ring of positions, and the boundaries between them are given by offset arrays, so that geometry `i` spans parts `geometry_offsets[i]:geometry_offsets[i + 1]` and so on. Properties are stored column-wise.
+    """
+
+    def __init__(self, geometry_types: np.ndarray, geometry_offsets: np.ndarray, part_offsets: np.ndarray, ring_offsets: np.ndarray, coordinates: np.ndarray, properties: Optional[Dict[str, np.ndarray]] = None, ids: Optional[np.ndarray] = None) -> None:
+        """Build from the actual arrays.
+
+        Args:
+            geometry_types: Type of each geometry, as positions in `GEOMETRY_TYPES`, or `NO_GEOMETRY`.
+            geometry_offsets: Boundaries between geometries in the list of parts.
+            part_offsets: Boundaries between parts in the list of rings.
+            ring_offsets: Boundaries between rings in the list of positions.
+            coordinates: Positions.
+            properties: Property values, by property name.
+            ids: Feature ids.
+        """
+        self.geometry_types = geometry_types
+        self.geometry_offsets = geometry_offsets
+        self.part_offsets = part_offsets
+        self.ring_offsets = ring_offsets
+        self.coordinates = coordinates
+        self.properties = properties or {}
+        self.ids = ids
+
+    def __len__(self) -> int:
+        """return features length"""
+        return len(self.geometry_types)
+
+    def __repr__(self) -> str:
+        return f"ColumnarFeatureCollection(features={len(self)}, coordinates={len(self.coordinates)}, properties={list(self.properties)})"
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the geometry arrays and the numeric property columns."""
+        arrays = [self.geometry_types, self.geometry_offsets, self.part_offsets, self.ring_offsets, self.coordinates] + list(self.properties.values())
+
+        return sum(array.nbytes for array in arrays)
+
+    @classmethod
+    def _from_features(cls, features: Iterable[Tuple[Optional[Any], Optional[str], Any, Optional[Dict]]], length: int) -> ColumnarFeatureCollection:
+        geometry_types = np.empty(length, dtype=np.int8)
+        part_counts = np.empty(length, dtype=np.int64)
+        ring_counts: List[int] = []
+        ring_lengths: List[int] = []
+        positions: List[Any] = []
+        ids: List[Any] = []
+        columns: Dict[str, List[Any]] = {}
+
+        for i, (feature_id, geometry_type, coordinates, properties) in enumerate(features):
+            ids.append(feature_id)
+
+            for name, value in (properties or {}).items():
+                if name not in columns:
+                    columns[name] = [None] * i
+                columns[name].append(value)
+            for values in columns.values():
+                if len(values) == i:
+                    values.append(None)
+
+            if geometry_type is None:
+                geometry_types[i] = NO_GEOMETRY
+                part_counts[i] = 0
+                continue
+
+            geometry_types[i] = GEOMETRY_TYPES.index(geometry_type)
+            parts = _parts(geometry_type, coordinates)
+            part_counts[i] = len(parts)
+            for part in parts:
+                ring_counts.append(len(part))
+                for ring in part:
+                    ring_lengths.append(len(ring))
+                    positions.extend(ring)
+
+        try:
+            coordinates = np.asarray(positions, dtype=np.float64)
+        except ValueError:
+            # Mixed 2D and 3D positions
+            coordinates = np.asarray([position[:2] for position in positions], dtype=np.float64)
+        if coordinates.ndim != 2:
+            coordinates = coordinates.reshape(-1, 2)
+
+        return cls(
+            geometry_types=geometry_types,
+            geometry_offsets=_offsets(part_counts),
+            part_offsets=_offsets(np.asarray(ring_counts, dtype=np.int64)),
+            ring_offsets=_offsets(np.asarray(ring_lengths, dtype=np.int64)),
+            coordinates=coordinates,
+            properties={name: _column(values) for name, values in columns.items()},
+            ids=None if all(feature_id is None for feature_id in ids) else _column([None if feature_id is None else str(feature_id) for feature_id in ids])
+        )
+
+    @classmethod
+    def from_geojson(cls, geojson: Dict) -> ColumnarFeatureCollection:
+        """Build from a GeoJSON feature collection, as a Python object.
+
+        Args:
+            geojson: Object that represents a GeoJSON feature collection.
+
+        Returns:
+            A new ColumnarFeatureCollection object.
+        """
+        features = geojson["features"]
+
+        return cls._from_features(((feature.get("id"), (feature.get("geometry") or {}).get("type"), (feature.get("geometry") or {}).get("coordinates"), feature.get("properties")) for feature in features), len(features))
+
+    @classmethod
+    def from_geojson_bytes(cls, content: bytes) -> ColumnarFeatureCollection:
+        """Build from an encoded GeoJSON feature collection.
+
+        Args:
+            content: JSON document with a GeoJSON feature collection.
+
+        Returns:
+            A new ColumnarFeatureCollection object.
+        """
+        return cls.from_geojson(json.loads(content))
+
+    @classmethod
+    def from_feature_collection(cls, feature_collection: FeatureCollection) -> ColumnarFeatureCollection:
+        """Build from a feature collection model.
+
+        Args:
+            feature_collection: Feature collection model, validated or not.
+
+        Returns:
+            A new ColumnarFeatureCollection object.
+        """
+        features = feature_collection.features
+
+        return cls._from_features(((feature.id, feature.geometry.type, feature.geometry.coordinates, feature.properties) if feature.geometry is not None else (feature.id, None, None, feature.properties) for feature in features), len(features))
+
+    @classmethod
+    def from_gdf(cls, gdf: gpd.GeoDataFrame) -> ColumnarFeatureCollection:
+        """Build from a GeoDataFrame, with vectorized Shapely operations.
+
+        Args:
+            gdf: GeoDataFrame to take geometries and properties from. Its index becomes the feature ids.
+
+        Returns:
+            A new ColumnarFeatureCollection object.
+        """
+        geometries = np.asarray(gdf.geometry.values, dtype=object)
+
+        type_ids = shapely.get_type_id(geometries)
+        geometry_types = np.full(len(geometries), NO_GEOMETRY, dtype=np.int8)
+        for shapely_type, geometry_type in SHAPELY_TYPES.items():
+            geometry_types[type_ids == shapely_type] = geometry_type
+
+        parts, part_index = shapely.get_parts(geometries, return_index=True)
+        geometry_offsets = _offsets(np.bincount(part_index, minlength=len(geometries)))
+
+        # Polygon parts are made of their rings, any other part is a ring by itself
+        is_polygon = shapely.get_type_id(parts) == 3
+        polygon_rings, polygon_ring_index = shapely.get_rings(parts[is_polygon], return_index=True)
+        ring_counts = np.ones(len(parts), dtype=np.int64)
+        ring_counts[is_polygon] = np.bincount(polygon_ring_index, minlength=is_polygon.sum())
+        part_offsets = _offsets(ring_counts)
+
+        rings = np.empty(part_offsets[-1], dtype=object)
+        rings[part_offsets[:-1][~is_polygon]] = parts[~is_polygon]
+        polygon_part_ids = np.flatnonzero(is_polygon)[polygon_ring_index]
+        rings[part_offsets[polygon_part_ids] + np.arange(len(polygon_ring_index)) - np.searchsorted(polygon_ring_index, polygon_ring_index)] = polygon_rings
+
+        include_z = bool(shapely.has_z(geometries).any()) if len(geometries) else False
+        coordinates, coordinate_index = shapely.get_coordinates(rings, include_z=include_z, return_index=True)
+        ring_offsets = _offsets(np.bincount(coordinate_index, minlength=len(rings)))
+
+        # Nullable integers and booleans keep their masked arrays, since NumPy would turn them into floats or objects
+        properties = {str(name): gdf[name].array if pd.api.types.is_extension_array_dtype(gdf[name].dtype) and (pd.api.types.is_integer_dtype(gdf[name].dtype) or pd.api.types.is_bool_dtype(gdf[name].dtype)) else gdf[name].to_numpy() for name in gdf.columns if name != gdf.geometry.name}
+
+        return cls(geometry_types, geometry_offsets, part_offsets, ring_offsets, coordinates, properties=properties, ids=gdf.index.astype(str).to_numpy(dtype=object))
+
+    def to_geometries(self) -> np.ndarray:
+        """Build Shapely geometries, with vectorized operations.
+
+        Returns:
+            An object array with one Shapely geometry (or None) per feature.
+        """
+        num_parts = len(self.part_offsets) - 1
+        num_rings = len(self.ring_offsets) - 1
+
+        # Empty geometries (no parts, or parts without positions) are built on their own, and left out of the vectorized constructors
+        geometry_coordinates = np.diff(self.ring_offsets[self.part_offsets[self.geometry_offsets]])
+        is_empty = (geometry_coordinates == 0) & (self.geometry_types != NO_GEOMETRY)
+        geometry_types = np.where(is_empty, NO_GEOMETRY, self.geometry_types)
+
+        part_geometry = np.repeat(np.arange(len(self)), np.diff(self.geometry_offsets))
+        part_types = geometry_types[part_geometry]
+        ring_part = np.repeat(np.arange(num_parts), np.diff(self.part_offsets))
+        ring_types = part_types[ring_part]
+        coordinate_ring = np.repeat(np.arange(num_rings), np.diff(self.ring_offsets))
+        coordinate_types = ring_types[coordinate_ring]
+
+        parts = np.empty(num_parts, dtype=object)
+
+        is_point = (part_types == 0) | (part_types == 1)
+        parts[is_point] = shapely.points(self.coordinates[self.ring_offsets[self.part_offsets[:-1][is_point]]])
+
+        is_line = (part_types == 2) | (part_types == 3)
+        if is_line.any():
+            selected = (coordinate_types == 2) | (coordinate_types == 3)
+            parts[is_line] = shapely.linestrings(self.coordinates[selected], indices=np.unique(coordinate_ring[selected], return_inverse=True)[1])
+
+        is_polygon = part_types >= 4
+        if is_polygon.any():
+            selected = coordinate_types >= 4
+            rings = shapely.linearrings(self.coordinates[selected], indices=np.unique(coordinate_ring[selected], return_inverse=True)[1])
+            parts[is_polygon] = shapely.polygons(rings, indices=np.unique(ring_part[ring_types >= 4], return_inverse=True)[1])
+
+        geometries = np.full(len(self), None, dtype=object)
+
+        single = np.isin(geometry_types, (0, 2, 4))
+        geometries[single] = parts[self.geometry_offsets[:-1][single]]
+
+        for geometry_type, constructor in ((1, shapely.multipoints), (3, shapely.multilinestrings), (5, shapely.multipolygons)):
+            is_type = geometry_types == geometry_type
+            if is_type.any():
+                selected = part_types == geometry_type
+                geometries[is_type] = constructor(parts[selected], indices=np.unique(part_geometry[selected], return_inverse=True)[1])
+
+        for geometry_type in np.unique(self.geometry_types[is_empty]):
+            geometries[is_empty & (self.geometry_types == geometry_type)] = shapely.from_wkt(f"{GEOMETRY_TYPES[geometry_type].upper()} EMPTY")
+
+        return geometries
+
+    def to_gdf(self, crs: str = "EPSG:4326") -> gpd.GeoDataFrame:
+        """Build a GeoDataFrame.
+
+        Args:
+            crs: Coordinate reference system of the GeoDataFrame.
+
+        Returns:
+            A GeoDataFrame with one column per property and feature ids as index, if present.
+        """
+        return gpd.GeoDataFrame(self.to_columns(), geometry="geometry", crs=crs, index=self.to_index(), copy=False)
+
+    def to_columns(self) -> Dict[str, Any]:
+        """Gather the arrays a GeoDataFrame is made of, without copying them.
+
+        Returns:
+            Shapely geometries under `geometry`, followed by property columns.
+        """
+        columns: Dict[str, Any] = {"geometry": self.to_geometries()}
+        columns.update((name, column) for name, column in self.properties.items() if name != "geometry")
+
+        return columns
+
+    def to_index(self) -> Optional[List[Any]]:
+        """Turn feature ids into a dataframe index, as integers if they all are.
+
+        Returns:
+            Index values, or None if some feature has no id.
+        """
+        if self.ids is None or any(feature_id is None for feature_id in self.ids):
+            return None
+
+        return [int(feature_id) for feature_id in self.ids] if all(feature_id.isdigit() for feature_id in self.ids) else list(self.ids)
+
+    def to_geojson(self) -> Dict:
+        """Build a GeoJSON feature collection, as a Python object.
+
+        Returns:
+            Object that represents a GeoJSON feature collection.
+        """
+        positions = self.coordinates.tolist()
+        ring_offsets = self.ring_offsets.tolist()
+        part_offsets = self.part_offsets.tolist()
+        geometry_offsets = self.geometry_offsets.tolist()
+        columns = {name: column.to_numpy(dtype=object, na_value=None).tolist() if not isinstance(column, np.ndarray) else [None if isinstance(value, float) and value != value else value for value in column.tolist()] if column.dtype.kind in "fO" else column.tolist() for name, column in self.properties.items()}
+        ids = None if self.ids is None else self.ids.tolist()
+
+        features = []
+        for i, geometry_type in enumerate(self.geometry_types.tolist()):
+            if geometry_type == NO_GEOMETRY:
+                geometry = None
+            elif ring_offsets[part_offsets[geometry_offsets[i]]] == ring_offsets[part_offsets[geometry_offsets[i + 1]]]:
+                geometry = {"type": GEOMETRY_TYPES[geometry_type], "coordinates": []}
+            else:
+                parts = [[positions[ring_offsets[ring]:ring_offsets[ring + 1]] for ring in range(part_offsets[part], part_offsets[part + 1])] for part in range(geometry_offsets[i], geometry_offsets[i + 1])]
+                if geometry_type == 0:
+                    coordinates: Any = parts[0][0][0]
+                elif geometry_type == 1:
+                    coordinates = [part[0][0] for part in parts]
+                elif geometry_type == 2:
+                    coordinates = parts[0][0]
+                elif geometry_type == 3:
+                    coordinates = [part[0] for part in parts]
+                elif geometry_type == 4:
+                    coordinates = parts[0]
+                else:
+                    coordinates = parts
+                geometry = {"type": GEOMETRY_TYPES[geometry_type], "coordinates": coordinates}
+
+            feature: Dict[str, Any] = {"type": "Feature", "geometry": geometry, "properties": {name: column[i] for name, column in columns.items()}}
+            if ids is not None:
+                feature["id"] = ids[i]
+            features.append(feature)
+
+        return {"type": "FeatureCollection", "features": features}
+
+    def to_geojson_bytes(self) -> bytes:
+        """Encode as a GeoJSON feature collection.
+
+        Returns:
+            UTF-8 encoded JSON document.
+        """
+        return json.dumps(self.to_geojson(), default=json_default).encode("utf8")
+
+    def to_feature_collection(self, validation: Validation = Validation.trusted) -> FeatureCollection:
+        """Build a feature collection model.
+
+        Args:
+            validation: How to validate the feature collection.
+
+        Returns:
+            The feature collection model.
+        """
+        return parse_feature_collection(self.to_geojson(), validation)
@@ -1,9 +1,15 @@
 # Adapted from https://github.com/developmentseed/geojson-pydantic
 import abc
+from enum import Enum
 from pydantic import BaseModel, Field, ValidationError, validator
 from pydantic.error_wrappers import ErrorWrapper
 from typing import Tuple, Union
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+
+from pyportall.utils import lazy_schema_example
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 LONG_LOG_ITEM_MAX_WIDTH = 200
@@ -15,6 +21,14 @@ BBox = Union[
 ]
 
 
+class Validation(str, Enum):
+    """ How GeoJSON input is validated when building models: `strict` validates every field with pydantic, `trusted` skips validation altogether, and `deferred` skips pydantic validation so that coordinates can be checked later, all at once, with `check_geometries`. """
+
+    strict = "strict"
+    trusted = "trusted"
+    deferred = "deferred"
+
+
 class _GeometryBase(BaseModel, abc.ABC):
     """Base class for geometry models"""
 
@@ -164,13 +178,11 @@ class Feature(BaseModel):
     bbox: Optional[BBox]
 
     class Config:
-        schema_extra = {
-            "example": {
-                "type": "Feature",
-                "geometry": Polygon(coordinates=[[[-3.705759292, 40.428465661], [-3.705876855, 40.428428953], [-3.705893649, 40.428328537], [-3.705792879, 40.428264828], [-3.705675317, 40.428301536], [-3.705658523, 40.428401952], [-3.705759292, 40.428465661]]]),
-                "properties": {"id": 631507574776148991, "value": 80.76923076915, "weight": 1}
-            }
-        }
+        schema_extra = lazy_schema_example(lambda: {
+            "type": "Feature",
+            "geometry": Polygon(coordinates=[[[-3.705759292, 40.428465661], [-3.705876855, 40.428428953], [-3.705893649, 40.428328537], [-3.705792879, 40.428264828], [-3.705675317, 40.428301536], [-3.705658523, 40.428401952], [-3.705759292, 40.428465661]]]),
+            "properties": {"id": 631507574776148991, "value": 80.76923076915, "weight": 1}
+        })
         use_enum_values = True
 
     @validator("geometry", pre=True, always=True)
@@ -189,15 +201,13 @@ class FeatureCollection(BaseModel):
     bbox: Optional[BBox]
 
     class Config:
-        schema_extra = {
-            "example": {
-                "type": "FeatureCollection",
-                "features": [
-                    Feature(geometry=Polygon(coordinates=[[[-3.705759292, 40.428465661], [-3.705876855, 40.428428953], [-3.705893649, 40.428328537], [-3.705792879, 40.428264828], [-3.705675317, 40.428301536], [-3.705658523, 40.428401952], [-3.705759292, 40.428465661]]]), properties={"id": 631507574776148991, "value": 80.76923076915, "weight": 1}),
-                    Feature(geometry=Polygon(coordinates=[[[-3.705843269, 40.428629786], [-3.705960832, 40.428593078], [-3.705977625, 40.428492662], [-3.705876855, 40.428428953], [-3.705759292, 40.428465661], [-3.705742499, 40.428566077], [-3.705843269, 40.428629786]]]), properties={"id": 631507574776151039, "value": 126.92307692295, "weight": 1})
-                ]
-            }
-        }
+        schema_extra = lazy_schema_example(lambda: {
+            "type": "FeatureCollection",
+            "features": [
+                Feature(geometry=Polygon(coordinates=[[[-3.705759292, 40.428465661], [-3.705876855, 40.428428953], [-3.705893649, 40.428328537], [-3.705792879, 40.428264828], [-3.705675317, 40.428301536], [-3.705658523, 40.428401952], [-3.705759292, 40.428465661]]]), properties={"id": 631507574776148991, "value": 80.76923076915, "weight": 1}),
+                Feature(geometry=Polygon(coordinates=[[[-3.705843269, 40.428629786], [-3.705960832, 40.428593078], [-3.705977625, 40.428492662], [-3.705876855, 40.428428953], [-3.705759292, 40.428465661], [-3.705742499, 40.428566077], [-3.705843269, 40.428629786]]]), properties={"id": 631507574776151039, "value": 126.92307692295, "weight": 1})
+            ]
+        })
 
     def __iter__(self):
         """iterate over features"""
@@ -211,5 +221,138 @@ class FeatureCollection(BaseModel):
         """get feature at a given index"""
         return self.features[index]
 
+    def check(self) -> None:
+        """Validate the coordinates of all the features at once.
+
+        Meant for collections built with `Validation.deferred`.
+
+        Raises:
+            ValidationError: Some coordinates do not pass the GeoJSON spec.
+        """
+        check_geometries([feature.geometry for feature in self.features])
+
 
 GeoJSON = Union[Feature, FeatureCollection]
+
+GEOMETRY_MODELS = {model.__fields__["type"].default: model for model in (Point, MultiPoint, LineString, MultiLineString, Polygon, MultiPolygon)}
+
+
+def _coordinate_error(message: str) -> ValidationError:
+    return ValidationError([ErrorWrapper(ValueError(message), "coordinates")], FeatureCollection)
+
+
+def _as_array(coordinates: List, name: str) -> "np.ndarray":
+    import numpy as np
+
+    try:
+        array = np.asarray(coordinates, dtype=float)
+    except (TypeError, ValueError):
+        raise _coordinate_error(f"{name} coordinates must be lists of numbers of the same dimension")
+
+    if array.ndim != 2 or array.shape[1] not in (2, 3):
+        raise _coordinate_error(f"{name} coordinates must have two or three dimensions")
+
+    return array
+
+
+def check_geometries(geometries: List[Any]) -> None:
+    """Validate the coordinates of a number of geometries at once, with NumPy rather than field by field.
+
+    Args:
+        geometries: Geometry models, possibly built without validation.
+
+    Raises:
+        ValidationError: Some coordinates do not pass the GeoJSON spec.
+    """
+    import numpy as np  # Only needed for deferred validation, so that importing the models stays light
+
+    points: List = []
+    sequences: List = []
+    lines: List = []
+    rings: List = []
+
+    for geometry in geometries:
+        geometry_type = getattr(geometry, "type", None)
+        coordinates = getattr(geometry, "coordinates", None)
+        if geometry_type not in GEOMETRY_MODELS or not isinstance(coordinates, (list, tuple)):
+            raise ValidationError([ErrorWrapper(ValueError("Unknown type"), "type")], FeatureCollection)
+
+        if geometry_type == "Point":
+            points.append(coordinates)
+        elif geometry_type == "MultiPoint":
+            sequences.append(coordinates)
+        elif geometry_type == "LineString":
+            lines.append(coordinates)
+        elif geometry_type == "MultiLineString":
+            lines.extend(coordinates)
+        elif geometry_type == "Polygon":
+            rings.extend(coordinates)
+        else:
+            rings.extend(ring for polygon in coordinates for ring in polygon)
+
+    if points:
+        _as_array(points, "Point")
+    for sequence in sequences:
+        if sequence:
+            _as_array(sequence, "MultiPoint")
+
+    if lines:
+        if (np.fromiter(map(len, lines), dtype=np.int64, count=len(lines)) < 2).any():
+            raise _coordinate_error("All line strings must have two or more coordinates")
+        for line in lines:
+            _as_array(line, "LineString")
+
+    if rings:
+        lengths = np.fromiter(map(len, rings), dtype=np.int64, count=len(rings))
+        if (lengths < 4).any():
+            raise _coordinate_error("All linear rings must have four or more coordinates")
+        ring_coordinates = _as_array([coordinate for ring in rings for coordinate in ring], "Polygon")
+        ends = np.cumsum(lengths)
+        if (ring_coordinates[ends - lengths] != ring_coordinates[ends - 1]).any():
+            raise _coordinate_error("All linear rings have the same start and end coordinates")
+
+
+def construct_geometry(obj: Dict) -> Geometry:
+    """Build a geometry model out of a GeoJSON geometry without any validation.
+
+    Args:
+        obj: Object that represents a GeoJSON geometry.
+
+    Returns:
+        The geometry model that corresponds to the `"type"` field.
+    """
+    return GEOMETRY_MODELS[obj["type"]].construct(type=obj["type"], coordinates=obj["coordinates"])
+
+
+def construct_feature(obj: Dict) -> Feature:
+    """Build a feature model out of a GeoJSON feature without any validation.
+
+    Args:
+        obj: Object that represents a GeoJSON feature.
+
+    Returns:
+        The feature model.
+    """
+    id = obj.get("id")
+
+    # Strict validation turns numeric ids into strings, and so should skipping it
+    return Feature.construct(geometry=construct_geometry(obj["geometry"]), properties=obj.get("properties"), id=str(id) if id is not None else None, bbox=obj.get("bbox"))
+
+
+def parse_feature_collection(obj: Dict, validation: Validation = Validation.strict) -> FeatureCollection:
+    """Build a feature collection model out of a GeoJSON feature collection.
+
+    Args:
+        obj: Object that represents a GeoJSON feature collection.
+        validation: How to validate the input; collections built with `Validation.deferred` are meant to be checked later on with their `check` method.
+
+    Returns:
+        The feature collection model.
+
+    Raises:
+        ValidationError: In strict mode, the input does not pass the GeoJSON spec.
+    """
+    if validation == Validation.strict:
+        return FeatureCollection.parse_obj(obj)
+
+    return FeatureCollection.construct(features=[construct_feature(feature) for feature in obj["features"]], bbox=obj.get("bbox"))
@@ -1,20 +1,32 @@
 """Portall's GeoDataFrame wrappers."""
 from __future__ import annotations
 
+import json
+from collections import deque
+import pandas as pd
 import geopandas as gpd
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
 from pydantic.types import UUID4
 from pydantic import BaseModel, Field
 
 from pyportall.api.engine.core import APIClient, ENDPOINT_DATAFRAMES
-from pyportall.api.models.geojson import FeatureCollection, Feature, Polygon
-from pyportall.exceptions import ValidationError
+from pyportall.api.models.columnar import ColumnarFeatureCollection
+from pyportall.api.models.geojson import FeatureCollection, Feature, Polygon, Validation, parse_feature_collection
+from pyportall.api.models.scheduling import Priority
+from pyportall.exceptions import UnsupportedError, ValidationError
+from pyportall.utils import json_default, lazy_schema_example
+
+
+STREAM_CHUNK_FEATURES = 1000
 
 
 class PortallDataFrame(gpd.GeoDataFrame):
     """ GeoDataFrame with Portall superpowers. """
 
-    def __init__(self, client: APIClient, name: Optional[str] = None, id: Optional[UUID4] = None, description: Optional[str] = None, *args, **kwargs) -> None:
+    _metadata = gpd.GeoDataFrame._metadata + ["client", "name", "id", "description", "_fingerprints", "_fingerprinted_columns", "_saved_head"]
+
+    def __init__(self, client: Optional[APIClient] = None, name: Optional[str] = None, id: Optional[UUID4] = None, description: Optional[str] = None, *args, **kwargs) -> None:
         """Class constructor to attach the corresponding API client.
 
         Args:
@@ -23,6 +35,11 @@ class PortallDataFrame(gpd.GeoDataFrame):
             id: Dataframe ID in Portall.
             description: Dataframe description in Portall.
         """
+        if client is not None and not isinstance(client, APIClient):
+            # Pandas builds new objects out of operations by passing the actual data as the first argument; attributes are then copied over via `_metadata`
+            args = (client,) + args
+            client = None
+
         super().__init__(*args, **kwargs)  # Needs to go first, otherwise you get a RecursionError from Pandas
 
         self.client = client
@@ -30,6 +47,10 @@ class PortallDataFrame(gpd.GeoDataFrame):
         self.id = id
         self.description = description
 
+        self._fingerprints: Optional[pd.Series] = None
+        self._fingerprinted_columns: Optional[List[str]] = None
+        self._saved_head: Optional[Tuple[Optional[str], Optional[str]]] = None
+
     @staticmethod
     def from_gdf(gdf: gpd.GeoDataFrame, client: APIClient, name: Optional[str] = None, id: Optional[UUID4] = None, description: Optional[str] = None) -> PortallDataFrame:
         """Build from GeoDataFrame.
@@ -55,7 +76,7 @@ class PortallDataFrame(gpd.GeoDataFrame):
     def from_geojson(geojson: FeatureCollection, client: APIClient, name: Optional[str] = None, id: Optional[UUID4] = None, description: Optional[str] = None) -> PortallDataFrame:
         """Build from GeoJSON.
 
-        Return a PortallDataFrame object out of a standard GeoPandas' GeoDataFrame.
+        Return a PortallDataFrame object out of a standard GeoPandas' GeoDataFrame. Feature ids., if present, become the index of the dataframe.
 
         Args:
             geojson: FeatureCollection GeoJSON to build the new PortallDataFrame object from.
@@ -67,7 +88,53 @@ class PortallDataFrame(gpd.GeoDataFrame):
         Returns:
             A new PortallDataFrame object.
         """
-        return PortallDataFrame.from_gdf(gpd.GeoDataFrame.from_features(features=geojson.dict()["features"], crs="EPSG:4326"), client, name=name, id=id, description=description)
+        features = geojson.dict()["features"]
+        gdf = gpd.GeoDataFrame.from_features(features=features, crs="EPSG:4326")
+
+        feature_ids = [feature.get("id") for feature in features]
+        if feature_ids and all(feature_id is not None for feature_id in feature_ids):
+            gdf.index = pd.Index([int(feature_id) for feature_id in feature_ids] if all(feature_id.isdigit() for feature_id in feature_ids) else feature_ids)
+
+        return PortallDataFrame.from_gdf(gdf, client, name=name, id=id, description=description)
+
+    @staticmethod
+    def from_columnar(columnar: ColumnarFeatureCollection, client: APIClient, name: Optional[str] = None, id: Optional[UUID4] = None, description: Optional[str] = None) -> PortallDataFrame:
+        """Build from a columnar feature collection.
+
+        Return a PortallDataFrame object out of an array-backed feature collection, with vectorized geometry construction. Feature ids., if present, become the index of the dataframe.
+
+        Args:
+            columnar: ColumnarFeatureCollection to build the new PortallDataFrame object from.
+            client: API client object to be used to send requests to the dataframe API.
+            name: Dataframe name in Portall.
+            id: Dataframe ID in Portall.
+            description: Dataframe description in Portall.
+
+        Returns:
+            A new PortallDataFrame object.
+        """
+        return PortallDataFrame.from_gdf(columnar.to_gdf(crs="EPSG:4326"), client, name=name, id=id, description=description)
+
+    @staticmethod
+    def from_api_bytes(content: bytes, client: APIClient) -> PortallDataFrame:
+        """Build from a Portall dataframe straight from the bytes received from Portall's API.
+
+        The response is decoded into a [ColumnarFeatureCollection][pyportall.api.models.columnar.ColumnarFeatureCollection] whose arrays are handed over to the new dataframe, skipping the GeoJSON models and the intermediate GeoDataFrame. GeoJSON is not validated.
+
+        Args:
+            content: JSON document with a Portall dataframe, as returned by the API.
+            client: API client object to be used to send requests to the dataframe API.
+
+        Returns:
+            A new PortallDataFrame object.
+        """
+        pdf_json = json.loads(content)
+        columnar = ColumnarFeatureCollection.from_geojson(pdf_json.pop("geojson"))
+
+        pdf = PortallDataFrame(client, pdf_json["name"], pdf_json.get("id"), pdf_json.get("description", ""), columnar.to_columns(), geometry="geometry", crs="EPSG:4326", index=columnar.to_index(), copy=False)
+        pdf._mark_saved()
+
+        return pdf
 
     @staticmethod
     def from_api(pdf_api: PortallDataFrameAPI, client: APIClient) -> PortallDataFrame:
@@ -82,63 +149,306 @@ class PortallDataFrame(gpd.GeoDataFrame):
         Returns:
             A new PortallDataFrame object.
         """
-        return PortallDataFrame.from_geojson(pdf_api.geojson, client, name=pdf_api.name, id=pdf_api.id, description=pdf_api.description)
+        if isinstance(pdf_api.geojson, ColumnarFeatureCollection):
+            pdf = PortallDataFrame.from_columnar(pdf_api.geojson, client, name=pdf_api.name, id=pdf_api.id, description=pdf_api.description)
+        else:
+            pdf = PortallDataFrame.from_geojson(pdf_api.geojson, client, name=pdf_api.name, id=pdf_api.id, description=pdf_api.description)
+        pdf._mark_saved()
+
+        return pdf
+
+    def row_fingerprints(self) -> pd.Series:
+        """Compute a content fingerprint for every row.
+
+        Returns:
+            A series of hashes of the geometry and properties of each row, indexed by feature id. (i.e., the index of the dataframe as a string).
+        """
+        properties = pd.DataFrame(self.drop(columns=self.geometry.name)).astype(str)
+        properties[self.geometry.name] = self.geometry.to_wkb(hex=True)
+
+        fingerprints = pd.util.hash_pandas_object(properties, index=False)
+        fingerprints.index = self.index.astype(str)
 
-    def save(self) -> None:
+        return fingerprints
+
+    def save(self, delta: bool = True, stream: bool = False, chunk_rows: Optional[int] = None, max_workers: int = 1, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> None:
         """Persist dataframe in Portall.
 
         Creates or updates an equivalent, remote PortallDataFrame object in Portall.
+
+        Dataframes remember a fingerprint of each row from their last load or save, so that only inserted, updated and deleted rows are sent to Portall next time they are saved. The whole dataframe is sent anyway if columns have changed, the index is not unique or Portall cannot apply partial updates.
+
+        Large dataframes can be streamed feature by feature, instead of being encoded as a whole in memory first, and can also be split into several uploads: the first one creates or replaces the remote dataframe and the rest append features to it.
+
+        Args:
+            delta: Whether to send only the rows that changed since the last load or save, when possible.
+            stream: Whether to stream the request body when the whole dataframe has to be sent.
+            chunk_rows: Maximum number of rows per upload when the whole dataframe has to be sent. Implies `stream`. Everything is sent in a single upload if Portall cannot apply partial updates.
+            max_workers: Maximum number of chunks to be encoded ahead of the upload in progress, when `chunk_rows` is set. Chunks are uploaded one after the other, so that Portall keeps rows in order.
+            validation: How to validate the GeoJSON to be sent when it is not streamed: `trusted` skips validation for dataframes that come from trusted pipelines, and `deferred` replaces pydantic validation with a faster, vectorized check.
+            columnar: Whether to encode the whole dataframe, when it is not streamed, through a [ColumnarFeatureCollection][pyportall.api.models.columnar.ColumnarFeatureCollection] rather than through GeoPandas and the GeoJSON models, which is faster but skips validation.
+            priority: Priority class of the requests, when the client has priority lanes, e.g. `bulk` for large uploads that should not hold up interactive work.
         """
-        try:
-            pdf_api = PortallDataFrameAPI(id=getattr(self, "id", None), name=getattr(self, "name"), description=getattr(self, "descripton", None), geojson=FeatureCollection.parse_raw(self.to_json()))
-        except AttributeError:
+        fingerprints = self.row_fingerprints()
+
+        if delta is True and getattr(self, "id", None) is not None and self._fingerprints is not None and list(self.columns) == self._fingerprinted_columns and self.index.is_unique:
+            try:
+                self._save_delta(fingerprints, validation, priority)
+            except UnsupportedError:
+                self._save_full(stream, chunk_rows, max_workers, validation, columnar, priority)
+        else:
+            self._save_full(stream, chunk_rows, max_workers, validation, columnar, priority)
+
+        self._mark_saved(fingerprints)
+
+    def _mark_saved(self, fingerprints: Optional[pd.Series] = None) -> None:
+        """Remember rows, columns, name and description as they are in Portall, so that the next save can send only what changed."""
+        self._fingerprints = fingerprints if fingerprints is not None else self.row_fingerprints()
+        self._fingerprinted_columns = list(self.columns)
+        self._saved_head = (getattr(self, "name", None), getattr(self, "description", None))
+
+    def iter_json(self, head: Optional[dict] = None, key: str = "geojson") -> Iterator[bytes]:
+        """Encode dataframe as a stream of JSON chunks.
+
+        Features are encoded straight from the dataframe, a few at a time, without building the whole GeoJSON string or the corresponding pydantic models.
+
+        Args:
+            head: Other top level fields of the JSON document, if the feature collection is not the document itself.
+            key: Name of the field the feature collection goes into, when `head` is set.
+
+        Yields:
+            UTF-8 encoded chunks of the JSON document.
+        """
+        opening = '{"type": "FeatureCollection", "features": ['
+        closing = "]}"
+        if head is not None:
+            opening = json.dumps(head, default=json_default)[:-1] + (", " if head else "") + f'"{key}": ' + opening
+            closing += "}"
+
+        yield opening.encode("utf8")
+
+        features: List[str] = []
+        separator = ""
+        for feature in self.iterfeatures():
+            features.append(json.dumps(feature, default=json_default))
+            if len(features) == STREAM_CHUNK_FEATURES:
+                yield (separator + ", ".join(features)).encode("utf8")
+                features = []
+                separator = ", "
+        if features:
+            yield (separator + ", ".join(features)).encode("utf8")
+
+        yield closing.encode("utf8")
+
+    def _to_geojson(self, validation: Validation) -> FeatureCollection:
+        if validation == Validation.strict:
+            return FeatureCollection.parse_raw(self.to_json())
+
+        geojson = parse_feature_collection(json.loads(self.to_json()), validation)
+        if validation == Validation.deferred:
+            geojson.check()
+
+        return geojson
+
+    def _head(self) -> dict:
+        if getattr(self, "name", None) is None:
             raise ValidationError
 
-        if pdf_api.id is None:
-            self.client.post(ENDPOINT_DATAFRAMES, body=pdf_api.json(exclude_none=True))
+        return {field: value for field, value in (("name", self.name), ("description", getattr(self, "description", None))) if value is not None}
+
+    def _save_full(self, stream: bool = False, chunk_rows: Optional[int] = None, max_workers: int = 1, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> None:
+        if columnar is True and stream is False and chunk_rows is None:
+            body: Any = [json.dumps(self._head())[:-1].encode("utf8"), b', "geojson": ', ColumnarFeatureCollection.from_gdf(self).to_geojson_bytes(), b"}"]
+        elif stream is False and chunk_rows is None:
+            try:
+                pdf_api = PortallDataFrameAPI(id=getattr(self, "id", None), name=getattr(self, "name"), description=getattr(self, "description", None), geojson=self._to_geojson(validation))
+            except AttributeError:
+                raise ValidationError
+
+            body = pdf_api.json(exclude_none=True)
+        else:
+            head = self._head()
+            if chunk_rows is not None and len(self) > chunk_rows:
+                try:
+                    return self._save_chunks(head, chunk_rows, max_workers, priority)
+                except UnsupportedError:
+                    pass
+            body = self.iter_json(head=head)
+
+        self._upload(body, priority)
+
+    def _upload(self, body: Any, priority: Priority = Priority.default) -> None:
+        if getattr(self, "id", None) is None:
+            response_json = self.client.post(ENDPOINT_DATAFRAMES, body=body, priority=priority)
+            if isinstance(response_json, dict):
+                self.id = response_json.get("id")
         else:
-            self.client.put(f"{ENDPOINT_DATAFRAMES}{pdf_api.id}/", body=pdf_api.json(exclude_none=True))
+            self.client.put(f"{ENDPOINT_DATAFRAMES}{self.id}/", body=body, priority=priority)
+
+    def _save_chunks(self, head: dict, chunk_rows: int, max_workers: int, priority: Priority = Priority.default) -> None:
+        chunks = [self.iloc[start:start + chunk_rows] for start in range(0, len(self), chunk_rows)]
+
+        self._upload(chunks[0].iter_json(head=head), priority)
+
+        def encode(chunk: PortallDataFrame) -> bytes:
+            return b"".join(chunk.iter_json(head={"delete": []}, key="upsert"))
+
+        def append(body: bytes) -> None:
+            self.client.patch(f"{ENDPOINT_DATAFRAMES}{self.id}/", body=[body], priority=priority)
 
-    def delete(self) -> None:
+        # The first append tells whether Portall supports partial updates at all. Appends go in order, since Portall stores features as they arrive, while the next chunks are encoded in the background
+        append(encode(chunks[1]))
+        pending: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for chunk in chunks[2:]:
+                pending.append(executor.submit(encode, chunk))
+                if len(pending) > max_workers:
+                    append(pending.popleft().result())
+            while pending:
+                append(pending.popleft().result())
+
+    def _save_delta(self, fingerprints: pd.Series, validation: Validation = Validation.strict, priority: Priority = Priority.default) -> None:
+        changed = fingerprints.ne(self._fingerprints.reindex(fingerprints.index))
+        deleted = self._fingerprints.index.difference(fingerprints.index)
+
+        head_changed = (getattr(self, "name", None), getattr(self, "description", None)) != self._saved_head
+
+        if not changed.any() and deleted.empty and not head_changed:
+            return
+
+        pdf_patch = PortallDataFramePatch(name=getattr(self, "name", None), description=getattr(self, "description", None), upsert=self[changed.values]._to_geojson(validation), delete=list(deleted))
+
+        self.client.patch(f"{ENDPOINT_DATAFRAMES}{self.id}/", body=pdf_patch.json(exclude_none=True), priority=priority)
+
+    def delete(self, priority: Priority = Priority.default) -> None:
         """Delete dataframe in Portall.
 
         Deletes remote PortallDataFrame object in Portall. It will not delete the actual Python object.
+
+        Args:
+            priority: Priority class of the request, when the client has priority lanes.
         """
         try:
-            pdf_api = PortallDataFrameAPI(id=getattr(self, "id", None), name=getattr(self, "name"), description=getattr(self, "descripton", ""), geojson=self.to_json())
+            pdf_api = PortallDataFrameAPI(id=getattr(self, "id", None), name=getattr(self, "name"), description=getattr(self, "description", ""), geojson=self.to_json())
         except AttributeError:
             raise ValidationError
 
-        self.client.delete(f"{ENDPOINT_DATAFRAMES}{pdf_api.id}/")
+        self.client.delete(f"{ENDPOINT_DATAFRAMES}{pdf_api.id}/", priority=priority)
         self.id = None
+        self._fingerprints = None
+        self._saved_head = None
 
 
-class PortallDataFrameAPI(BaseModel):
-    """ Representation of a Portall dataframe straight from the API. """
+class PortallDataFrameHandle:
+    """ Lightweight reference to a Portall dataframe, whose features are only downloaded when first needed. """
 
-    id: Optional[UUID4] = Field(None, example="df30e466-1f68-42e5-8f4c-eceb1ebda89a", description="Portall ID of the saved dataframe in question.")
-    name: str = Field(..., example="Population")
-    description: Optional[str] = Field("", example="Population information in my trade areas.")
-    geojson: FeatureCollection = Field(..., example={
+    def __init__(self, client: APIClient, id: UUID4, name: str, description: Optional[str] = None, validation: Validation = Validation.strict, columnar: bool = False, priority: Priority = Priority.default) -> None:
+        """Class constructor to attach the corresponding API client.
+
+        Args:
+            client: API client object to be used to send requests to the dataframe API.
+            id: Dataframe ID in Portall.
+            name: Dataframe name in Portall.
+            description: Dataframe description in Portall.
+            validation: How to validate the GeoJSON received from Portall when the dataframe is downloaded.
+            columnar: Whether to decode the GeoJSON received from Portall through a columnar feature collection.
+            priority: Priority class of the download, when the client has priority lanes.
+        """
+        self.client = client
+        self.id = id
+        self.name = name
+        self.description = description
+        self.validation = validation
+        self.columnar = columnar
+        self.priority = priority
+
+        self._pdf: Optional[PortallDataFrame] = None
+
+    def __repr__(self) -> str:
+        return f"PortallDataFrameHandle(id={self.id!r}, name={self.name!r}, description={self.description!r})"
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the dataframe has already been downloaded."""
+        return self._pdf is not None
+
+    @property
+    def dataframe(self) -> PortallDataFrame:
+        """The actual dataframe, downloaded on first access."""
+        return self.load()
+
+    def load(self, refresh: bool = False) -> PortallDataFrame:
+        """Download the actual dataframe, unless that has already been done.
+
+        Args:
+            refresh: Download it again even if it has already been downloaded.
+
+        Returns:
+            GeoDataFrame-compatible dataframe.
+        """
+        if self._pdf is None or refresh is True:
+            if self.columnar is True:
+                self._pdf = PortallDataFrame.from_api_bytes(self.client.get(f"{ENDPOINT_DATAFRAMES}{self.id}/", raw=True, priority=self.priority), self.client)
+            else:
+                self._pdf = PortallDataFrame.from_api(PortallDataFrameAPI.from_obj(self.client.get(f"{ENDPOINT_DATAFRAMES}{self.id}/", priority=self.priority), self.validation), self.client)
+
+        return self._pdf
+
+
+def _example_geojson() -> Dict[str, Any]:
+    return {
         "type": "FeatureCollection",
         "features": [
             Feature(geometry=Polygon(coordinates=[[[-3.705759292, 40.428465661], [-3.705876855, 40.428428953], [-3.705893649, 40.428328537], [-3.705792879, 40.428264828], [-3.705675317, 40.428301536], [-3.705658523, 40.428401952], [-3.705759292, 40.428465661]]]), properties={"id": 631507574776148991, "value": 80.76923076915}),
             Feature(geometry=Polygon(coordinates=[[[-3.705843269, 40.428629786], [-3.705960832, 40.428593078], [-3.705977625, 40.428492662], [-3.705876855, 40.428428953], [-3.705759292, 40.428465661], [-3.705742499, 40.428566077], [-3.705843269, 40.428629786]]]), properties={"id": 631507574776151039, "value": 126.92307692295})
         ]
-    })
+    }
+
+
+class PortallDataFrameAPI(BaseModel):
+    """ Representation of a Portall dataframe straight from the API. """
+
+    id: Optional[UUID4] = Field(None, example="df30e466-1f68-42e5-8f4c-eceb1ebda89a", description="Portall ID of the saved dataframe in question.")
+    name: str = Field(..., example="Population")
+    description: Optional[str] = Field("", example="Population information in my trade areas.")
+    geojson: FeatureCollection = Field(...)
+
+    @classmethod
+    def from_obj(cls, obj: Dict, validation: Validation = Validation.strict, columnar: bool = False) -> PortallDataFrameAPI:
+        """Build from the Python object derived from the JSON received by the API.
+
+        Args:
+            obj: Portall dataframe as returned by the API.
+            validation: How to validate the GeoJSON in the dataframe. In deferred mode, it is checked with a vectorized method before being returned.
+            columnar: Whether to hold the GeoJSON in a [ColumnarFeatureCollection][pyportall.api.models.columnar.ColumnarFeatureCollection] instead of the GeoJSON models, in which case it is not validated.
+
+        Returns:
+            A new PortallDataFrameAPI object.
+        """
+        if columnar is True:
+            return cls.construct(id=obj.get("id"), name=obj["name"], description=obj.get("description", ""), geojson=ColumnarFeatureCollection.from_geojson(obj["geojson"]))
+        if validation == Validation.strict:
+            return cls.parse_obj(obj)
+
+        geojson = parse_feature_collection(obj["geojson"], validation)
+        if validation == Validation.deferred:
+            geojson.check()
+
+        return cls.construct(id=obj.get("id"), name=obj["name"], description=obj.get("description", ""), geojson=geojson)
 
     class Config:
-        schema_extra = {
-            "example": {
-                "id": "df30e466-1f68-42e5-8f4c-eceb1ebda89a",
-                "name": "Population",
-                "description": "Population information in my trade areas.",
-                "geojson": {
-                    "type": "FeatureCollection",
-                    "features": [
-                        Feature(geometry=Polygon(coordinates=[[[-3.705759292, 40.428465661], [-3.705876855, 40.428428953], [-3.705893649, 40.428328537], [-3.705792879, 40.428264828], [-3.705675317, 40.428301536], [-3.705658523, 40.428401952], [-3.705759292, 40.428465661]]]), properties={"id": 631507574776148991, "value": 80.76923076915}),
-                        Feature(geometry=Polygon(coordinates=[[[-3.705843269, 40.428629786], [-3.705960832, 40.428593078], [-3.705977625, 40.428492662], [-3.705876855, 40.428428953], [-3.705759292, 40.428465661], [-3.705742499, 40.428566077], [-3.705843269, 40.428629786]]]), properties={"id": 631507574776151039, "value": 126.92307692295})
-                    ]
-                }
-            }
-        }
+        schema_extra = lazy_schema_example(lambda: {
+            "id": "df30e466-1f68-42e5-8f4c-eceb1ebda89a",
+            "name": "Population",
+            "description": "Population information in my trade areas.",
+            "geojson": _example_geojson()
+        }, geojson=lambda: _example_geojson())
+
+
+class PortallDataFramePatch(BaseModel):
+    """ Partial update of a Portall dataframe, as sent to the API. """
+
+    name: Optional[str] = Field(None, example="Population")
+    description: Optional[str] = Field(None, example="Population information in my trade areas.")
+    upsert: FeatureCollection = Field(..., description="Features to be inserted or, if a feature with the same id. already exists, replaced.")
+    delete: List[str] = Field([], example=["3", "7"], description="Ids. of the features to be deleted.")
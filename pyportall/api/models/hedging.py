@@ -0,0 +1,32 @@
+"""Request hedging related model classes."""
+
+from typing import List, Optional
+from pydantic import BaseModel
+from pydantic.fields import Field
+
+
+class HedgingOptions(BaseModel):
+    """ When and how often to send a duplicate of a slow request, and take whichever copy answers first. """
+
+    percentile: float = Field(95, gt=0, lt=100, example=95, description="A duplicate is sent when a request takes longer than this percentile of the recent latencies of its endpoint.")
+    max_extra_load: float = Field(0.05, ge=0, le=1, example=0.05, description="Maximum ratio of duplicates to requests.")
+    min_samples: int = Field(20, gt=0, example=20, description="Number of latencies to be learned for an endpoint before its requests are hedged.")
+    window: int = Field(200, gt=0, example=200, description="Number of recent latencies per endpoint to compute the percentile on.")
+    endpoints: Optional[List[str]] = Field(None, example=["https://api.portall.es/v1/pyportall/geocoding.geojson"], description="POST endpoints that are safe to send twice, the synchronous geocoding and isovist ones by default. GET requests are always eligible, and batch ones never are.")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "percentile": 95,
+                "max_extra_load": 0.05
+            }
+        }
+
+
+class HedgingStats(BaseModel):
+    """ What hedging has done so far. """
+
+    requests: int = Field(0, description="Number of requests eligible for hedging.")
+    hedged: int = Field(0, description="Number of duplicates sent.")
+    hedge_wins: int = Field(0, description="Number of times the duplicate answered first.")
+    skipped: int = Field(0, description="Number of slow requests not hedged because of `max_extra_load`.")
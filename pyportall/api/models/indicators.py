@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from enum import Enum
+from itertools import product
 from pydantic import BaseModel, validator
 from pydantic.fields import Field
 from pydantic.types import conint
-from typing import Optional, Union
+from typing import Iterable, List, Optional, Union
 from datetime import datetime
 
 
@@ -91,6 +92,28 @@ class Moment(BaseModel):
 
         return v
 
+    @classmethod
+    def product(cls, months: Iterable[Month], dows: Iterable[Optional[DayOfWeek]] = (None,), hours: Iterable[Optional[int]] = (None,), years: Iterable[int] = (2020,)) -> List[Moment]:
+        """Build every combination of the given years, months, days of the week and hours, e.g. to resolve an indicator over time.
+
+        Args:
+            months: Months to be combined.
+            dows: Days of the week to be combined, if any.
+            hours: Hours to be combined, if any.
+            years: Years to be combined.
+
+        Returns:
+            Moments sorted by year, month, day of the week and hour.
+        """
+        return [cls(year=year, month=month, dow=dow, hour=hour) for year, month, dow, hour in product(years, months, dows, hours)]
+
+    @property
+    def label(self) -> str:
+        """ Short, human-readable description of the moment, e.g. `2020-february-friday-12h`. """
+        parts = [str(self.year), self.month.value, str(self.day) if self.day is not None else None, self.dow.value if self.dow is not None else None, f"{self.hour}h" if self.hour is not None else None]
+
+        return "-".join(part for part in parts if part is not None)
+
     @property
     def month_number(self) -> int:
         return Month.get_number(self.month)
@@ -120,6 +143,11 @@ class Indicator(BaseModel):
     aggregated: Optional[bool] = Field(True, example=True, description="True means a single value is returned for the entire geometry; false means original cells and values are preserved.")
     percent: Optional[bool] = Field(False, example=False, description="Whether the value is required to be a percentage.")
 
+    @property
+    def label(self) -> str:
+        """ Short name for the indicator, made of its code plus `density` and `percent` suffixes when applicable, e.g. `pop_res_density`. """
+        return "_".join([self.code] + (["density"] if self.normalization == Normalization.density else []) + (["percent"] if self.percent is True else []))
+
     class Config:
         schema_extra = {
             "example": {
@@ -6,6 +6,7 @@ from pydantic import BaseModel
 from pydantic.fields import Field
 
 from pyportall.api.models.indicators import Moment, Month, DayOfWeek
+from pyportall.utils import lazy_schema_example
 
 
 class GeocodingOptions(BaseModel):
@@ -41,17 +42,15 @@ class IsolineOptions(BaseModel):
 
     mode: Optional[IsolineMode] = Field(None, example=IsolineMode.car, description="Means of transport used to calculate the isoline border.")
     range_s: Optional[int] = Field(None, example=1000, description="Number of seconds to be taken into account to calculate the isoline border.")
-    moment: Optional[Moment] = Field(None, example=Moment(dow=DayOfWeek.friday, month=Month.february, hour=20), description="Moment in time to use when estimating the isoline border.")
+    moment: Optional[Moment] = Field(None, description="Moment in time to use when estimating the isoline border.")
 
     class Config:
         title = "Isoline options"
-        schema_extra = {
-            "example": {
-                "mode": IsolineMode.car,
-                "range_s": 1000,
-                "moment": Moment(dow=DayOfWeek.friday, month=Month.february, hour=20)
-            }
-        }
+        schema_extra = lazy_schema_example(lambda: {
+            "mode": IsolineMode.car,
+            "range_s": 1000,
+            "moment": Moment(dow=DayOfWeek.friday, month=Month.february, hour=20)
+        }, moment=lambda: Moment(dow=DayOfWeek.friday, month=Month.february, hour=20))
 
 
 class IsovistOptions(BaseModel):
@@ -0,0 +1,67 @@
+"""Request scheduling related model classes."""
+
+from enum import Enum
+from typing import Dict, Optional
+from pydantic import BaseModel
+from pydantic.fields import Field
+
+
+class CreditBudgetOptions(BaseModel):
+    """ How many credits can be spent over time, overall and per job. """
+
+    credits_per_window: int = Field(..., gt=0, example=1000, description="Maximum number of credits to be spent within any window.")
+    window_s: float = Field(60, gt=0, example=60, description="Length of the window, in seconds.")
+    job_quotas: Dict[str, int] = Field({}, example={"nightly": 200}, description="Maximum number of credits to be spent by specific jobs within any window.")
+    default_job_quota: Optional[int] = Field(None, gt=0, example=500, description="Maximum number of credits to be spent within any window by jobs without a specific quota, if any.")
+    indicator_credits: Dict[str, int] = Field({}, example={"pop_res": 1}, description="Credits per geometry of each indicator, as in `IndicatorMetadata.credits`, so that aggregated indicator calls need no preflight request to find out their cost.")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "credits_per_window": 1000,
+                "window_s": 60,
+                "job_quotas": {"nightly": 200}
+            }
+        }
+
+
+class CreditStats(BaseModel):
+    """ What has been spent and how long requests waited for the budget. """
+
+    spent: int = Field(0, description="Number of credits spent.")
+    spent_by_job: Dict[str, int] = Field({}, description="Number of credits spent, by job.")
+    queued: int = Field(0, description="Number of requests that had to wait for the budget.")
+    waited_s: float = Field(0, description="Total time requests waited for the budget, in seconds.")
+
+
+class Priority(str, Enum):
+    """ Priority class of a request: `interactive` requests are served first, then `default` ones, then `bulk` ones. """
+
+    interactive = "interactive"
+    default = "default"
+    bulk = "bulk"
+
+
+class PriorityLaneOptions(BaseModel):
+    """ How many requests of each priority class can be in flight at the same time, and how bulk progress is guaranteed. """
+
+    max_in_flight: int = Field(8, gt=0, example=8, description="Maximum number of requests in flight at the same time, overall.")
+    lane_max_in_flight: Dict[Priority, int] = Field({Priority.interactive: 8, Priority.default: 6, Priority.bulk: 4}, example={"interactive": 8, "default": 6, "bulk": 4}, description="Maximum number of requests in flight at the same time, by priority class.")
+    max_skips: int = Field(8, gt=0, example=8, description="Number of times a waiting request can be passed over by higher-priority ones before it is served anyway.")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "max_in_flight": 8,
+                "lane_max_in_flight": {"interactive": 8, "default": 6, "bulk": 4},
+                "max_skips": 8
+            }
+        }
+
+
+class PriorityStats(BaseModel):
+    """ How many requests each priority class got served and how long they waited for it. """
+
+    served: Dict[Priority, int] = Field({}, description="Number of requests served, by priority class.")
+    waited_s: Dict[Priority, float] = Field({}, description="Total time requests waited to be served, in seconds, by priority class.")
+    promoted: int = Field(0, description="Number of requests served ahead of higher-priority ones because they had been passed over `max_skips` times.")
@@ -0,0 +1,253 @@
+"""Command-line bulk runner for Portall's API.
+
+Run geocoding, isovists, isolines or aggregated indicators over a CSV, GeoJSON or GeoParquet file without writing any Python, e.g.:
+
+```
+pyportall geocode addresses.csv geocoded.geojson --country Spain --workers 4
+pyportall indicators isovists.geojson values.csv --code pop_res --month february --hour 12 --batch --cache-dir .cache
+```
+
+Input is split into chunks that are sent to the API concurrently, and results are written as soon as they arrive, in order. With `--cache-dir`, resolved chunks are kept on disk, so an interrupted job picks up where it left off.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Type
+
+import geopandas as gpd
+import pandas as pd
+from pydantic import BaseModel
+
+from pyportall.api.engine.core import APIClient, MAX_WORKERS
+from pyportall.api.engine.geopandas import CHUNK_ROWS, GeocodingHelper, IndicatorHelper, IsolineHelper, IsovistHelper
+from pyportall.api.models.indicators import DayOfWeek, Indicator, Month, Moment, Normalization
+from pyportall.api.models.lbs import GeocodingOptions, IsolineOptions, IsovistOptions
+
+
+def _add_model_arguments(parser: argparse.ArgumentParser, model: Type[BaseModel], exclude: tuple = ()) -> None:
+    """Add one optional flag per field of a pydantic model, e.g. `--postal-code` for `postal_code`."""
+    group = parser.add_argument_group(model.__name__)
+    for name, field in model.__fields__.items():
+        if name not in exclude:
+            group.add_argument(f"--{name.replace('_', '-')}", dest=name, help=field.field_info.description)
+
+
+def _add_moment_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("Moment")
+    group.add_argument("--month", choices=[month.value for month in Month])
+    group.add_argument("--dow", choices=[dow.value for dow in DayOfWeek], help="Day of the week.")
+    group.add_argument("--day", type=int, help="Day of the month.")
+    group.add_argument("--hour", type=int)
+    group.add_argument("--year", type=int)
+
+
+def _model_from_args(model: Type[BaseModel], args: argparse.Namespace, **values: Any) -> BaseModel:
+    """Build a pydantic model out of the flags that were actually given."""
+    values.update({name: getattr(args, name) for name in model.__fields__ if getattr(args, name, None) is not None and name not in values})
+
+    return model(**values)
+
+
+def _moment_from_args(args: argparse.Namespace) -> Optional[Moment]:
+    return _model_from_args(Moment, args) if args.month is not None else None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments.
+
+    Args:
+        argv: Arguments to parse, `sys.argv` by default.
+
+    Returns:
+        Parsed arguments.
+    """
+    parser = argparse.ArgumentParser(prog="pyportall", description="Run Portall's API over CSV, GeoJSON or GeoParquet files.")
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("input", help="CSV, GeoJSON or GeoParquet file. CSV geometries are read from a WKT `geometry` column or from `longitude` and `latitude` columns.")
+    common.add_argument("output", help="CSV, GeoJSON or GeoParquet file. CSV and GeoJSON are written as chunks are resolved.")
+    common.add_argument("--api-key", help="API key, `PYPORTALL_API_KEY` by default.")
+    common.add_argument("--batch", action="store_true", help="Use batch mode, for requests that take longer than the API timeout.")
+    common.add_argument("--workers", type=int, default=MAX_WORKERS, help="Number of requests to be sent at the same time.")
+    common.add_argument("--chunk-size", type=int, default=CHUNK_ROWS, help="Number of rows per request.")
+    common.add_argument("--cache-dir", help="Directory to keep resolved chunks in, so that they are not requested again.")
+    common.add_argument("--progress", action="store_true", help="Report progress on stderr.")
+
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    geocode = commands.add_parser("geocode", parents=[common], help="Geocode street addresses.")
+    _add_model_arguments(geocode, GeocodingOptions)
+
+    isovists = commands.add_parser("isovists", parents=[common], help="Compute isovists around points.")
+    _add_model_arguments(isovists, IsovistOptions)
+
+    isolines = commands.add_parser("isolines", parents=[common], help="Compute isolines around points.")
+    _add_model_arguments(isolines, IsolineOptions, exclude=("moment",))
+    _add_moment_arguments(isolines)
+
+    indicators = commands.add_parser("indicators", parents=[common], help="Compute aggregated indicators over geometries.")
+    indicators.add_argument("--code", required=True, help="Indicator code as defined in the metadata database.")
+    indicators.add_argument("--normalization", choices=[normalization.value for normalization in Normalization])
+    indicators.add_argument("--percent", action="store_true", default=None, help="Whether the value is required to be a percentage.")
+    _add_moment_arguments(indicators)
+
+    return parser.parse_args(argv)
+
+
+def read(path: str) -> pd.DataFrame:
+    """Read input rows.
+
+    Args:
+        path: CSV, GeoJSON or (Geo)Parquet file.
+
+    Returns:
+        A GeoDataFrame, or a DataFrame for CSV files without geometries (e.g. addresses to be geocoded).
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".csv":
+        df = pd.read_csv(path)
+        if "geometry" in df.columns:
+            return gpd.GeoDataFrame(df, geometry=gpd.GeoSeries.from_wkt(df["geometry"]), crs="EPSG:4326")
+        if "longitude" in df.columns and "latitude" in df.columns:
+            return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df["longitude"], df["latitude"]), crs="EPSG:4326")
+        return df
+    elif extension in (".parquet", ".geoparquet"):
+        return gpd.read_parquet(path)
+    else:
+        return gpd.read_file(path)
+
+
+class Writer:
+    """Write resolved chunks to a file, as they arrive when the format allows it."""
+
+    def __init__(self, path: str) -> None:
+        """Open the output file.
+
+        Args:
+            path: CSV, GeoJSON or (Geo)Parquet file.
+        """
+        self.path = path
+        self.extension = os.path.splitext(path)[1].lower()
+        self.chunks: List[gpd.GeoDataFrame] = []
+        self.rows = 0
+        self.file = open(path, "w", encoding="utf8") if self.extension not in (".parquet", ".geoparquet") else None
+
+    def write(self, gdf: gpd.GeoDataFrame) -> None:
+        """Write one chunk of results.
+
+        Args:
+            gdf: Resolved chunk.
+        """
+        if self.file is None:
+            self.chunks.append(gdf)
+        elif self.extension == ".csv":
+            gdf.to_csv(self.file, header=self.rows == 0, index=False)
+        else:
+            for feature in json.loads(gdf.to_json())["features"]:
+                self.file.write(('{"type": "FeatureCollection", "features": [\n' if self.rows == 0 else ",\n") + json.dumps(feature))
+                self.rows += 1
+            return
+
+        self.rows += len(gdf)
+
+    def close(self) -> None:
+        """Finish the output file."""
+        if self.file is None:
+            if self.chunks:
+                pd.concat(self.chunks, ignore_index=True).to_parquet(self.path)
+        else:
+            if self.extension != ".csv":
+                self.file.write("\n]}\n" if self.rows > 0 else '{"type": "FeatureCollection", "features": []}\n')
+            self.file.close()
+
+
+def resolver(args: argparse.Namespace, client: APIClient) -> Callable[[pd.DataFrame], gpd.GeoDataFrame]:
+    """Pick the helper method and options that resolve one chunk for the requested command.
+
+    Args:
+        args: Parsed command-line arguments.
+        client: API client to send requests with.
+
+    Returns:
+        Function that resolves a chunk of rows.
+    """
+    if args.command == "geocode":
+        options = _model_from_args(GeocodingOptions, args)
+        return lambda df: GeocodingHelper(client).resolve(df, options=options)
+    elif args.command == "isovists":
+        options = _model_from_args(IsovistOptions, args)
+        return lambda gdf: IsovistHelper(client).resolve(gdf, options=options)
+    elif args.command == "isolines":
+        options = _model_from_args(IsolineOptions, args, moment=_moment_from_args(args))
+        return lambda gdf: IsolineHelper(client).resolve(gdf, options=options)
+    else:
+        indicator = _model_from_args(Indicator, args)
+        moment = _moment_from_args(args)
+        return lambda gdf: IndicatorHelper(client).resolve_aggregated(gdf, indicator=indicator, moment=moment)
+
+
+def run(args: argparse.Namespace, client: APIClient) -> int:
+    """Resolve the input file chunk by chunk and write results to the output file.
+
+    Args:
+        args: Parsed command-line arguments.
+        client: API client to send requests with.
+
+    Returns:
+        Number of rows written.
+    """
+    df = read(args.input)
+    chunks = [df.iloc[start:start + args.chunk_size] for start in range(0, len(df), args.chunk_size)]
+    resolve = resolver(args, client)
+
+    options = {name: value for name, value in sorted(vars(args).items()) if name not in ("input", "output", "api_key", "workers", "cache_dir", "progress")}
+
+    def resolve_cached(chunk: pd.DataFrame) -> gpd.GeoDataFrame:
+        if args.cache_dir is None:
+            return resolve(chunk)
+
+        key = hashlib.sha1(json.dumps(options, default=str).encode("utf8") + pickle.dumps(chunk)).hexdigest()
+        path = os.path.join(args.cache_dir, f"{key}.pkl")
+        if os.path.exists(path):
+            return pd.read_pickle(path)
+
+        resolved = resolve(chunk)
+        resolved.to_pickle(f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+
+        return resolved
+
+    if args.cache_dir is not None:
+        os.makedirs(args.cache_dir, exist_ok=True)
+
+    writer = Writer(args.output)
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for number, resolved in enumerate(executor.map(resolve_cached, chunks), start=1):
+                writer.write(resolved)
+                if args.progress:
+                    print(f"{number}/{len(chunks)} chunks, {writer.rows} rows", file=sys.stderr)
+    finally:
+        writer.close()
+
+    return writer.rows
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point of the `pyportall` command.
+
+    Args:
+        argv: Arguments to parse, `sys.argv` by default.
+    """
+    args = parse_args(argv)
+    run(args, APIClient(api_key=args.api_key, batch=args.batch))
+
+
+if __name__ == "__main__":
+    main()
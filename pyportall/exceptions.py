@@ -48,3 +48,9 @@ class RateLimitError(PyPortallException):
     """The request cannot be fulfilled because either the company credit has run out or the maximum number of allowed requests per second has been exceeded."""
 
     pass
+
+
+class UnsupportedError(PyPortallException):
+    """The API does not support the requested operation."""
+
+    pass
@@ -0,0 +1,690 @@
+"""Local stand-in for Portall's API.
+
+The simulator implements every route the SDK talks to (see the `ENDPOINT_*` constants in [pyportall.api.engine.core][pyportall.api.engine.core]) with synthetic but shape-correct responses, so that the SDK can be tested and load-tested offline.
+
+It can be used in-process, either as an HTTPX transport for [APIClient][pyportall.api.engine.core.APIClient] or as an ASGI application, or it can listen on localhost:
+
+```python
+from pyportall.api.engine.core import APIClient
+from pyportall.simulator import PortallSimulator, SimulatorOptions
+
+simulator = PortallSimulator(SimulatorOptions(batch_duration_s=2, rate_limit_probability=0.05))
+client = APIClient(api_key="dummy", transport=simulator.transport())
+```
+
+When listening on localhost (`python -m pyportall.simulator`), point the SDK to the simulator by means of the `PYPORTALL_ENDPOINT_*` environment variables printed on startup.
+"""
+
+import asyncio
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from enum import Enum
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlparse
+
+import httpx
+from pydantic import BaseModel, Field
+
+from pyportall.api.engine.core import ENDPOINT_AGGREGATED_INDICATORS, ENDPOINT_DATAFRAMES, ENDPOINT_DISAGGREGATED_INDICATORS, ENDPOINT_GEOCODING, ENDPOINT_METADATA, ENDPOINT_RESOLVE_ISOLINES, ENDPOINT_RESOLVE_ISOVISTS
+
+
+JOBS_PATH = "/v1/pyportall/jobs/"
+CELL_ID_BASE = 631507574769340927
+METERS_PER_DEGREE = 111320
+
+METADATA = [
+    {
+        "code": "pop_res",
+        "name": "Resident population",
+        "description": "Number of people that live in the area.",
+        "unit": "people",
+        "format": "integer",
+        "coverage": "Spain",
+        "resolution": "h3_10",
+        "data_source": "Portall simulator",
+        "computed_date": "2021-01-01",
+        "aggregate_fn": "sum",
+        "data_type": "decimal",
+        "aggregate_weight": "area",
+        "factor": 1.0,
+        "immutable": False,
+        "credits": 1
+    },
+    {
+        "code": "pop_tot",
+        "name": "Total population",
+        "description": "Number of people that can be counted in the area.",
+        "unit": "people",
+        "format": "integer",
+        "coverage": "Spain",
+        "resolution": "h3_10",
+        "data_source": "Portall simulator",
+        "computed_date": "2021-01-01",
+        "aggregate_fn": "sum",
+        "data_type": "decimal",
+        "aggregate_weight": "area",
+        "factor": 1.0,
+        "immutable": False,
+        "credits": 2
+    }
+]
+
+
+class LatencyDistribution(str, Enum):
+    """ Shape of the simulated server-side latency. """
+
+    constant = "constant"
+    uniform = "uniform"
+    exponential = "exponential"
+    lognormal = "lognormal"
+
+
+class Latency(BaseModel):
+    """ Simulated server-side latency for a given route. """
+
+    distribution: LatencyDistribution = Field(LatencyDistribution.constant, example=LatencyDistribution.lognormal, description="Shape of the latency distribution.")
+    mean_s: float = Field(0, ge=0, example=0.2, description="Mean latency in seconds (median for lognormal distributions).")
+    spread_s: float = Field(0, ge=0, example=0.1, description="Half width of the range for uniform distributions, or standard deviation of the underlying normal distribution for lognormal ones.")
+
+    def sample(self, rng: random.Random) -> float:
+        """Draw one latency value, in seconds.
+
+        Args:
+            rng: Random number generator to draw the value from.
+
+        Returns:
+            Latency in seconds.
+        """
+        if self.distribution == LatencyDistribution.uniform:
+            return max(0, rng.uniform(self.mean_s - self.spread_s, self.mean_s + self.spread_s))
+        elif self.distribution == LatencyDistribution.exponential:
+            return rng.expovariate(1 / self.mean_s) if self.mean_s > 0 else 0
+        elif self.distribution == LatencyDistribution.lognormal:
+            return rng.lognormvariate(math.log(self.mean_s), self.spread_s) if self.mean_s > 0 else 0
+
+        return self.mean_s
+
+
+class SimulatorOptions(BaseModel):
+    """ Behavior of the simulated API. """
+
+    api_key: Optional[str] = Field(None, example="dummy", description="Only accept requests with this API key; any API key is accepted if not set.")
+    latency: Latency = Field(Latency(), description="Default latency for all routes.")
+    route_latency: Dict[str, Latency] = Field({}, example={"aggregated_indicators": Latency(distribution=LatencyDistribution.exponential, mean_s=0.5)}, description="Latency for specific routes, by route name, see `PortallSimulator.ROUTES`.")
+    batch_duration_s: float = Field(0, ge=0, example=10, description="Time a batch job takes to complete.")
+    rate_limit_probability: float = Field(0, ge=0, le=1, example=0.05, description="Probability of answering any request with a 429 error.")
+    max_requests_per_s: Optional[float] = Field(None, gt=0, example=10, description="Answer with a 429 error when requests arrive faster than this.")
+    max_payload_bytes: Optional[int] = Field(None, gt=0, example=10000000, description="Answer with a 413 error when request bodies are larger than this.")
+    patch_support: bool = Field(True, example=False, description="Whether dataframes accept partial updates; a 405 error is sent otherwise.")
+    cell_size_m: float = Field(65, gt=0, example=65, description="Approximate edge length of the synthetic cells returned by the disaggregated indicator route.")
+    seed: Optional[int] = Field(None, example=42, description="Seed for the random number generator, for reproducible latencies and errors.")
+
+
+class SimulatorResponse(BaseModel):
+    """ Response as produced by the simulator, before being translated into the wire format of each front end. """
+
+    status_code: int
+    body: Any = None
+
+    def content(self) -> bytes:
+        """Encode the response body as JSON."""
+        return b"" if self.body is None else json.dumps(self.body).encode("utf8")
+
+
+class SimulatorStats(BaseModel):
+    """ Counters on the traffic received by the simulator. """
+
+    requests: Dict[str, int] = {}
+    status_codes: Dict[int, int] = {}
+    bytes_received: int = 0
+    bytes_sent: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+
+
+class SimulatorError(Exception):
+    """Stop processing a request and answer with the given status code."""
+
+    def __init__(self, status_code: int, detail: Any) -> None:
+        """Constructor.
+
+        Args:
+            status_code: HTTP status code of the response.
+            detail: Error detail to be sent in the response body.
+        """
+        self.status_code = status_code
+        self.detail = detail
+
+        super().__init__(detail)
+
+
+def _path(url: str) -> str:
+    return urlparse(url).path
+
+
+def _noise(*args: Any) -> float:
+    """Deterministic pseudo-random number in [0, 1) derived from the arguments."""
+    digest = hashlib.sha1(json.dumps(args, sort_keys=True, default=str).encode("utf8")).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def _is_true(value: Optional[str]) -> bool:
+    return value is not None and value.lower() in ("true", "1")
+
+
+def _circle(lon: float, lat: float, radius_m: float, num_vertices: int = 16) -> List[List[float]]:
+    dlat = radius_m / METERS_PER_DEGREE
+    dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+    ring = [[lon + dlon * math.cos(2 * math.pi * i / num_vertices), lat + dlat * math.sin(2 * math.pi * i / num_vertices)] for i in range(num_vertices)]
+
+    return ring + [ring[0]]
+
+
+def _first_coordinate(geometry: Dict) -> List[float]:
+    coordinates = geometry["coordinates"]
+    while isinstance(coordinates[0], list):
+        coordinates = coordinates[0]
+
+    return coordinates[:2]
+
+
+class PortallSimulator:
+    """Synthetic implementation of Portall's API."""
+
+    ROUTES = ("metadata", "dataframes", "geocoding", "isovists", "isolines", "aggregated_indicators", "disaggregated_indicators", "jobs")
+
+    def __init__(self, options: Optional[SimulatorOptions] = None) -> None:
+        """Build a simulator with an empty dataframe store and no pending batch jobs.
+
+        Args:
+            options: Behavior of the simulated API.
+        """
+        self.options = options or SimulatorOptions()
+        self.stats = SimulatorStats()
+        self.dataframes: Dict[str, Dict] = {}
+        self.jobs: Dict[str, Tuple[float, Any]] = {}
+
+        self._rng = random.Random(self.options.seed)
+        self._lock = threading.Lock()
+        self._last_request_time: Optional[float] = None
+
+        self._routes: Dict[str, Tuple[str, Callable]] = {
+            _path(ENDPOINT_GEOCODING): ("geocoding", self._geocoding),
+            _path(ENDPOINT_RESOLVE_ISOVISTS): ("isovists", self._isovists),
+            _path(ENDPOINT_RESOLVE_ISOLINES): ("isolines", self._isolines),
+            _path(ENDPOINT_AGGREGATED_INDICATORS): ("aggregated_indicators", self._aggregated_indicators),
+            _path(ENDPOINT_DISAGGREGATED_INDICATORS): ("disaggregated_indicators", self._disaggregated_indicators),
+        }
+
+    def _route(self, path: str) -> Tuple[str, Callable]:
+        if path in self._routes:
+            return self._routes[path]
+        if path == _path(ENDPOINT_METADATA):
+            return "metadata", self._metadata
+        if path.startswith(_path(ENDPOINT_DATAFRAMES)):
+            return "dataframes", self._dataframes
+        if path.startswith(JOBS_PATH):
+            return "jobs", self._jobs
+
+        raise SimulatorError(404, "Not found")
+
+    def latency(self, method: str, path: str) -> float:
+        """Draw the latency for a request.
+
+        Args:
+            method: HTTP method of the request.
+            path: Path of the request URL.
+
+        Returns:
+            Number of seconds the request has to wait before being answered.
+        """
+        try:
+            route_name, _ = self._route(path)
+        except SimulatorError:
+            return 0
+
+        with self._lock:
+            return self.options.route_latency.get(route_name, self.options.latency).sample(self._rng)
+
+    def dispatch(self, method: str, path: str, params: Dict[str, str], body: bytes, base_url: str) -> SimulatorResponse:
+        """Answer one request, without any latency.
+
+        Args:
+            method: HTTP method of the request.
+            path: Path of the request URL.
+            params: Query parameters of the request.
+            body: Raw request body.
+            base_url: Scheme and host the request was sent to, used to build batch job URLs.
+
+        Returns:
+            The simulated response.
+        """
+        try:
+            route_name, handler = self._route(path)
+            with self._lock:
+                self.stats.requests[route_name] = self.stats.requests.get(route_name, 0) + 1
+                self.stats.bytes_received += len(body)
+            self._check_limits(params, body)
+            response = handler(method, path, params, json.loads(body) if body else None, base_url)
+        except SimulatorError as e:
+            response = SimulatorResponse(status_code=e.status_code, body={"detail": e.detail})
+
+        with self._lock:
+            self.stats.status_codes[response.status_code] = self.stats.status_codes.get(response.status_code, 0) + 1
+            self.stats.bytes_sent += len(response.content())
+
+        return response
+
+    def _check_limits(self, params: Dict[str, str], body: bytes) -> None:
+        if self.options.api_key is not None and params.get("apikey") != self.options.api_key:
+            raise SimulatorError(401, "Wrong API key")
+        if self.options.max_payload_bytes is not None and len(body) > self.options.max_payload_bytes:
+            raise SimulatorError(413, "Payload too large")
+
+        with self._lock:
+            now = time.monotonic()
+            too_fast = self.options.max_requests_per_s is not None and self._last_request_time is not None and now - self._last_request_time < 1 / self.options.max_requests_per_s
+            self._last_request_time = now
+            if too_fast or self._rng.random() < self.options.rate_limit_probability:
+                raise SimulatorError(429, "Too many requests")
+
+    def _indicator_response(self, params: Dict[str, str], credits: int, base_url: str, compute: Callable[[], Any]) -> SimulatorResponse:
+        if _is_true(params.get("preflight")):
+            return SimulatorResponse(status_code=200, body={"detail": max(credits, 1)})
+
+        if _is_true(params.get("batch")):
+            job_id = str(uuid.uuid4())
+            with self._lock:
+                self.jobs[job_id] = (time.monotonic() + self.options.batch_duration_s, compute())
+            return SimulatorResponse(status_code=202, body={"detail": f"{base_url}{JOBS_PATH}{job_id}"})
+
+        return SimulatorResponse(status_code=200, body=compute())
+
+    def _jobs(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        job_id = path[len(JOBS_PATH):].strip("/")
+        with self._lock:
+            if job_id not in self.jobs:
+                raise SimulatorError(404, "Job not found")
+            ready_at, result = self.jobs[job_id]
+
+        if time.monotonic() < ready_at:
+            return SimulatorResponse(status_code=202, body={"detail": f"{base_url}{JOBS_PATH}{job_id}"})
+
+        return SimulatorResponse(status_code=200, body=result)
+
+    def _metadata(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        return SimulatorResponse(status_code=200, body=METADATA)
+
+    def _geocoding(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        try:
+            columns = body["df"]
+            options = body.get("options") or {}
+            index = list(columns["street"].keys()) if isinstance(columns["street"], dict) else list(range(len(columns["street"])))
+        except (KeyError, TypeError, AttributeError):
+            raise SimulatorError(422, [{"loc": ["body", "df"], "msg": "field required", "type": "value_error.missing"}])
+
+        def value(column: str, position: int, key: Any) -> Any:
+            values = columns.get(column)
+            if isinstance(values, dict):
+                found = values.get(key)
+            elif isinstance(values, list):
+                found = values[position]
+            else:
+                found = None
+            return found if found is not None else options.get(column)
+
+        def compute() -> Any:
+            features = []
+            for position, key in enumerate(index):
+                street = value("street", position, key)
+                properties = {column: value(column, position, key) for column in ("country", "state", "county", "city", "district", "postal_code")}
+                properties["street"] = street
+                features.append({
+                    "type": "Feature",
+                    "id": str(key),
+                    "geometry": {"type": "Point", "coordinates": [round(-3.8 + 0.2 * _noise(street, properties["city"], "lon"), 6), round(40.3 + 0.2 * _noise(street, properties["city"], "lat"), 6)]},
+                    "properties": properties
+                })
+            return {"type": "FeatureCollection", "features": features}
+
+        return self._indicator_response(params, len(index), base_url, compute)
+
+    def _features(self, body: Any, key: str = "gdf") -> List[Dict]:
+        try:
+            return body[key]["features"]
+        except (KeyError, TypeError):
+            raise SimulatorError(422, [{"loc": ["body", key], "msg": "field required", "type": "value_error.missing"}])
+
+    def _isovists(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        features = self._features(body)
+        options = body.get("options") or {}
+        defaults = {"radius_m": 150, "num_rays": -1, "heading_deg": 0, "fov_deg": 360}
+
+        def compute() -> Any:
+            result = []
+            for feature in features:
+                properties = dict(feature.get("properties") or {})
+                for name, default in defaults.items():
+                    if properties.get(name) is None:
+                        properties[name] = options.get(name) if options.get(name) is not None else default
+                lon, lat = _first_coordinate(feature["geometry"])
+                properties["destination"] = {"type": "Point", "coordinates": [lon, lat]}
+                radius_m = properties["radius_m"] * (0.5 + 0.5 * _noise(lon, lat, properties["radius_m"]))
+                result.append({"type": "Feature", "id": feature.get("id"), "geometry": {"type": "Polygon", "coordinates": [_circle(lon, lat, radius_m)]}, "properties": properties})
+            return {"type": "FeatureCollection", "features": result}
+
+        return self._indicator_response(params, len(features), base_url, compute)
+
+    def _isolines(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        features = self._features(body)
+        options = body.get("options") or {}
+        defaults = {"mode": "car", "range_s": 600, "moment": None}
+        speeds_m_s = {"car": 10, "truck": 7, "pedestrian": 1.4}
+        for position, feature in enumerate(features):
+            mode = (feature.get("properties") or {}).get("mode")
+            if mode is not None and mode not in speeds_m_s:
+                raise SimulatorError(422, [{"loc": ["body", "gdf", "features", position, "properties", "mode"], "msg": "value is not a valid enumeration member; permitted: 'car', 'truck', 'pedestrian'", "type": "type_error.enum", "ctx": {"enum_values": list(speeds_m_s)}}])
+
+        def compute() -> Any:
+            result = []
+            for feature in features:
+                properties = dict(feature.get("properties") or {})
+                for name, default in defaults.items():
+                    if properties.get(name) is None:
+                        properties[name] = options.get(name) if options.get(name) is not None else default
+                lon, lat = _first_coordinate(feature["geometry"])
+                properties["destination"] = {"type": "Point", "coordinates": [lon, lat]}
+                radius_m = properties["range_s"] * speeds_m_s.get(properties["mode"], 10)
+                result.append({"type": "Feature", "id": feature.get("id"), "geometry": {"type": "Polygon", "coordinates": [_circle(lon, lat, radius_m)]}, "properties": properties})
+            return {"type": "FeatureCollection", "features": result}
+
+        return self._indicator_response(params, len(features), base_url, compute)
+
+    def _aggregated_indicators(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        features = self._features(body)
+        indicator = body.get("indicator") or {}
+        moment = body.get("moment")
+
+        def compute() -> Any:
+            result = []
+            for feature in features:
+                properties = dict(feature.get("properties") or {})
+                properties["value"] = round(1000 * _noise(feature["geometry"], indicator.get("code"), indicator.get("normalization"), indicator.get("percent"), moment), 6)
+                result.append({"type": "Feature", "id": feature.get("id"), "geometry": feature["geometry"], "properties": properties})
+            return {"type": "FeatureCollection", "features": result}
+
+        return self._indicator_response(params, len(features), base_url, compute)
+
+    def _disaggregated_indicators(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        from shapely import contains_xy
+        from shapely.geometry import shape
+
+        try:
+            polygon = shape(body["polygon"])
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise SimulatorError(422, [{"loc": ["body", "polygon"], "msg": "field required", "type": "value_error.missing"}])
+        indicator = body.get("indicator") or {}
+        moment = body.get("moment")
+
+        # Pointy-top hexagons on a global grid, so that cells are the same no matter the requested polygon
+        radius = self.options.cell_size_m / METERS_PER_DEGREE
+        dx = math.sqrt(3) * radius
+        dy = 1.5 * radius
+        min_lon, min_lat, max_lon, max_lat = polygon.bounds
+        centers = []
+        for row in range(math.floor(min_lat / dy), math.ceil(max_lat / dy) + 1):
+            offset = dx / 2 if row % 2 else 0
+            for column in range(math.floor((min_lon - offset) / dx), math.ceil((max_lon - offset) / dx) + 1):
+                centers.append((row, column, column * dx + offset, row * dy))
+        inside = contains_xy(polygon, [center[2] for center in centers], [center[3] for center in centers]) if centers else []
+        cells = [center for center, is_inside in zip(centers, inside) if is_inside]
+
+        def compute() -> Any:
+            features = []
+            for row, column, lon, lat in cells:
+                cell_id = CELL_ID_BASE + ((row + 2 ** 20) << 22) + column + 2 ** 21
+                ring = [[round(lon + radius * math.cos(math.radians(60 * i + 30)), 9), round(lat + radius * math.sin(math.radians(60 * i + 30)), 9)] for i in range(6)]
+                features.append({
+                    "type": "Feature",
+                    "geometry": {"type": "Polygon", "coordinates": [ring + [ring[0]]]},
+                    "properties": {"id": cell_id, "value": round(100 * _noise(cell_id, indicator.get("code"), indicator.get("normalization"), indicator.get("percent"), moment), 6), "weight": 1}
+                })
+            return {"type": "FeatureCollection", "features": features}
+
+        return self._indicator_response(params, len(cells), base_url, compute)
+
+    def _dataframes(self, method: str, path: str, params: Dict[str, str], body: Any, base_url: str) -> SimulatorResponse:
+        id = path[len(_path(ENDPOINT_DATAFRAMES)):].strip("/")
+
+        if not id:
+            if method == "GET":
+                with self._lock:
+                    pdfs = list(self.dataframes.values())
+                if "limit" in params:
+                    offset = int(params.get("offset", 0))
+                    pdfs = pdfs[offset:offset + int(params["limit"])]
+                if _is_true(params.get("summary")):
+                    pdfs = [{"id": pdf["id"], "name": pdf["name"], "description": pdf["description"]} for pdf in pdfs]
+                return SimulatorResponse(status_code=200, body=pdfs)
+            elif method == "POST":
+                pdf = self._validate_dataframe(body)
+                pdf["id"] = str(uuid.uuid4())
+                with self._lock:
+                    self.dataframes[pdf["id"]] = pdf
+                return SimulatorResponse(status_code=201, body=pdf)
+            raise SimulatorError(405, "Method not allowed")
+
+        with self._lock:
+            if id not in self.dataframes:
+                raise SimulatorError(404, "Not found")
+
+            if method == "GET":
+                return SimulatorResponse(status_code=200, body=self.dataframes[id])
+            elif method == "PUT":
+                pdf = self._validate_dataframe(body)
+                pdf["id"] = id
+                self.dataframes[id] = pdf
+                return SimulatorResponse(status_code=200, body=pdf)
+            elif method == "PATCH" and self.options.patch_support:
+                pdf = self.dataframes[id]
+                features = self._patch_features(pdf["geojson"]["features"], body)
+                pdf = {"id": id, "name": body.get("name") or pdf["name"], "description": body.get("description", pdf["description"]), "geojson": {"type": "FeatureCollection", "features": features}}
+                self.dataframes[id] = pdf
+                return SimulatorResponse(status_code=200, body=pdf)
+            elif method == "DELETE":
+                del self.dataframes[id]
+                return SimulatorResponse(status_code=204)
+
+        raise SimulatorError(405, "Method not allowed")
+
+    def _patch_features(self, features: List[Dict], body: Any) -> List[Dict]:
+        try:
+            upsert = body["upsert"]["features"]
+            delete = set(body.get("delete") or [])
+        except (KeyError, TypeError):
+            raise SimulatorError(422, [{"loc": ["body", "upsert"], "msg": "field required", "type": "value_error.missing"}])
+
+        by_id = {feature.get("id"): feature for feature in features if feature.get("id") not in delete}
+        anonymous = [feature for feature in features if feature.get("id") is None]
+        for feature in upsert:
+            if feature.get("id") is None:
+                anonymous.append(feature)
+            else:
+                by_id[feature["id"]] = feature
+
+        return [feature for feature_id, feature in by_id.items() if feature_id is not None] + anonymous
+
+    def _validate_dataframe(self, body: Any) -> Dict:
+        if not isinstance(body, dict) or "name" not in body or not isinstance(body.get("geojson"), dict):
+            raise SimulatorError(422, [{"loc": ["body"], "msg": "name and geojson are required", "type": "value_error.missing"}])
+
+        return {"id": body.get("id"), "name": body["name"], "description": body.get("description", ""), "geojson": body["geojson"]}
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.stats.in_flight += 1
+            self.stats.max_in_flight = max(self.stats.max_in_flight, self.stats.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.stats.in_flight -= 1
+
+    def _handle(self, method: str, path: str, params: Dict[str, str], body: bytes, base_url: str) -> SimulatorResponse:
+        self._enter()
+        try:
+            time.sleep(self.latency(method, path))
+            return self.dispatch(method, path, params, body, base_url)
+        finally:
+            self._exit()
+
+    def transport(self) -> httpx.MockTransport:
+        """Build an HTTPX transport that sends requests to the simulator in-process.
+
+        Returns:
+            A transport to be passed to [APIClient][pyportall.api.engine.core.APIClient].
+        """
+
+        return httpx.MockTransport(self._handle_httpx)
+
+    def _handle_httpx(self, request: httpx.Request) -> httpx.Response:
+        response = self._handle(request.method, request.url.path, dict(request.url.params), request.read(), f"{request.url.scheme}://{request.url.netloc.decode('ascii')}")
+        return httpx.Response(response.status_code, content=response.content(), headers={"content-type": "application/json"})
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Allow simulators, and transports built from them, to be sent to other processes, where they carry on with a copy of the current state."""
+        state = self.__dict__.copy()
+        del state["_lock"]
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        """ASGI entry point."""
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+
+        body = b""
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+        host = dict(scope.get("headers") or []).get(b"host", b"localhost").decode("ascii")
+        params = dict(parse_qsl(scope.get("query_string", b"").decode("utf8")))
+        base_url = f"{scope.get('scheme', 'http')}://{host}"
+
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency(scope["method"], scope["path"]))
+            response = self.dispatch(scope["method"], scope["path"], params, body, base_url)
+        finally:
+            self._exit()
+
+        content = response.content()
+        await send({"type": "http.response.start", "status": response.status_code, "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(content)).encode("ascii"))]})
+        await send({"type": "http.response.body", "body": content})
+
+    @contextmanager
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+        """Listen on localhost in a background thread while the context is active.
+
+        Args:
+            host: Address to bind to.
+            port: Port to bind to; a free one is picked if 0.
+
+        Yields:
+            The base URL the simulator is listening on.
+        """
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self) -> None:
+                url = urlparse(self.path)
+                body = self.rfile.read(int(self.headers.get("content-length") or 0))
+                response = simulator._handle(self.command, url.path, dict(parse_qsl(url.query)), body, f"http://{self.headers.get('host')}")
+                content = response.content()
+                self.send_response(response.status_code)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _respond
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            yield f"http://{host}:{server.server_address[1]}"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @staticmethod
+    def endpoints(base_url: str) -> Dict[str, str]:
+        """Environment variables that point the SDK to a simulator listening on the given URL.
+
+        Args:
+            base_url: Scheme, host and port of the simulator.
+
+        Returns:
+            Environment variable names and their values. They need to be set before importing pyportall.
+        """
+        endpoints = {
+            "PYPORTALL_ENDPOINT_METADATA": ENDPOINT_METADATA,
+            "PYPORTALL_ENDPOINT_DATAFRAMES": ENDPOINT_DATAFRAMES,
+            "PYPORTALL_ENDPOINT_GEOCODING": ENDPOINT_GEOCODING,
+            "PYPORTALL_ENDPOINT_RESOLVE_ISOVISTS": ENDPOINT_RESOLVE_ISOVISTS,
+            "PYPORTALL_ENDPOINT_RESOLVE_ISOLINES": ENDPOINT_RESOLVE_ISOLINES,
+            "PYPORTALL_ENDPOINT_AGGREGATED_INDICATORS": ENDPOINT_AGGREGATED_INDICATORS,
+            "PYPORTALL_ENDPOINT_DISAGGREGATED_INDICATORS": ENDPOINT_DISAGGREGATED_INDICATORS,
+        }
+
+        return {name: f"{base_url}{_path(url)}" for name, url in endpoints.items()}
+
+
+def main() -> None:
+    """Run the simulator on localhost until interrupted."""
+    parser = argparse.ArgumentParser(description="Local stand-in for Portall's API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--options", default="{}", help="SimulatorOptions as a JSON string.")
+    args = parser.parse_args()
+
+    simulator = PortallSimulator(SimulatorOptions.parse_raw(args.options))
+    with simulator.serve(args.host, args.port) as base_url:
+        for name, value in simulator.endpoints(base_url).items():
+            print(f"export {name}={value}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -24,6 +24,16 @@ def generate_encoders_by_class_tuples(
 encoders_by_class_tuples = generate_encoders_by_class_tuples(ENCODERS_BY_TYPE)
 
 
+def json_default(obj: Any) -> Any:
+    """Encode the NumPy scalars and datetime-like values that pandas may leave in row values, as a `default` for `json.dumps`."""
+    if hasattr(obj, "item"):
+        return obj.item()
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+
+    return str(obj)
+
+
 # From FastAPI
 def jsonable_encoder(
     obj: Any,
@@ -148,3 +158,22 @@ def jsonable_encoder(
         custom_encoder=custom_encoder,
         sqlalchemy_safe=sqlalchemy_safe,
     )
+
+
+def lazy_schema_example(build_example: Callable[[], Any], **build_field_examples: Callable[[], Any]) -> Callable[[Dict[str, Any], Any], None]:
+    """Build a pydantic `schema_extra` that only creates examples when the schema is actually requested, instead of at import time.
+
+    Args:
+        build_example: Function that returns the example of the whole model.
+        build_field_examples: Functions that return the examples of specific fields, by field name.
+
+    Returns:
+        Function to be used as `schema_extra` in the `Config` of a model.
+    """
+
+    def schema_extra(schema: Dict[str, Any], model: Any) -> None:
+        schema["example"] = build_example()
+        for name, build_field_example in build_field_examples.items():
+            schema["properties"][name]["example"] = build_field_example()
+
+    return schema_extra
@@ -23,7 +23,17 @@ setup(
     packages=find_packages(),
     install_requires=[
         'pydantic>=1.6.1',
-        'httpx>=0.15.5',
-        'geopandas'
-    ]
+        'httpx>=0.18.0',
+        'geopandas',
+        'shapely>=2',
+        'numpy>=1.14'
+    ],
+    extras_require={
+        "dask": ["dask-geopandas"]
+    },
+    entry_points={
+        "console_scripts": [
+            "pyportall=pyportall.cli:main"
+        ]
+    }
 )
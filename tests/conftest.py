@@ -4,6 +4,7 @@ import geopandas as gpd
 from shapely.geometry import Point, Polygon
 
 from pyportall.api.engine.core import APIClient
+from pyportall.simulator import PortallSimulator, SimulatorOptions
 
 
 DUMMY_API_KEY = "dummy"
@@ -29,6 +30,16 @@ def batch_client():
     return APIClient(api_key=os.getenv("PYPORTALL_API_KEY", DUMMY_API_KEY), batch=True)
 
 
+@pytest.fixture
+def simulator():
+    return PortallSimulator(SimulatorOptions(api_key=DUMMY_API_KEY))
+
+
+@pytest.fixture
+def simulated_client(simulator):
+    return APIClient(api_key=DUMMY_API_KEY, transport=simulator.transport())
+
+
 ### Don't take the samples below for valid ones!!! They're only meant to serve as test stubs.
 
 @pytest.fixture(scope="module")
@@ -0,0 +1,36 @@
+import json
+import pandas as pd
+import geopandas as gpd
+
+from pyportall import cli
+from pyportall.api.engine.core import APIClient
+from pyportall.simulator import PortallSimulator
+
+
+def test_geocode(tmp_path):
+    simulator = PortallSimulator()
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+
+    pd.DataFrame({"street": ["Gran Vía 46", "Calle Alcalá 10", "Calle Mayor 1"], "city": "Madrid"}).to_csv(tmp_path / "addresses.csv", index=False)
+    args = cli.parse_args(["geocode", str(tmp_path / "addresses.csv"), str(tmp_path / "geocoded.geojson"), "--country", "Spain", "--chunk-size", "2", "--cache-dir", str(tmp_path / "cache")])
+
+    assert cli.run(args, client) == 3
+    assert len(json.loads((tmp_path / "geocoded.geojson").read_text())["features"]) == 3
+    assert simulator.stats.requests["geocoding"] == 2
+
+    cli.run(args, client)
+    assert simulator.stats.requests["geocoding"] == 2
+
+
+def test_indicators(tmp_path, isovists):
+    client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+
+    isovists.to_file(tmp_path / "isovists.geojson", driver="GeoJSON")
+    args = cli.parse_args(["indicators", str(tmp_path / "isovists.geojson"), str(tmp_path / "values.csv"), "--code", "pop_res", "--month", "february", "--hour", "12", "--chunk-size", "1"])
+    cli.run(args, client)
+
+    values = cli.read(str(tmp_path / "values.csv"))
+
+    assert isinstance(values, gpd.GeoDataFrame)
+    assert values["value"].notna().all()
+    assert len(values) == len(isovists)
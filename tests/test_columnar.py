@@ -0,0 +1,88 @@
+import json
+import pandas as pd
+import geopandas as gpd
+from shapely.geometry import LineString, MultiLineString, MultiPoint, MultiPolygon, Point, Polygon
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import PortallDataFrameHelper
+from pyportall.api.models.columnar import ColumnarFeatureCollection
+from pyportall.api.models.geojson import FeatureCollection, Validation
+from pyportall.api.models.geopandas import PortallDataFrame
+from pyportall.simulator import PortallSimulator
+
+
+def test_roundtrips():
+    square = [(0, 0), (1, 0), (1, 1), (0, 1), (0, 0)]
+    hole = [(0.2, 0.2), (0.4, 0.2), (0.4, 0.4), (0.2, 0.2)]
+    gdf = gpd.GeoDataFrame({
+        "name": ["point", "multipoint", "linestring", "multilinestring", "polygon", "multipolygon"],
+        "value": [1.5, 2, None, 4, 5, 6],
+        "geometry": [
+            Point(-3.7, 40.4),
+            MultiPoint([(0, 0), (1, 1)]),
+            LineString([(0, 0), (1, 1), (2, 0)]),
+            MultiLineString([[(0, 0), (1, 1)], [(2, 2), (3, 3), (4, 4)]]),
+            Polygon(square, [hole]),
+            MultiPolygon([Polygon(square), Polygon([(5, 5), (6, 5), (6, 6), (5, 5)])])
+        ]
+    }, crs="EPSG:4326")
+    geojson = json.loads(gdf.to_json())
+
+    columnar = ColumnarFeatureCollection.from_gdf(gdf)
+
+    assert len(columnar) == 6
+    assert columnar.coordinates.shape == (29, 2)
+    assert columnar.properties["value"].dtype == float
+
+    assert columnar.to_gdf().geometry.geom_equals_exact(gdf.geometry, tolerance=0).all()
+    assert json.loads(columnar.to_geojson_bytes()) == json.loads(ColumnarFeatureCollection.from_geojson(geojson).to_geojson_bytes())
+    assert json.loads(columnar.to_gdf().to_json()) == geojson
+    assert columnar.to_feature_collection(Validation.strict) == FeatureCollection.parse_obj(geojson)
+    assert ColumnarFeatureCollection.from_feature_collection(FeatureCollection.parse_obj(geojson)).to_gdf().geometry.geom_equals_exact(gdf.geometry, tolerance=0).all()
+
+
+def test_empty_geometries():
+    gdf = gpd.GeoDataFrame({
+        "count": pd.array([1, None, 3, None, 5, 6, 7], dtype="Int64"),
+        "geometry": [Point(), LineString(), Polygon(), MultiPoint(), MultiLineString(), MultiPolygon(), Point(-3.7, 40.4)]
+    }, crs="EPSG:4326")
+
+    for columnar in (ColumnarFeatureCollection.from_gdf(gdf), ColumnarFeatureCollection.from_geojson(ColumnarFeatureCollection.from_gdf(gdf).to_geojson())):
+        resolved = columnar.to_gdf()
+        assert resolved.geometry.geom_type.tolist() == gdf.geometry.geom_type.tolist()
+        assert resolved.geometry.is_empty.tolist() == [True] * 6 + [False]
+        assert resolved.geometry.iloc[-1].equals(gdf.geometry.iloc[-1])
+        assert resolved["count"].dtype == "Int64"
+        assert resolved["count"].isna().tolist() == gdf["count"].isna().tolist()
+
+
+def test_columnar_dataframes(isovists):
+    client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+
+    pdf = PortallDataFrame.from_gdf(isovists, client, name="columnar")
+    pdf.save(columnar=True)
+
+    loaded = PortallDataFrameHelper(client).get(pdf.id, columnar=True)
+
+    assert loaded.name == "columnar"
+    assert loaded.geometry.geom_equals_exact(isovists.geometry, tolerance=1e-9).all()
+    assert loaded["radius_m"].tolist() == isovists["radius_m"].tolist()
+
+
+def test_direct_load(isovists):
+    simulator = PortallSimulator()
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+
+    pdf = PortallDataFrame.from_gdf(isovists, client, name="direct")
+    pdf.save()
+
+    loaded = PortallDataFrameHelper(client).get(pdf.id, columnar=True)
+
+    assert loaded.index.tolist() == PortallDataFrameHelper(client).get(pdf.id).index.tolist()
+    assert loaded.crs == "EPSG:4326"
+
+    requests = sum(simulator.stats.requests.values())
+    loaded.save()
+
+    assert sum(simulator.stats.requests.values()) == requests
+    assert loaded.row_fingerprints().equals(loaded._fingerprints)
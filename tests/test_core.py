@@ -0,0 +1,197 @@
+import httpx
+import time
+import pandas as pd
+import geopandas as gpd
+from concurrent.futures import ThreadPoolExecutor
+from shapely.geometry import Point
+
+import pyportall.api.engine.core
+from pyportall.api.engine.core import APIClient, CreditScheduler, ENDPOINT_METADATA
+from pyportall.api.engine.geopandas import GeocodingHelper, IsovistHelper, IndicatorHelper
+from pyportall.api.models.indicators import Indicator, Moment, Month
+from pyportall.api.models.hedging import HedgingOptions
+from pyportall.api.models.lbs import IsovistOptions
+from pyportall.api.models.scheduling import CreditBudgetOptions, Priority, PriorityLaneOptions
+from pyportall.simulator import Latency, LatencyDistribution, PortallSimulator, SimulatorOptions
+
+
+def test_shared_client(monkeypatch, isovists):
+    monkeypatch.setattr(pyportall.api.engine.core, "BATCH_DELAY_S", 0.005)
+    simulator = PortallSimulator(SimulatorOptions(latency=Latency(distribution=LatencyDistribution.uniform, mean_s=0.01, spread_s=0.01), batch_duration_s=0.02, seed=1))
+
+    expected_client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+    moments = Moment.product(months=list(Month), hours=[8, 20])
+    expected = {moment.label: IndicatorHelper(expected_client).resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=moment)["value"].tolist() for moment in moments}
+
+    # Batch jobs answer 202 until they are done, so interleaved threads used to read each other's status codes
+    client = APIClient(api_key="dummy", batch=True, transport=simulator.transport())
+
+    def resolve(moment):
+        return moment.label, IndicatorHelper(client).resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=moment)["value"].tolist()
+
+    def geocode(_):
+        return GeocodingHelper(client).resolve(pd.DataFrame({"street": ["Gran Vía 46"]})).size
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        resolved = dict(executor.map(resolve, moments))
+        geocoded = list(executor.map(geocode, range(16)))
+
+    assert resolved == expected
+    assert set(geocoded) == {8}
+    assert simulator.stats.max_in_flight > 1
+
+    response = client.request("GET", ENDPOINT_METADATA)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.elapsed_s > 0
+
+
+def test_client_rate_limit():
+    simulator = PortallSimulator(SimulatorOptions(max_requests_per_s=50))
+    client = APIClient(api_key="dummy", transport=simulator.transport(), max_requests_per_s=20)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: client.call_metadata(), range(10)))
+
+    assert simulator.stats.status_codes == {200: 10}
+
+
+def test_hedging():
+    latency = Latency(distribution=LatencyDistribution.lognormal, mean_s=0.002, spread_s=1.5)
+    simulator = PortallSimulator(SimulatorOptions(route_latency={"geocoding": latency}, seed=3))
+    client = APIClient(api_key="dummy", transport=simulator.transport(), hedging=HedgingOptions(percentile=80, max_extra_load=0.2, min_samples=10))
+
+    addresses = pd.DataFrame({"street": ["Gran Vía 46"]})
+    for _ in range(100):
+        assert GeocodingHelper(client).resolve(addresses).size == 8
+
+    stats = client.hedging_stats
+    assert stats.requests == 100
+    assert 0 < stats.hedged <= 20
+    assert stats.hedge_wins > 0
+
+    # Slower copies are left to finish in the background
+    client.hedger.executor.shutdown(wait=True)
+    deadline = time.monotonic() + 5
+    while simulator.stats.requests["geocoding"] < 100 + stats.hedged and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert simulator.stats.requests["geocoding"] == 100 + stats.hedged
+
+    assert APIClient(api_key="dummy", transport=simulator.transport()).hedging_stats is None
+
+
+def test_hedging_latency():
+    simulator = PortallSimulator()
+    calls = []
+
+    def handle(request):
+        calls.append(request)
+        time.sleep(1 if len(calls) == 6 else 0.01)
+        return simulator._handle_httpx(request)
+
+    client = APIClient(api_key="dummy", transport=httpx.MockTransport(handle), hedging=HedgingOptions(min_samples=5, max_extra_load=1))
+    for _ in range(5):
+        client.call_metadata()
+
+    # The sixth request is slow, its duplicate is not, and that is what the call waits for
+    start = time.perf_counter()
+    client.call_metadata()
+    assert time.perf_counter() - start < 0.5
+    assert client.hedging_stats.hedged == 1 and client.hedging_stats.hedge_wins == 1
+
+
+def test_hedging_in_flight():
+    simulator = PortallSimulator(SimulatorOptions(latency=Latency(mean_s=0.2)))
+    client = APIClient(api_key="dummy", transport=simulator.transport(), hedging=HedgingOptions(min_samples=1))
+
+    addresses = pd.DataFrame({"street": ["Gran Vía 46"]})
+    GeocodingHelper(client).resolve(addresses)
+
+    # Hedging does not cap the number of requests in flight to the size of its pool
+    with ThreadPoolExecutor(max_workers=40) as executor:
+        list(executor.map(lambda _: GeocodingHelper(client).resolve(addresses), range(40)))
+    assert simulator.stats.max_in_flight >= 40
+
+    # Latencies are learned per route, and only for the most recent ones
+    client.hedger.record(f"{ENDPOINT_METADATA}a/", 0.1)
+    assert client.hedger.delay(f"{ENDPOINT_METADATA}b/") == 0.1
+    for job in range(100):
+        client.hedger.record(f"https://api.portall.es/v1/jobs/{job}/", 0.1)
+    assert len(client.hedger._latencies) == pyportall.api.engine.core.MAX_HEDGING_ROUTES
+
+    client.hedger.executor.shutdown(wait=True)
+
+
+def test_coalescing(isovists):
+    simulator = PortallSimulator(SimulatorOptions(latency=Latency(mean_s=0.1)))
+    client = APIClient(api_key="dummy", transport=simulator.transport(), coalesce=True)
+    moment = Moment(month=Month.february)
+
+    def resolve(code):
+        return IndicatorHelper(client).resolve_aggregated(isovists, indicator=Indicator(code=code), moment=moment)["value"].tolist()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        resolved = list(executor.map(resolve, ["pop_res"] * 6 + ["pop_work"] * 2))
+
+    assert simulator.stats.requests["aggregated_indicators"] == 2
+    assert client.single_flight.coalesced == 6
+    assert resolved[:6] == [resolved[0]] * 6 and resolved[6] == resolved[7] != resolved[0]
+
+
+def test_coalescing_credits(isovists):
+    simulator = PortallSimulator(SimulatorOptions(latency=Latency(mean_s=0.1)))
+    scheduler = CreditScheduler(CreditBudgetOptions(credits_per_window=1000, window_s=60, indicator_credits={"pop_res": 1}))
+    client = APIClient(api_key="dummy", transport=simulator.transport(), coalesce=True, credit_scheduler=scheduler)
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: IndicatorHelper(client).resolve_aggregated(isovists, indicator=indicator, moment=moment), range(8)))
+
+    # Merged calls are not charged for the request they did not send
+    assert simulator.stats.requests["aggregated_indicators"] == 1
+    assert scheduler.stats.spent == len(isovists)
+
+
+def test_credit_budget(isovists):
+    simulator = PortallSimulator()
+    rows = len(isovists)
+    scheduler = CreditScheduler(CreditBudgetOptions(credits_per_window=2 * rows, window_s=0.3, job_quotas={"bulk": rows}, indicator_credits={"pop_res": 1}))
+    clients = {job: APIClient(api_key="dummy", transport=simulator.transport(), credit_scheduler=scheduler, job=job) for job in ("bulk", "web")}
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(executor.map(lambda job: IndicatorHelper(clients[job]).resolve_aggregated(isovists, indicator=indicator, moment=moment), ["bulk"] * 3 + ["web"] * 2))
+
+    # The third bulk call has to wait for two windows, because of the bulk quota
+    assert time.monotonic() - start >= 0.6
+    assert simulator.stats.requests["aggregated_indicators"] == 5
+    assert scheduler.stats.spent_by_job == {"bulk": 3 * rows, "web": 2 * rows}
+    assert clients["web"].credit_stats.queued >= 2
+
+    # Costs that are not known beforehand are found out with a preflight request
+    points = gpd.GeoDataFrame({"geometry": [Point(-3.70587, 40.42048), Point(-3.37825, 40.47281)]}, crs="EPSG:4326")
+    IsovistHelper(clients["web"]).resolve(points, options=IsovistOptions(radius_m=100))
+    assert simulator.stats.requests["isovists"] == 2
+    assert scheduler.stats.spent == 5 * rows + 2
+
+
+def test_priority_lanes():
+    simulator = PortallSimulator(SimulatorOptions(latency=Latency(mean_s=0.1)))
+    client = APIClient(api_key="dummy", transport=simulator.transport(), priority_lanes=PriorityLaneOptions(max_in_flight=1, max_skips=2))
+    points = gpd.GeoDataFrame({"geometry": [Point(-3.70587, 40.42048)]}, crs="EPSG:4326")
+    finished = []
+
+    def resolve(name, priority):
+        IsovistHelper(client).resolve(points, options=IsovistOptions(radius_m=100), priority=priority)
+        finished.append(name)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        for name, priority in [("b1", Priority.bulk), ("b2", Priority.bulk)] + [(f"i{number}", Priority.interactive) for number in range(1, 7)]:
+            executor.submit(resolve, name, priority)
+            time.sleep(0.02)
+
+    # Interactive requests go first, but the waiting bulk one is served after being passed over twice
+    assert finished == ["b1", "i1", "i2", "b2", "i3", "i4", "i5", "i6"]
+    assert client.priority_stats.served == {Priority.bulk: 2, Priority.interactive: 6}
+    assert client.priority_stats.promoted == 1
@@ -0,0 +1,49 @@
+import pytest
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import IndicatorHelper, IsovistHelper
+from pyportall.api.models.indicators import Indicator, Moment, Month
+from pyportall.api.models.lbs import IsovistOptions
+from pyportall.simulator import PortallSimulator, SimulatorOptions
+
+dask_geopandas = pytest.importorskip("dask_geopandas")
+dask_helpers = pytest.importorskip("pyportall.api.engine.dask")
+
+
+def test_aggregated(isovists):
+    simulator = PortallSimulator(SimulatorOptions(max_requests_per_s=20))
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+
+    ddf = dask_geopandas.from_geopandas(isovists, npartitions=2)
+    resolved = dask_helpers.IndicatorHelper(client, max_requests_per_s=10).resolve_aggregated(ddf, indicator=indicator, moment=moment)
+
+    assert list(resolved.columns) == list(resolved.compute().columns)
+    expected = IndicatorHelper(APIClient(api_key="dummy", transport=PortallSimulator().transport())).resolve_aggregated(isovists, indicator=indicator, moment=moment)
+    assert resolved.compute(scheduler="threads")["value"].tolist() == expected["value"].tolist()
+    assert 429 not in simulator.stats.status_codes
+
+
+def test_aggregated_columns(isovists):
+    client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+    gdf = isovists.rename_geometry("location")
+
+    resolved = dask_helpers.IndicatorHelper(client).resolve_aggregated(dask_geopandas.from_geopandas(gdf, npartitions=2), indicator=indicator, moment=moment)
+    expected = IndicatorHelper(client).resolve_aggregated(gdf, indicator=indicator, moment=moment)
+
+    # Same columns, in the same order, as without Dask, whatever the geometry column is called
+    assert list(resolved.columns) == list(expected.columns)
+    computed = resolved.compute(scheduler="threads")
+    assert list(computed.columns) == list(expected.columns) and computed.geometry.name == "location"
+    assert computed["value"].tolist() == expected["value"].tolist()
+
+
+def test_inferred_meta(isovists):
+    client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+    points = isovists.assign(geometry=isovists.geometry.representative_point())
+
+    ddf = dask_geopandas.from_geopandas(points, npartitions=2)
+    resolved = dask_helpers.IsovistHelper(client).resolve(ddf, options=IsovistOptions(radius_m=100)).compute(scheduler="processes")
+
+    assert resolved.drop(columns="geometry").reset_index(drop=True).equals(IsovistHelper(client).resolve(points, options=IsovistOptions(radius_m=100)).drop(columns="geometry"))
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import GeocodingHelper
+from pyportall.simulator import Latency, PortallSimulator, SimulatorOptions
+
+
+def test_geocoding_stream():
+    simulator = PortallSimulator(SimulatorOptions(latency=Latency(mean_s=0.05)))
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+    addresses = pd.DataFrame({"street": [f"Gran Vía {number}" for number in range(1, 12)], "city": "Madrid"}, index=[f"row{number}" for number in range(11)])
+    expected = GeocodingHelper(client).resolve(addresses)
+
+    reader = (addresses.iloc[start:start + 4] for start in range(0, len(addresses), 4))
+    chunks = list(GeocodingHelper(client).resolve_iter(reader, chunk_size=3, max_workers=2))
+
+    assert len(chunks) == 5 and simulator.stats.max_in_flight <= 2
+    resolved = pd.concat(chunks).loc[addresses.index]
+    assert resolved.geometry.geom_equals(expected.geometry.set_axis(addresses.index)).all()
+
+    records = addresses.to_dict(orient="records")
+    chunks = list(GeocodingHelper(client).resolve_iter(iter(records), chunk_size=4, ordered=True))
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9, 10]]
+    assert pd.concat(chunks)["street"].tolist() == addresses["street"].tolist()
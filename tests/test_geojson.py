@@ -0,0 +1,58 @@
+import json
+import pytest
+from pydantic import ValidationError
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import PortallDataFrameHelper
+from pyportall.api.models.geojson import FeatureCollection, Validation, parse_feature_collection
+from pyportall.api.models.geopandas import PortallDataFrame
+from pyportall.simulator import PortallSimulator
+
+
+def test_validation_modes(isovists):
+    geojson = json.loads(isovists.to_json())
+
+    strict = parse_feature_collection(geojson, Validation.strict)
+    trusted = parse_feature_collection(geojson, Validation.trusted)
+    deferred = parse_feature_collection(geojson, Validation.deferred)
+
+    assert json.loads(trusted.json()) == json.loads(deferred.json())
+    assert FeatureCollection.parse_raw(trusted.json()) == strict
+    deferred.check()
+
+
+def test_deferred_check(isovists):
+    geojson = json.loads(isovists.to_json())
+    geojson["features"][1]["geometry"]["coordinates"][0][-1] = [0, 0]
+
+    with pytest.raises(ValidationError):
+        parse_feature_collection(geojson, Validation.strict)
+
+    deferred = parse_feature_collection(geojson, Validation.deferred)
+    with pytest.raises(ValidationError):
+        deferred.check()
+
+    geojson["features"][1]["geometry"]["coordinates"][0] = [[0, 0], [1, 1], [0, 0]]
+    with pytest.raises(ValidationError):
+        parse_feature_collection(geojson, Validation.deferred).check()
+
+
+def test_trusted_dataframes(isovists):
+    client = APIClient(api_key="dummy", transport=PortallSimulator().transport())
+
+    pdf = PortallDataFrame.from_gdf(isovists, client, name="trusted")
+    pdf.save(validation=Validation.trusted)
+
+    for validation in Validation:
+        assert PortallDataFrameHelper(client).get(pdf.id, validation=validation).geometry.geom_equals_exact(isovists.geometry, tolerance=1e-9).all()
+
+
+def test_numeric_ids(isovists):
+    geojson = json.loads(isovists.to_json())
+    for position, feature in enumerate(geojson["features"]):
+        feature["id"] = position + 10
+
+    for validation in Validation:
+        geojson_model = parse_feature_collection(geojson, validation)
+        assert [feature.id for feature in geojson_model.features] == ["10", "11"]
+        assert list(PortallDataFrame.from_geojson(geojson_model, client=None, name="numeric").index) == [10, 11]
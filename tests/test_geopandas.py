@@ -1,3 +1,5 @@
+import httpx
+import json
 import pandas as pd
 import geopandas as gpd
 from shapely.geometry import Point, Polygon
@@ -7,6 +9,7 @@ from pyportall.api.models.lbs import GeocodingOptions
 from pyportall.api.models.lbs import GeocodingOptions, IsovistOptions
 from pyportall.api.engine.geopandas import GeocodingHelper, IsolineHelper, IsovistHelper, IndicatorHelper
 from pyportall.api.models.indicators import Day, Indicator, Moment, Month
+from pyportall.api.engine.core import APIClient
 
 
 def test_geocoding(mocker, mocked, client, geocodings):
@@ -78,3 +81,41 @@ def test_disaggregated_indicator(mocker, mocked, client, disaggregated_indicator
     resolved_indicators = indicator_helper.resolve_disaggregated(Polygon([[-3.379755, 40.4738045], [-3.3796692, 40.4743195], [-3.3794975, 40.4748344], [-3.3791542, 40.4748344], [-3.379755, 40.4738045]]), indicator=Indicator(code="pop_res", aggregated=False), moment=Moment(day=Day(8), year=2021, month=Month.february, hour=15))
 
     assert resolved_indicators.size == 24
+
+
+def test_projection_pushdown(simulator):
+    bodies = []
+
+    def handle(request):
+        bodies.append(json.loads(request.content))
+        return simulator._handle_httpx(request)
+
+    client = APIClient(api_key="dummy", transport=httpx.MockTransport(handle))
+
+    addresses = pd.DataFrame({"customer": [7, 8], "street": ["Gran Vía 46", "Calle Alcalá 10"], "city": ["Madrid", None], "notes": ["a", "b"]}, index=[10, 20])
+    geocoded = GeocodingHelper(client).resolve(addresses)
+    assert bodies[-1]["df"] == {"street": ["Gran Vía 46", "Calle Alcalá 10"], "city": ["Madrid", None]}
+    assert geocoded["customer"].tolist() == [7, 8] and geocoded["notes"].tolist() == ["a", "b"]
+    assert list(geocoded.columns[:4]) == ["geometry", "customer", "street", "city"]
+
+    points = gpd.GeoDataFrame({"name": ["a", "b"], "radius_m": [100, 200], "geometry": [Point(-3.70587, 40.42048), Point(-3.37825, 40.47281)]}, crs="EPSG:4326")
+    isovists = IsovistHelper(client).resolve(points)
+    assert [set(feature["properties"]) for feature in bodies[-1]["gdf"]["features"]] == [{"radius_m"}] * 2
+    assert "id" not in bodies[-1]["gdf"]["features"][0]
+    assert isovists["name"].tolist() == ["a", "b"] and isovists["radius_m"].tolist() == [100, 200]
+
+    resolved = IndicatorHelper(client).resolve_aggregated(points, indicator=Indicator(code="pop_res"), moment=Moment(month=Month.february))
+    assert [feature["properties"] for feature in bodies[-1]["gdf"]["features"]] == [{}] * 2
+    assert list(resolved.columns) == ["name", "radius_m", "geometry", "value"]
+
+    # The active geometry is found by name, whatever that is
+    renamed = points.rename_geometry("location")
+    isovists = IsovistHelper(client).resolve(renamed)
+    assert [set(feature["properties"]) for feature in bodies[-1]["gdf"]["features"]] == [{"radius_m"}] * 2
+    assert isovists.geometry.name == "location" and isovists["name"].tolist() == ["a", "b"]
+    assert isovists.geometry.geom_type.tolist() == ["Polygon"] * 2
+
+    resolved = IndicatorHelper(client).resolve_aggregated(renamed, indicator=Indicator(code="pop_res"), moment=Moment(month=Month.february))
+    assert [feature["properties"] for feature in bodies[-1]["gdf"]["features"]] == [{}] * 2
+    assert list(resolved.columns) == ["name", "radius_m", "location", "value"]
+    assert IndicatorHelper(client).resolve_aggregated(renamed, indicator=Indicator(code="pop_res"), moment=Moment(month=Month.february), values_only=True)["value"].tolist() == resolved["value"].tolist()
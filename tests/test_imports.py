@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+
+
+IMPORT_BUDGET_S = 1.0
+
+LIGHT_IMPORTS = """
+import json, sys, time
+start = time.perf_counter()
+import pyportall
+pyportall.APIClient, pyportall.MetadataHelper, pyportall.GeocodingOptions, pyportall.Moment
+import pyportall.api.models.geojson
+elapsed = time.perf_counter() - start
+print(json.dumps({"elapsed": elapsed, "modules": [name for name in ("numpy", "pandas", "geopandas", "shapely") if name in sys.modules]}))
+"""
+
+
+def test_light_imports():
+    result = json.loads(subprocess.run([sys.executable, "-c", LIGHT_IMPORTS], capture_output=True, check=True, text=True).stdout)
+
+    assert result["modules"] == []
+    assert result["elapsed"] < IMPORT_BUDGET_S
+
+
+def test_lazy_api():
+    import pyportall
+    from pyportall.api.engine.geopandas import GeocodingHelper
+
+    assert pyportall.GeocodingHelper is GeocodingHelper
+    assert "PortallDataFrame" in dir(pyportall)
+    assert sorted(pyportall.__all__) == sorted(pyportall._MODULES)
@@ -0,0 +1,42 @@
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import IndicatorBatcher, IndicatorHelper
+from pyportall.api.models.indicators import Indicator, Moment, Month
+from pyportall.simulator import PortallSimulator
+
+
+def test_micro_batching(isovists):
+    simulator = PortallSimulator()
+    batcher = IndicatorBatcher(APIClient(api_key="dummy", transport=simulator.transport()), max_delay_s=0.2, max_rows=8)
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+    rows = [isovists.iloc[[position % len(isovists)]] for position in range(12)]
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        resolved = list(executor.map(lambda gdf: batcher.resolve_aggregated(gdf, indicator=indicator, moment=moment), rows))
+
+    assert simulator.stats.requests["aggregated_indicators"] == 2
+    expected = IndicatorHelper(APIClient(api_key="dummy", transport=PortallSimulator().transport())).resolve_aggregated(isovists, indicator=indicator, moment=moment)["value"]
+    for position, gdf in enumerate(resolved):
+        assert gdf.index.equals(rows[position].index)
+        assert gdf["value"].iloc[0] == expected.iloc[position % len(isovists)]
+
+
+def test_values_only(simulated_client, isovists):
+    gdf = isovists.assign(category=pd.Categorical(["a", "b"]), count=pd.array([1, None], dtype="Int64")).set_axis(["x", "y"])
+    helper = IndicatorHelper(simulated_client)
+    indicator, moment = Indicator(code="pop_res"), Moment(month=Month.february)
+    expected = helper.resolve_aggregated(gdf, indicator=indicator, moment=moment)["value"].tolist()
+
+    resolved = helper.resolve_aggregated(gdf, indicator=indicator, moment=moment, values_only=True)
+    assert resolved is not gdf and "value" not in gdf.columns
+    assert resolved.index.equals(gdf.index)
+    assert resolved.drop(columns="value").dtypes.equals(gdf.dtypes)
+    assert resolved["value"].tolist() == expected
+
+    chunked = helper.resolve_aggregated(gdf, indicator=indicator, moment=moment, values_only=True, chunk_size=1)
+    assert chunked["value"].tolist() == expected
+
+    assert helper.resolve_aggregated(gdf, indicator=indicator, moment=moment, values_only=True, inplace=True) is gdf
+    assert gdf["value"].tolist() == expected
@@ -0,0 +1,47 @@
+import pytest
+import geopandas as gpd
+from shapely.geometry import Point
+
+from pyportall.api.engine.geopandas import IsolineHelper, IsovistHelper
+from pyportall.api.models.lbs import IsolineMode, IsolineOptions, IsovistOptions
+from pyportall.exceptions import ValidationError
+
+
+def test_planned_isolines(simulator, simulated_client):
+    points = [Point(-3.70587 + 0.01 * number, 40.42048) for number in range(9)]
+    gdf = gpd.GeoDataFrame({
+        "name": [f"p{number}" for number in range(9)],
+        "mode": ["truck", "pedestrian", None] * 3,
+        "range_s": [3600, 200, None] * 3,
+        "geometry": points
+    }, crs="EPSG:4326")
+    options = IsolineOptions(mode=IsolineMode.car, range_s=600)
+    expected = IsolineHelper(simulated_client).resolve(gdf, options=options)
+    requests = simulator.stats.requests["isolines"]
+
+    resolved = IsolineHelper(simulated_client).resolve_planned(gdf, options=options, chunk_size=4)
+
+    # One request per long truck isoline, and one for each of the cheaper groups
+    assert simulator.stats.requests["isolines"] - requests == 5
+    assert resolved["name"].tolist() == gdf["name"].tolist()
+    assert resolved.geometry.geom_equals(expected.geometry).all()
+
+    # Unknown modes fail as they do without planning, before anything is sent
+    requests = simulator.stats.requests["isolines"]
+    invalid = gdf.assign(mode=["truck", "plane", None] * 3)
+    with pytest.raises(ValidationError) as unplanned:
+        IsolineHelper(simulated_client).resolve(invalid, options=options)
+    with pytest.raises(ValidationError) as planned:
+        IsolineHelper(simulated_client).resolve_planned(invalid, options=options)
+    assert simulator.stats.requests["isolines"] - requests == 1
+    assert planned.value.args == unplanned.value.args
+
+
+def test_planned_isovists(simulator, simulated_client):
+    gdf = gpd.GeoDataFrame({"radius_m": [1000, 50, 50, 1000, 50], "geometry": [Point(-3.70587 + 0.01 * number, 40.42048) for number in range(5)]}, crs="EPSG:4326")
+
+    resolved = IsovistHelper(simulated_client).resolve_planned(gdf, options=IsovistOptions(fov_deg=90), chunk_size=3)
+
+    assert simulator.stats.requests["isovists"] == 3
+    assert resolved["radius_m"].tolist() == [1000, 50, 50, 1000, 50]
+    assert resolved.geometry.geom_equals(IsovistHelper(simulated_client).resolve(gdf, options=IsovistOptions(fov_deg=90)).geometry).all()
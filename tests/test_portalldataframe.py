@@ -7,6 +7,12 @@ from pyportall.api.models.lbs import GeocodingOptions
 from pyportall.api.models.lbs import GeocodingOptions, IsovistOptions
 from pyportall.api.engine.geopandas import GeocodingHelper, IsolineHelper, IsovistHelper, IndicatorHelper
 from pyportall.api.models.indicators import Day, Indicator, Moment, Month
+from pyportall.api.engine.core import APIClient
+from pyportall.api.engine.geopandas import PortallDataFrameHelper
+from pyportall.api.engine.metadata import MetadataHelper
+from pyportall.api.models.geopandas import PortallDataFrame
+from pyportall.api.models.scheduling import Priority, PriorityLaneOptions
+from pyportall.simulator import PortallSimulator, SimulatorOptions
 
 
 def test_save(mocker, mocked, client, geocodings):
@@ -78,3 +84,115 @@ def test_disaggregated_indicator(mocker, mocked, client, disaggregated_indicator
     resolved_indicators = indicator_helper.resolve_disaggregated(Polygon([[-3.379755, 40.4738045], [-3.3796692, 40.4743195], [-3.3794975, 40.4748344], [-3.3791542, 40.4748344], [-3.379755, 40.4738045]]), indicator=Indicator(code="pop_res", aggregated=False), moment=Moment(day=Day(8), year=2021, month=Month.february, hour=15))
 
     assert resolved_indicators.size == 24
+
+
+def test_lazy_listing(isovists):
+    simulator = PortallSimulator()
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+    for name in ("first", "second", "third"):
+        PortallDataFrame.from_gdf(isovists, client, name=name).save()
+
+    pdf_helper = PortallDataFrameHelper(client)
+    handles = pdf_helper.all(page_size=2)
+
+    assert [handle.name for handle in handles] == ["first", "second", "third"]
+    assert simulator.stats.requests["dataframes"] == 3 + 2
+    assert not any(handle.loaded for handle in handles)
+
+    assert handles[1].dataframe.size == isovists.size
+    assert handles[1].dataframe.name == "second"
+    assert handles[1].loaded
+
+    pdfs = pdf_helper.get_many([handle.id for handle in reversed(handles)])
+
+    assert [pdf.name for pdf in pdfs] == ["third", "second", "first"]
+
+
+def test_delta_save(isovists):
+    simulator = PortallSimulator()
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+    pdf_helper = PortallDataFrameHelper(client)
+
+    rows = pd.concat([isovists] * 50, ignore_index=True)
+    pdf = PortallDataFrame.from_gdf(rows, client, name="delta")
+    pdf.save()
+    full_bytes = simulator.stats.bytes_received
+
+    pdf = pdf_helper.get(pdf.id)
+    pdf.loc[3, "radius_m"] = 250
+    pdf = pdf.drop(index=[5])
+    pdf.save()
+
+    assert simulator.stats.requests["dataframes"] == 3
+    assert simulator.stats.bytes_received - full_bytes < full_bytes / 10
+
+    saved = pdf_helper.get(pdf.id)
+    assert len(saved) == 99
+    assert saved.loc[3, "radius_m"] == 250
+    assert 5 not in saved.index
+
+    pdf.save()
+    assert simulator.stats.requests["dataframes"] == 4  # Nothing changed, nothing sent
+
+    pdf.name = "renamed"
+    pdf.description = "Now with a description"
+    pdf.save()
+    assert simulator.stats.requests["dataframes"] == 5
+
+    saved = pdf_helper.get(pdf.id)
+    assert (saved.name, saved.description) == ("renamed", "Now with a description")
+    assert len(saved) == 99
+
+
+def test_delta_save_fallback(isovists):
+    simulator = PortallSimulator(SimulatorOptions(patch_support=False))
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+
+    pdf = PortallDataFrame.from_gdf(isovists, client, name="fallback")
+    pdf.save()
+    pdf.loc[0, "radius_m"] = 250
+    pdf.save()
+
+    assert simulator.stats.status_codes == {201: 1, 405: 1, 200: 1}
+    assert PortallDataFrameHelper(client).get(pdf.id).loc[0, "radius_m"] == 250
+
+
+def test_streamed_save(isovists):
+    simulator = PortallSimulator()
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+
+    rows = pd.concat([isovists] * 50, ignore_index=True)
+    pdf = PortallDataFrame.from_gdf(rows, client, name="streamed")
+    pdf.save(stream=True, chunk_rows=10, max_workers=2)
+
+    assert simulator.stats.status_codes == {201: 1, 200: 9}
+
+    saved = PortallDataFrameHelper(client).get(pdf.id)
+    assert list(saved.index) == list(range(100))
+    assert saved.geometry.geom_equals_exact(rows.geometry, tolerance=1e-9).all()
+
+
+def test_streamed_save_fallback(isovists):
+    simulator = PortallSimulator(SimulatorOptions(patch_support=False))
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+
+    pdf = PortallDataFrame.from_gdf(pd.concat([isovists] * 50, ignore_index=True), client, name="streamed")
+    pdf.save(chunk_rows=30)
+
+    assert simulator.stats.status_codes == {201: 1, 405: 1, 200: 1}
+    assert len(PortallDataFrameHelper(client).get(pdf.id)) == 100
+
+
+def test_save_priority(isovists):
+    simulator = PortallSimulator()
+    client = APIClient(api_key="dummy", transport=simulator.transport(), priority_lanes=PriorityLaneOptions())
+
+    pdf = PortallDataFrame.from_gdf(pd.concat([isovists] * 5, ignore_index=True), client, name="bulk")
+    pdf.save(chunk_rows=4, priority=Priority.bulk)
+    PortallDataFrameHelper(client).get_many([pdf.id] * 2, priority=Priority.bulk)
+    handle = PortallDataFrameHelper(client).all(priority=Priority.bulk)[0]
+    assert len(handle.dataframe) == 10
+    MetadataHelper(client, priority=Priority.interactive).refresh(priority=Priority.interactive)
+
+    # One upload and two appends, two downloads, the listing and the lazy download are all bulk
+    assert client.priority_stats.served == {Priority.bulk: 7, Priority.interactive: 2}
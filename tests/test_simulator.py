@@ -0,0 +1,215 @@
+import asyncio
+import httpx
+import pickle
+import pytest
+import pandas as pd
+import geopandas as gpd
+from concurrent.futures import ProcessPoolExecutor
+from shapely.geometry import Point, Polygon
+
+import pyportall.api.engine.core
+from pyportall.api.engine.core import APIClient, ENDPOINT_GEOCODING
+from pyportall.api.engine.geopandas import GeocodingHelper, IsolineHelper, IsovistHelper, IndicatorHelper
+from pyportall.api.engine.metadata import MetadataHelper
+from pyportall.api.models.indicators import Day, Indicator, Moment, Month, Normalization
+from pyportall.api.models.lbs import GeocodingOptions, IsovistOptions
+from pyportall.exceptions import AuthError, PreFlightException, PyPortallException, RateLimitError
+
+
+def test_helpers(simulated_client, isovists):
+    addresses = pd.DataFrame({"street": ["Gran Vía 46", "Calle Alcalá 10"], "city": ["Madrid", "Madrid"]})
+    assert GeocodingHelper(simulated_client).resolve(addresses, options=GeocodingOptions(country="Spain")).size == 16
+
+    points = gpd.GeoDataFrame({"geometry": [Point(-3.70587, 40.42048), Point(-3.37825, 40.47281)]}, crs="EPSG:4326")
+    assert IsovistHelper(simulated_client).resolve(points, options=IsovistOptions(radius_m=100)).size == 12
+    assert IsolineHelper(simulated_client).resolve(points.assign(mode="pedestrian", range_s=200)).size == 10
+
+    moment = Moment(day=Day(8), year=2021, month=Month.february, hour=15)
+    assert IndicatorHelper(simulated_client).resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=moment).size == 14
+
+    polygon = Polygon([[-3.71, 40.41], [-3.70, 40.41], [-3.70, 40.42], [-3.71, 40.41]])
+    cells = IndicatorHelper(simulated_client).resolve_disaggregated(polygon, indicator=Indicator(code="pop_res", aggregated=False), moment=moment)
+    assert list(cells.columns) == ["geometry", "id", "value", "weight"]
+
+    assert MetadataHelper(simulated_client).get("pop_res").credits == 1
+
+
+def test_batch(monkeypatch, simulator, isovists):
+    monkeypatch.setattr(pyportall.api.engine.core, "BATCH_DELAY_S", 0.01)
+    simulator.options.batch_duration_s = 0.05
+
+    batch_client = APIClient(api_key="dummy", batch=True, transport=simulator.transport())
+    resolved_indicators = IndicatorHelper(batch_client).resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=Moment(month=Month.february))
+
+    assert resolved_indicators.size == 14
+    assert simulator.stats.requests["jobs"] > 1
+
+
+def test_preflight(simulator, isovists):
+    preflight_client = APIClient(api_key="dummy", preflight=True, transport=simulator.transport())
+
+    with pytest.raises(PreFlightException) as e:
+        IndicatorHelper(preflight_client).resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=Moment(month=Month.february))
+
+    assert e.value.credits == 2
+
+
+def test_errors(simulator, isovists):
+    with pytest.raises(AuthError):
+        APIClient(api_key="wrong", transport=simulator.transport()).call_metadata()
+
+    client = APIClient(api_key="dummy", transport=simulator.transport())
+
+    simulator.options.max_payload_bytes = 100
+    with pytest.raises(PyPortallException):
+        IndicatorHelper(client).resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=Moment(month=Month.february))
+
+    simulator.options.rate_limit_probability = 1
+    with pytest.raises(RateLimitError):
+        client.call_metadata()
+
+    assert simulator.stats.status_codes == {401: 1, 413: 1, 429: 1}
+
+
+def test_localhost(simulator):
+    with simulator.serve() as base_url:
+        response = httpx.get(simulator.endpoints(base_url)["PYPORTALL_ENDPOINT_METADATA"], params={"apikey": "dummy"})
+
+    assert response.status_code == 200
+    assert response.json()[0]["code"] == "pop_res"
+
+
+def test_asgi(simulator):
+    async def geocode():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=simulator)) as client:
+            return await client.post(ENDPOINT_GEOCODING, params={"apikey": "dummy"}, json={"df": {"street": {"0": "Gran Vía 46"}}, "options": None})
+
+    response = asyncio.run(geocode())
+
+    assert response.status_code == 200
+    assert response.json()["features"][0]["geometry"]["type"] == "Point"
+
+
+def test_timeseries(monkeypatch, simulator, isovists):
+    monkeypatch.setattr(pyportall.api.engine.core, "BATCH_DELAY_S", 0.01)
+    simulator.options.batch_duration_s = 0.05
+
+    moments = Moment.product(months=[Month.february, Month.march], hours=[9, 21])
+    assert [moment.label for moment in moments] == ["2020-february-9h", "2020-february-21h", "2020-march-9h", "2020-march-21h"]
+
+    helper = IndicatorHelper(APIClient(api_key="dummy", batch=True, transport=simulator.transport()))
+    long = helper.resolve_timeseries(isovists, indicator=Indicator(code="pop_res"), moments=moments)
+
+    assert long.index.names == ["row", "moment"]
+    assert len(long) == 8
+    assert long.loc[(1, "2020-march-9h"), "value"] == helper.resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=moments[2])["value"][1]
+
+    wide = helper.resolve_timeseries(isovists, indicator=Indicator(code="pop_res"), moments=moments, wide=True)
+
+    assert list(wide.columns) == list(isovists.columns) + [moment.label for moment in moments]
+    assert wide["2020-march-9h"].tolist() == long.xs("2020-march-9h", level="moment")["value"].tolist()
+    assert simulator.stats.max_in_flight > 1
+
+
+def test_timeseries_order(simulated_client, isovists):
+    gdf = isovists.set_axis(pd.Index(["z", "a"], name="site"))
+    moments = Moment.product(months=[Month.march, Month.february])
+    long = IndicatorHelper(simulated_client).resolve_timeseries(gdf, indicator=Indicator(code="pop_res"), moments=moments)
+
+    assert list(long.index) == [("z", "2020-march"), ("z", "2020-february"), ("a", "2020-march"), ("a", "2020-february")]
+    assert long.index.names == ["site", "moment"]
+
+
+def test_indicators(simulator, simulated_client, isovists):
+    indicators = [Indicator(code="pop_res"), Indicator(code="pop_res", normalization=Normalization.density), Indicator(code="pop_res", percent=True)]
+    moment = Moment(month=Month.february)
+
+    helper = IndicatorHelper(simulated_client)
+    resolved = helper.resolve_indicators(isovists, indicators=indicators, moment=moment)
+
+    assert list(resolved.columns) == list(isovists.columns) + ["pop_res", "pop_res_density", "pop_res_percent"]
+    assert resolved.index.equals(isovists.index)
+    assert resolved["pop_res_density"].tolist() == helper.resolve_aggregated(isovists, indicator=indicators[1], moment=moment)["value"].tolist()
+    assert simulator.stats.requests["aggregated_indicators"] == 4
+
+
+def test_disaggregated_many(simulator, simulated_client):
+    moment = Moment(month=Month.february)
+    indicator = Indicator(code="pop_res", aggregated=False)
+    polygons = gpd.GeoDataFrame({"name": ["a", "b", "c"]}, geometry=[Point(-3.70, 40.42).buffer(0.01), Point(-3.69, 40.42).buffer(0.01), Point(-3.60, 40.42).buffer(0.005)], crs="EPSG:4326")
+
+    helper = IndicatorHelper(simulated_client)
+    cells = helper.resolve_disaggregated_many(polygons, indicator=indicator, moment=moment)
+
+    assert simulator.stats.requests["disaggregated_indicators"] == 2
+    for row, polygon in enumerate(polygons.geometry):
+        expected = helper.resolve_disaggregated(polygon, indicator=indicator, moment=moment)
+        assert sorted(cells.loc[[row], "id"]) == sorted(expected["id"])
+        assert sorted(cells.loc[[row], "value"]) == sorted(expected["value"])
+
+    aggregated = helper.resolve_disaggregated_many(polygons, indicator=indicator, moment=moment, aggregate=True)
+
+    assert list(aggregated.columns) == ["name", "geometry", "value"]
+    assert aggregated["value"][0] == pytest.approx(cells.loc[[0], "value"].sum())
+
+
+def test_disaggregated_many_edge_cases(simulated_client):
+    moment = Moment(month=Month.february)
+    indicator = Indicator(code="pop_res", aggregated=False)
+    helper = IndicatorHelper(simulated_client)
+
+    # A polygon too small to hold any cell centre comes back with no cells, and ids stay integers
+    polygons = gpd.GeoDataFrame({"name": ["a", "b"]}, geometry=[Point(-3.70, 40.42).buffer(0.01), Point(-3.60, 40.42).buffer(1e-7)], crs="EPSG:4326")
+    cells = helper.resolve_disaggregated_many(polygons, indicator=indicator, moment=moment)
+    assert set(cells.index) == {0}
+    assert cells["id"].dtype == "int64"
+    aggregated = helper.resolve_disaggregated_many(polygons, indicator=indicator, moment=moment, aggregate=True)
+    assert aggregated["value"].notna().tolist() == [True, False]
+
+    empty = polygons.iloc[:0]
+    assert len(helper.resolve_disaggregated_many(empty, indicator=indicator, moment=moment)) == 0
+    assert list(helper.resolve_disaggregated_many(empty, indicator=indicator, moment=moment, aggregate=True).columns) == ["name", "geometry", "value"]
+
+
+def test_disaggregated_many_shared_cells(simulated_client, monkeypatch):
+    helper = IndicatorHelper(simulated_client)
+    polygons = gpd.GeoDataFrame(geometry=[Point(-3.70, 40.42).buffer(0.01), Point(-3.60, 40.42).buffer(0.01)], crs="EPSG:4326")
+
+    # The same cell, as both parts of the union would see it if it straddled them
+    shared = gpd.GeoDataFrame({"id": [1], "value": [10.0], "weight": [0.6]}, geometry=[Point(-3.70, 40.42).buffer(0.001)], crs="EPSG:4326")
+    monkeypatch.setattr(helper, "resolve_disaggregated", lambda area, **kwargs: shared.copy())
+
+    cells = helper.resolve_disaggregated_many(polygons, indicator=Indicator(code="pop_res", aggregated=False), moment=Moment(month=Month.february))
+    assert cells["id"].tolist() == [1]
+    assert cells["weight"].tolist() == [1.0]
+
+
+def test_disaggregated_tiles(simulator, simulated_client):
+    moment = Moment(month=Month.february)
+    indicator = Indicator(code="pop_res", aggregated=False)
+    polygon = Point(-3.70, 40.42).buffer(0.02)
+
+    helper = IndicatorHelper(simulated_client)
+    expected = helper.resolve_disaggregated(polygon, indicator=indicator, moment=moment)
+    tiled = helper.resolve_disaggregated(polygon, indicator=indicator, moment=moment, max_tile_area=polygon.area / 10, max_tile_vertices=20)
+
+    assert simulator.stats.requests["disaggregated_indicators"] > 10
+    assert list(tiled.columns) == list(expected.columns)
+    assert sorted(tiled["id"]) == sorted(expected["id"])
+    assert tiled.set_index("id")["value"].sort_index().tolist() == expected.set_index("id")["value"].sort_index().tolist()
+    assert (tiled["weight"] <= 1).all()
+
+
+def test_process_pool(simulated_client, isovists):
+    helper = pickle.loads(pickle.dumps(IndicatorHelper(simulated_client)))
+    assert helper.client.api_key == "dummy"
+    assert helper.client.http is not simulated_client.http
+
+    moment = Moment(month=Month.february)
+    expected = helper.resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=moment)
+
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        resolved = helper.resolve_aggregated(isovists, indicator=Indicator(code="pop_res"), moment=moment, chunk_size=1, executor=executor)
+
+    assert resolved.drop(columns="geometry").equals(expected.drop(columns="geometry"))
+    assert resolved.geometry.geom_equals(expected.geometry).all()